@@ -1,9 +1,23 @@
 import itertools as it
 import logging
 import random
-from copy import deepcopy
-from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+import time
+from contextlib import nullcontext
+from enum import Enum, auto
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
+from catanpg.base.generation_stats import GenerationStats
 from catanpg.base.hex_tile import (
     BrickHarborTile,
     DesertTile,
@@ -21,28 +35,48 @@ from catanpg.base.hex_tile import (
     PastureTile,
     SeaTile,
     ThreeOneHarborTile,
+    TileKind,
     WoolHarborTile,
 )
+from catanpg.base.number_placement import assign_numbers
 from catanpg.base.tile_sequence import SeaBorderTile
 from catanpg.hex_grid import (
     Direction,
     HexGrid,
     corner_at_distance,
+    index_radius,
     move_from_hex,
     next_clockwise_direction,
-    spiral_ordered_indexes,
+    spiral_index_table,
 )
 
 # TODO: docstrings
 
+# Generator of the boards built without one of their own (seeded boards get theirs, see `generate_board`): the random
+# module itself, which has the same interface as `random.Random`, so that `random.seed` makes such boards reproducible
+_DEFAULT_RNG: Any = random
+
 _ORDERED_NUMBERS = [5, 2, 6, 3, 8, 10, 9, 12, 11, 4, 8, 10, 9, 4, 5, 6, 3, 11]
 
+_TILE_CLS_TO_AMOUNT: Dict[Type[HexTile], int] = {
+    ForestTile: 4,
+    PastureTile: 4,
+    FieldsTile: 4,
+    HillsTile: 3,
+    MountainsTile: 3,
+    DesertTile: 1
+}
+
 _RESTART_THRESHOLD = 10
 
+_LAND_RADIUS = 2
+
+_TERRAIN_KIND = TileKind.TERRAIN
+
 
-def _roulette_wheel_selection(weights: Sequence[int]) -> int:
+def _roulette_wheel_selection(weights: Sequence[int], rng: random.Random) -> int:
     assert any(w > 0 for w in weights) and all(w >= 0 for w in weights)
-    weight_sample = random.randint(1, sum(weights))
+    weight_sample = rng.randint(1, sum(weights))
     weight_acc = weights[0]
     idx = 0
     while weight_acc < weight_sample:
@@ -69,31 +103,130 @@ def _mk_double_harbor_border(harbor1_class: Type[HarborTile], harbor2_class: Typ
     return _mk_harbor_boder((harbor1_class(Direction.SOUTHEAST), None, harbor2_class(Direction.SOUTHWEST)))
 
 
+class GenerationEngine(Enum):
+    """How numbers are placed on a board.
+
+    REPAIR shuffles the numbers and then swaps tiles to remove forbidden adjacencies, restarting from scratch when the
+    repair takes too long.
+
+    BACKTRACKING assigns numbers cell by cell in spiral order with `assign_numbers`: each cell draws one of the
+    remaining tokens allowed by its already numbered neighbors (proportionally to their count), backtracking on dead
+    ends. Boards are never invalid, but their distribution differs from the repair engine's and is not uniform over
+    valid boards. With ordered numbers, the rulebook order is kept wherever it is valid.
+    """
+
+    REPAIR = auto()
+    BACKTRACKING = auto()
+
+
 class BaseBoard:
+    # Radius of the grid. Its outermost ring holds the sea borders and harbors, and every other cell is land.
+    _radius = 3
 
-    def __init__(self, ordered_numbers: bool = False) -> None:
+    def __init__(
+        self,
+        ordered_numbers: bool = False,
+        rng: Optional[random.Random] = None,
+        collect_stats: bool = False,
+        engine: GenerationEngine = GenerationEngine.REPAIR,
+        deadline: Optional[float] = None
+    ) -> None:
+        """Generate a board, giving up on a valid one at `deadline` (a `time.monotonic()` time), if given.
+
+        Past the deadline, the board with the lowest violation generated so far is kept (see `violation`). A board is
+        always returned, so the backtracking engine, which only completes valid boards, ignores the deadline until it
+        completes one.
+        """
+        self._rng = rng if rng is not None else _DEFAULT_RNG
+        self.stats: Optional[GenerationStats] = GenerationStats() if collect_stats else None
+        self._deadline = deadline
+        self._best_grid: Optional[Tuple[int, HexGrid]] = None
+        self._generate(ordered_numbers, engine)
+
+    def _generate(
+        self,
+        ordered_numbers: bool,
+        engine: GenerationEngine,
+        keep_going: Optional[Callable[[], bool]] = None
+    ) -> bool:
+        # Generation attempts until one succeeds, the deadline passes or `keep_going` (checked before each attempt)
+        # says to give up
+        self._best_grid = None
         done = False
         while not done:
-            self.grid = HexGrid(3)
-            self._shuffle_borders()
-            self._shuffle_tiles(ordered_numbers)
-            done = self._fix_violations()
+            if keep_going is not None and not keep_going():
+                return False
+            self.grid = HexGrid(self._radius)
+            with self._timer("border_shuffle"):
+                self._shuffle_borders()
+            match engine:
+                case GenerationEngine.REPAIR:
+                    with self._timer("tile_shuffle"):
+                        self._shuffle_tiles(ordered_numbers)
+                    with self._timer("repair"):
+                        done = self._fix_violations()
+                case GenerationEngine.BACKTRACKING:
+                    with self._timer("tile_shuffle"):
+                        done = self._place_tiles_with_backtracking(ordered_numbers)
+            if not done and self._best_grid is not None and self._past_deadline():
+                violation, self.grid = self._best_grid
+                logging.info(":deadline-violation %d", violation)
+                break
+        self._best_grid = None
+        return True
+
+    @classmethod
+    def from_grid(cls, grid: HexGrid, rng: Optional[random.Random] = None) -> "BaseBoard":
+        """Build a board around an already generated grid (e.g. a decoded one) without generating a new layout."""
+        board = cls.__new__(cls)
+        board._rng = rng if rng is not None else _DEFAULT_RNG
+        board.stats = None
+        board._deadline = None
+        board._best_grid = None
+        board.grid = grid
+        return board
+
+    def optimize(self, **kwargs: Any) -> "BaseBoard":
+        """Return the best board `catanpg.optimize.optimize_board` finds from this one, given the same arguments."""
+        # Imported here, as the optimizer needs the board metrics, which need this module
+        from catanpg.optimize import optimize_board
+
+        return optimize_board(self, **kwargs).board
+
+    @property
+    def violation(self) -> int:
+        """Number adjacency violation of the board, only positive if generation ran out of time."""
+        return self._grid_violation(self.grid)
+
+    def _past_deadline(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _track_best_grid(self, violation: int) -> None:
+        # With a deadline, repairs report the violation of the grid after each step, so that a copy of the lowest
+        # violation grid reached by any attempt is kept for when time runs out
+        if self._deadline is not None and (self._best_grid is None or violation < self._best_grid[0]):
+            self._best_grid = (violation, self.grid.copy())
+
+    def _timer(self, phase: str) -> ContextManager[None]:
+        return self.stats.timer(phase) if self.stats is not None else nullcontext()
 
     @property
     def _tile_cls_to_amount(self) -> Dict[Type[HexTile], int]:
-        return {
-            ForestTile: 4,
-            PastureTile: 4,
-            FieldsTile: 4,
-            HillsTile: 3,
-            MountainsTile: 3,
-            DesertTile: 1
-        }
+        return dict(_TILE_CLS_TO_AMOUNT)
 
     @property
     def _forbidden_number_adjacencies(self) -> List[Set[NumberOrNumbers]]:
         return [set((6, 8))]
 
+    @property
+    def _numbers(self) -> Sequence[NumberOrNumbers]:
+        # Numbers of the numbered land tiles, in the order they are placed (in spiral order) with ordered numbers
+        return _ORDERED_NUMBERS
+
+    @property
+    def _land_indexes(self) -> Tuple[Tuple[int, int], ...]:
+        return spiral_index_table(Direction.EAST, self._radius - 1)
+
     def _mk_border_tiles(self) -> Tuple[List[SeaBorderTile], List[SeaBorderTile]]:
         harbor_class_pairs = (
             (ThreeOneHarborTile, WoolHarborTile),
@@ -108,75 +241,140 @@ class BaseBoard:
     def _shuffle_borders(self) -> None:
         single_harbor_borders, double_harbor_borders = self._mk_border_tiles()
         assert len(single_harbor_borders) == len(double_harbor_borders)
-        random.shuffle(single_harbor_borders)
-        random.shuffle(double_harbor_borders)
+        self._rng.shuffle(single_harbor_borders)
+        self._rng.shuffle(double_harbor_borders)
         corner = Direction.NORTHWEST
         orientation = Direction.EAST
         for i, border in enumerate(it.chain(*zip(single_harbor_borders, double_harbor_borders))):
             border.rotate(i)
             for i, tile in enumerate(border):
-                self.grid.set(*move_from_hex(*corner_at_distance(corner, 3), orientation, i), tile)
+                self.grid.set(*move_from_hex(*corner_at_distance(corner, self._radius), orientation, i), tile)
             corner = next_clockwise_direction(corner)
             orientation = next_clockwise_direction(orientation)
 
+    def _place_fixed_tiles(self) -> None:
+        pass
+
     def _shuffle_tiles(self, ordered_numbers: bool) -> None:
-        numbers = list(reversed(_ORDERED_NUMBERS))
+        self._place_fixed_tiles()
+        numbers = list(reversed(self._numbers))
         if not ordered_numbers:
-            random.shuffle(numbers)
+            self._rng.shuffle(numbers)
         tile_clss = [tile_cls for tile_cls, amount in self._tile_cls_to_amount.items() for _ in range(amount)]
-        random.shuffle(tile_clss)
-        for x, y in spiral_ordered_indexes(Direction.EAST, 2):
+        self._rng.shuffle(tile_clss)
+        for x, y in self._land_indexes:
             if self.grid.is_free(x, y):
                 tile_cls = tile_clss.pop()
                 tile = tile_cls(numbers.pop()) if issubclass(tile_cls, NumberedHexTile) else tile_cls()
                 self.grid.set(x, y, tile)
         assert len(numbers) == len(tile_clss) == 0
 
+    def _place_tiles_with_backtracking(self, ordered_numbers: bool) -> bool:
+        self._place_fixed_tiles()
+        tile_clss = [tile_cls for tile_cls, amount in self._tile_cls_to_amount.items() for _ in range(amount)]
+        self._rng.shuffle(tile_clss)
+        numbered_idxs, numbered_tile_clss = [], []
+        for x, y in self._land_indexes:
+            if self.grid.is_free(x, y):
+                tile_cls = tile_clss.pop()
+                if issubclass(tile_cls, NumberedHexTile):
+                    numbered_idxs.append((x, y))
+                    numbered_tile_clss.append(tile_cls)
+                else:
+                    self.grid.set(x, y, tile_cls())
+        assert len(tile_clss) == 0
+        idx_to_pos = {idx: pos for pos, idx in enumerate(numbered_idxs)}
+        numbers = assign_numbers(
+            [
+                [idx_to_pos[idx_n] for idx_n in self.grid.neighbor_indexes(*idx) if idx_n in idx_to_pos]
+                for idx in numbered_idxs
+            ],
+            [
+                [tile.number for tile in self.grid.neighbors(*idx) if isinstance(tile, NumberedHexTile)]
+                for idx in numbered_idxs
+            ],
+            self._numbers,
+            self._forbidden_number_adjacencies,
+            rng=None if ordered_numbers else self._rng
+        )
+        if self.stats is not None:
+            self.stats.start_attempt(0 if numbers is not None else None)
+        if numbers is None:
+            return False
+        for idx, tile_cls, number in zip(numbered_idxs, numbered_tile_clss, numbers):
+            self.grid.set(*idx, tile_cls(number))
+        return True
+
     def _tile_violation(self, grid: HexGrid, x: int, y: int) -> int:
         tile = grid.get(x, y)
-        if not isinstance(tile, NumberedHexTile):
+        if tile.kind < _TERRAIN_KIND:
             return 0
         return sum(
             1
             for constraint in self._forbidden_number_adjacencies
             if tile.number in constraint
             for near_tile in grid.neighbors(x, y)
-            if isinstance(near_tile, NumberedHexTile) and near_tile.number in constraint
+            if near_tile.kind >= _TERRAIN_KIND and near_tile.number in constraint
         )
 
     def _grid_violation(self, grid: HexGrid) -> int:
-        return sum(self._tile_violation(grid, x, y) for x, y in spiral_ordered_indexes(Direction.EAST, 2))
+        return sum(self._tile_violation(grid, x, y) for x, y in self._land_indexes)
 
     def _select_violating_index(self) -> Tuple[int, int]:
-        indexes = list(spiral_ordered_indexes(Direction.EAST, 2))
-        return indexes[_roulette_wheel_selection([self._tile_violation(self.grid, x, y) for x, y in indexes])]
+        indexes = self._land_indexes
+        return indexes[
+            _roulette_wheel_selection([self._tile_violation(self.grid, x, y) for x, y in indexes], self._rng)
+        ]
 
     def _is_valid_swap(self, x_repair: int, y_repair: int, x_swap: int, y_swap: int) -> bool:
         return True
 
+    def _swap_tiles(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        tile1 = self.grid.get(x1, y1)
+        self.grid.set(x1, y1, self.grid.get(x2, y2))
+        self.grid.set(x2, y2, tile1)
+
+    def _swap_violation_delta(self, x_repair: int, y_repair: int, x_swap: int, y_swap: int) -> int:
+        # Only the swapped tiles and their land neighbors can change their violation
+        affected_indexes = set(
+            it.chain(
+                ((x_repair, y_repair), (x_swap, y_swap)),
+                self.grid.neighbor_indexes(x_repair, y_repair),
+                self.grid.neighbor_indexes(x_swap, y_swap)
+            )
+        )
+        land_indexes = [idx for idx in affected_indexes if index_radius(*idx) < self._radius]
+        violation_before = sum(self._tile_violation(self.grid, x, y) for x, y in land_indexes)
+        self._swap_tiles(x_repair, y_repair, x_swap, y_swap)
+        violation_after = sum(self._tile_violation(self.grid, x, y) for x, y in land_indexes)
+        self._swap_tiles(x_repair, y_repair, x_swap, y_swap)
+        return violation_after - violation_before
+
     def _fix_violations(self) -> bool:
-        logging.info(f":initial-violation {self._grid_violation(self.grid)}")
+        violation = self._grid_violation(self.grid)
+        logging.info(":initial-violation %d", violation)
+        trajectory = self.stats.start_attempt(violation) if self.stats is not None else None
+        self._track_best_grid(violation)
         fix_iter = 0
-        while self._grid_violation(self.grid) > 0 and fix_iter < _RESTART_THRESHOLD:
+        while violation > 0 and fix_iter < _RESTART_THRESHOLD:
+            if self._past_deadline():
+                break
             idx_repair = self._select_violating_index()
-            tile_repair = self.grid.get(*idx_repair)
-            assert isinstance(tile_repair, NumberedHexTile)
-            swapped_grids = []
-            valid_swap_it = iter(
-                idx for idx in spiral_ordered_indexes(Direction.EAST, 2)
-                if idx_repair != idx and self._is_valid_swap(*idx_repair, *idx)
-            )
-            for idx_swap in valid_swap_it:
-                tile_swap = self.grid.get(*idx_swap)
-                if isinstance(tile_swap, NumberedHexTile):
-                    new_grid = deepcopy(self.grid)
-                    new_grid.set(*idx_repair, tile_swap.__class__(tile_swap.number))
-                    new_grid.set(*idx_swap, tile_repair.__class__(tile_repair.number))
-                    swapped_grids.append(new_grid)
-            grid_viols = list(map(self._grid_violation, swapped_grids))
-            min_viol = min(grid_viols)
-            min_viol_grids = [grid for grid, viol in zip(swapped_grids, grid_viols) if viol == min_viol]
-            self.grid = random.choice(min_viol_grids)
+            assert self.grid.get(*idx_repair).kind >= _TERRAIN_KIND
+            idxs_swap = [
+                idx for idx in self._land_indexes
+                if idx_repair != idx and self._is_valid_swap(*idx_repair, *idx) and
+                self.grid.get(*idx).kind >= _TERRAIN_KIND
+            ]
+            swap_deltas = [self._swap_violation_delta(*idx_repair, *idx_swap) for idx_swap in idxs_swap]
+            min_delta = min(swap_deltas)
+            min_delta_idxs = [idx for idx, delta in zip(idxs_swap, swap_deltas) if delta == min_delta]
+            self._swap_tiles(*idx_repair, *self._rng.choice(min_delta_idxs))
+            violation += min_delta
             fix_iter += 1
-            logging.info(f":fix-iteration {fix_iter} :new-violation {min_viol}")
-        return fix_iter < _RESTART_THRESHOLD
+            logging.info(":fix-iteration %d :new-violation %d", fix_iter, violation)
+            if trajectory is not None:
+                trajectory.append(violation)
+            self._track_best_grid(violation)
+        # Repairs interrupted by the deadline fail, as do those reaching the restart threshold
+        return violation == 0 and fix_iter < _RESTART_THRESHOLD
@@ -1,166 +1,261 @@
-import math
-from typing import Tuple, Union
+import io
+import logging
+import os
+from functools import lru_cache
+from typing import IO, Any, Dict, Hashable, Mapping, Optional, Tuple, Union
 
 from PIL import Image, ImageDraw, ImageFont
 
 from catanpg.base.board import BaseBoard
+from catanpg.base.board_style import (
+    FONT_NAMES,
+    HEX_EDGE_LENGTH,
+    LINE_SEGMENT_THICKNESS,
+    NUMBER_CIRCLE_COLOR,
+    NUMBER_CIRCLE_RADIUS,
+    NUMBER_FONT_SIZE,
+    PORT_CIRCLE_RADIUS,
+    PORT_COLOR,
+    PORT_FONT_SIZE,
+    Color,
+    axial_to_pixel,
+    hex_tile_color,
+    hexagon_points,
+    image_size,
+    pixel_at_distance,
+    port_label,
+)
 from catanpg.base.hex_tile import (
-    BrickHarborTile,
-    DesertTile,
-    FieldsTile,
-    ForestTile,
-    GrainHarborTile,
     HarborTile,
     HexTile,
-    HillsTile,
-    LumberHarborTile,
-    MountainsTile,
     NumberedHexTile,
     NumberOrNumbers,
-    OreHarborTile,
-    PastureTile,
     SeaTile,
-    ThreeOneHarborTile,
-    WoolHarborTile,
+    TileKind,
+)
+from catanpg.base.sprite_atlas import SpriteAtlas, SpriteRenderer, paste_sprite
+from catanpg.hex_grid import (
+    Direction,
+    direction_to_angle,
+    ring_index_table,
+    spiral_index_table,
 )
-from catanpg.hex_grid import Direction, direction_to_angle, spiral_ordered_indexes
-
-Color = Union[str, Tuple[int, int, int, int]]
-
-NUMBER_CIRCLE_COLOR = (255, 255, 204, 0)
 
-_HEX_EDGE_LENGTH = 40
-_LINE_SEGMENT_THICKNESS = 6
-_PORT_CIRCLE_RADIUS = 12
-_PORT_FONT_SIZE = 17
-_PORT_COLOR = (255, 223, 128, 0)
+# Kinds of the tiles drawn as plain sea hexes, as on a background
+_SEA_KINDS = (TileKind.SEA, TileKind.HARBOR)
 
+DEFAULT_ENCODER_OPTIONS: Mapping[str, Mapping[str, Any]] = {"PNG": {"compress_level": 1}}
 
-def _degrees_to_radians(degrees: float) -> float:
-    return math.pi/180 * degrees
+Font = Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]
 
 
-def _pixel_at_distance(x: int, y: int, distance: float, angle_degrees: float) -> Tuple[int, int]:
-    angle_rad = _degrees_to_radians(angle_degrees)
-    return int(x + distance*math.cos(angle_rad)), int(y - distance*math.sin(angle_rad))
+@lru_cache(maxsize=None)
+def get_font(size: int) -> Font:
+    # Falling back to Pillow's default bitmap font if none is installed
+    for font_name in FONT_NAMES:
+        try:
+            return ImageFont.truetype(font_name, size)
+        except OSError:
+            continue
+    logging.warning(f":font-not-found {FONT_NAMES} :using-default-font")
+    return ImageFont.load_default()
 
 
-def _axial_to_pixel(x: int, y: int, radius: int) -> Tuple[int, int]:
-    return 50 + 100*radius + 36*y + 72*x, 100*(2*radius+1) - 50 - 100*radius + 62*y
+def _opaque(color: Color) -> Color:
+    # Colors are declared with a zero alpha, which RGB images ignore but RGBA sprites must not
+    return color if isinstance(color, str) else (*color[:3], 255)
 
 
 def _draw_hexagon(draw: ImageDraw, center_x: int, center_y: int, fill: Color) -> None:
-    x: float = center_x
-    y: float = center_y-_HEX_EDGE_LENGTH
-    hexagon = []
-    for angle in range(0, 360, 60):
-        x += math.cos(math.radians(angle+30)) * _HEX_EDGE_LENGTH
-        y += math.sin(math.radians(angle+30)) * _HEX_EDGE_LENGTH
-        hexagon.append((x, y))
-    draw.polygon(hexagon, outline='black', fill=fill)
+    draw.polygon(hexagon_points(center_x, center_y), outline='black', fill=_opaque(fill))
 
 
 def _draw_to_corner_line_segment(draw: ImageDraw, center_x: int, center_y: int, angle: float, fill: Color) -> None:
-    line_edge_x, line_edge_y = _pixel_at_distance(center_x, center_y, _HEX_EDGE_LENGTH, angle)
-    draw.line((center_x, center_y, line_edge_x, line_edge_y), fill, _LINE_SEGMENT_THICKNESS)
-
-
-def _get_port_label(tile: HarborTile) -> str:
-    match tile:
-        case ThreeOneHarborTile():
-            return "3"
-        case WoolHarborTile():
-            return "W"
-        case LumberHarborTile():
-            return "L"
-        case OreHarborTile():
-            return "O"
-        case GrainHarborTile():
-            return "G"
-        case BrickHarborTile():
-            return "B"
-        case _:
-            raise ValueError(f"Unknown harbor type {tile.__class__.__name__}")
+    line_edge_x, line_edge_y = pixel_at_distance(center_x, center_y, HEX_EDGE_LENGTH, angle)
+    draw.line((center_x, center_y, line_edge_x, line_edge_y), _opaque(fill), LINE_SEGMENT_THICKNESS)
 
 
 class BaseBoardImage:
+    """Image of a board, composed of sprites shared by all board images of the same class.
 
-    def __init__(self, board: BaseBoard) -> None:
+    The sprites of an element are drawn by the `_draw_*` methods, which take the target to draw on.
+    """
+
+    _sprite_atlas = SpriteAtlas()
+    # Backgrounds by image class, board radius and scale
+    _backgrounds: Dict[Tuple[type, int, float], Image.Image] = {}
+
+    def __init__(
+        self,
+        board: BaseBoard,
+        encoder_options: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        scale: float = 1
+    ) -> None:
         self._board = board
-        radius = board.grid.radius
-        self._image = Image.new('RGB', (100*(2*radius+1), 100*(2*radius+1)), 'white')
-        self._draw = ImageDraw.Draw(self._image)
+        self._encoder_options = encoder_options if encoder_options is not None else DEFAULT_ENCODER_OPTIONS
+        self._scale = scale
+        self._image: Optional[Image.Image] = None
 
-    def _draw_text(self, center_x: int, center_y: int, text: str, size: int) -> None:
-        text_font = ImageFont.truetype("arial", size)
-        w, h = self._draw.textsize(text, font=text_font)
-        self._draw.text((center_x-w/2, center_y-h/2), text, fill='black', font=text_font)
+    @property
+    def size(self) -> int:
+        return round(image_size(self._board.grid.radius)*self._scale)
 
-    def _draw_circle(self, center_x: int, center_y: int, radius: int, fill: Color) -> None:
-        self._draw.ellipse(
+    def _draw_text(self, draw: ImageDraw.ImageDraw, center_x: int, center_y: int, text: str, size: int) -> None:
+        text_font = get_font(size)
+        w, h = draw.textsize(text, font=text_font)
+        draw.text((center_x-w/2, center_y-h/2), text, fill='black', font=text_font)
+
+    def _draw_circle(self, draw: ImageDraw.ImageDraw, center_x: int, center_y: int, radius: int, fill: Color) -> None:
+        draw.ellipse(
             ((center_x-radius, center_y-radius), (center_x+radius, center_y+radius)),
             outline='black',
-            fill=fill
+            fill=_opaque(fill)
         )
 
-    def _draw_empty_number_circle(self, center_x: int, center_y: int, radius: int) -> None:
-        self._draw_circle(center_x, center_y, radius, NUMBER_CIRCLE_COLOR)
+    def _draw_empty_number_circle(self, draw: ImageDraw.ImageDraw, center_x: int, center_y: int, radius: int) -> None:
+        self._draw_circle(draw, center_x, center_y, radius, NUMBER_CIRCLE_COLOR)
 
     def _get_hex_tile_color(self, tile: HexTile) -> Color:
-        match tile:
-            case DesertTile():
-                return (255, 223, 128, 0)
-            case SeaTile():
-                return (0, 46, 184, 0)
-            case ForestTile():
-                return (0, 128, 0, 0)
-            case HillsTile():
-                return (204, 102, 0, 0)
-            case PastureTile():
-                return (36, 255, 36, 0)
-            case MountainsTile():
-                return (0, 214, 214, 0)
-            case FieldsTile():
-                return (240, 240, 0, 0)
-            case _:
-                raise ValueError(f"Unknown tile type {tile.__class__.__name__}")
-
-    def _draw_number_circle(self, center_x: int, center_y: int, number: NumberOrNumbers) -> None:
+        return hex_tile_color(tile)
+
+    def _draw_number_circle(
+        self,
+        draw: ImageDraw.ImageDraw,
+        center_x: int,
+        center_y: int,
+        number: NumberOrNumbers
+    ) -> None:
         if not isinstance(number, int):
             raise ValueError(f"Base board should only contain a single number per tile (got {number})")
-        self._draw_empty_number_circle(center_x, center_y, 20)
-        self._draw_text(center_x, center_y, str(number), 30)
+        self._draw_empty_number_circle(draw, center_x, center_y, NUMBER_CIRCLE_RADIUS)
+        self._draw_text(draw, center_x, center_y, str(number), NUMBER_FONT_SIZE)
 
-    def _draw_hex_tile(self, center_x: int, center_y: int, tile: HexTile) -> None:
-        _draw_hexagon(self._draw, center_x, center_y, self._get_hex_tile_color(tile))
-        if isinstance(tile, NumberedHexTile):
-            self._draw_number_circle(center_x, center_y, tile.number)
-
-    def _draw_port(self, center_x: int, center_y: int, tile: HarborTile) -> None:
+    def _draw_port(self, draw: ImageDraw.ImageDraw, center_x: int, center_y: int, tile: HarborTile) -> None:
         _draw_to_corner_line_segment(
-            self._draw,
+            draw,
             center_x,
             center_y,
             direction_to_angle(tile.orientation)+30,
-            _PORT_COLOR
+            PORT_COLOR
         )
         _draw_to_corner_line_segment(
-            self._draw,
+            draw,
             center_x,
             center_y,
             direction_to_angle(tile.orientation)-30,
-            _PORT_COLOR
+            PORT_COLOR
         )
-        self._draw_circle(center_x, center_y, _PORT_CIRCLE_RADIUS, _PORT_COLOR)
-        self._draw_text(center_x, center_y, _get_port_label(tile), _PORT_FONT_SIZE)
+        self._draw_circle(draw, center_x, center_y, PORT_CIRCLE_RADIUS, PORT_COLOR)
+        self._draw_text(draw, center_x, center_y, port_label(tile), PORT_FONT_SIZE)
 
-    def show(self) -> None:
+    def _paste_sprite(
+        self,
+        image: Image.Image,
+        center_x: int,
+        center_y: int,
+        key: Hashable,
+        render: SpriteRenderer
+    ) -> None:
+        # Subclasses may draw the same element differently, so sprites are keyed by image class too
+        sprite = self._sprite_atlas.sprite((type(self), key), self._scale, render)
+        paste_sprite(image, center_x, center_y, sprite)
+
+    def _paste_hex(self, image: Image.Image, center_x: int, center_y: int, tile: HexTile) -> None:
+        color = self._get_hex_tile_color(tile)
+        self._paste_sprite(
+            image, center_x, center_y, ("hex", color), lambda draw, x, y: _draw_hexagon(draw, x, y, color)
+        )
+
+    def _paste_hex_tile(self, image: Image.Image, center_x: int, center_y: int, tile: HexTile) -> None:
+        self._paste_hex(image, center_x, center_y, tile)
+        if isinstance(tile, NumberedHexTile):
+            number = tile.number
+            self._paste_sprite(
+                image,
+                center_x,
+                center_y,
+                ("number", number),
+                lambda draw, x, y: self._draw_number_circle(draw, x, y, number)
+            )
+
+    def _paste_port(self, image: Image.Image, center_x: int, center_y: int, tile: HarborTile) -> None:
+        self._paste_sprite(
+            image,
+            center_x,
+            center_y,
+            ("port", port_label(tile), tile.orientation),
+            lambda draw, x, y: self._draw_port(draw, x, y, tile)
+        )
+
+    def _pixel(self, x: int, y: int, origin_x: int, origin_y: int) -> Tuple[int, int]:
+        pixel_x, pixel_y = axial_to_pixel(x, y, self._board.grid.radius)
+        return origin_x + round(pixel_x*self._scale), origin_y + round(pixel_y*self._scale)
+
+    def background(self) -> Image.Image:
+        """Image of what all boards of the same class, radius and scale look like: their outermost ring, all plain sea.
+
+        Backgrounds are rendered once and shared, so they must not be modified.
+        """
         radius = self._board.grid.radius
-        for x, y in spiral_ordered_indexes(Direction.EAST, radius):
+        key = (type(self), radius, self._scale)
+        background = self._backgrounds.get(key)
+        if background is None:
+            background = Image.new('RGB', (self.size, self.size), 'white')
+            for x, y in ring_index_table(Direction.EAST, radius):
+                self._paste_hex(background, *self._pixel(x, y, 0, 0), SeaTile())
+            # Concurrent renders of the same background are identical, so the last one can safely win
+            self._backgrounds[key] = background
+        return background
+
+    def draw_on(self, image: Image.Image, origin_x: int = 0, origin_y: int = 0, over_background: bool = False) -> None:
+        """Draw the board on `image`, with its top left corner at the given pixel.
+
+        With `over_background`, the `background` is taken to be already there, so plain sea hexes are not drawn again
+        (only harbor ports, and whatever else is not plain sea). Boards drawn on disjoint regions of the same image may
+        be drawn concurrently.
+        """
+        for x, y in spiral_index_table(Direction.EAST, self._board.grid.radius):
             hex_tile = self._board.grid.get(x, y)
             assert isinstance(hex_tile, HexTile)
-            pixel = _axial_to_pixel(x, y, radius)
-            self._draw_hex_tile(*pixel, hex_tile)
+            pixel_x, pixel_y = self._pixel(x, y, origin_x, origin_y)
+            if not over_background or hex_tile.kind not in _SEA_KINDS:
+                self._paste_hex_tile(image, pixel_x, pixel_y, hex_tile)
             if isinstance(hex_tile, HarborTile):
-                self._draw_port(*pixel, hex_tile)
-        self._image.show()
+                self._paste_port(image, pixel_x, pixel_y, hex_tile)
+
+    def render(self) -> Image.Image:
+        if self._image is None:
+            image = Image.new('RGB', (self.size, self.size), 'white')
+            self.draw_on(image)
+            self._image = image
+        return self._image
+
+    def _save_options(self, format: str, options: Mapping[str, Any]) -> Dict[str, Any]:
+        return {**self._encoder_options.get(format.upper(), {}), **options}
+
+    def save(self, fp: Union[str, "os.PathLike[str]", IO[bytes]], format: Optional[str] = None, **options: Any) -> None:
+        """Render the board and write it to a path or binary file object.
+
+        The format is taken from the path extension if not given. `options` override the encoder options given for that
+        format at construction time.
+        """
+        if format is None:
+            if not isinstance(fp, (str, os.PathLike)):
+                raise ValueError("The image format must be given when saving to a file object")
+            extension = os.path.splitext(fp)[1].lower()
+            try:
+                format = Image.registered_extensions()[extension]
+            except KeyError:
+                raise ValueError(f"Unknown image format for extension '{extension}'") from None
+        self.render().save(fp, format=format, **self._save_options(format, options))
+
+    def to_bytes(self, format: str, **options: Any) -> bytes:
+        stream = io.BytesIO()
+        self.save(stream, format=format, **options)
+        return stream.getvalue()
+
+    def to_png_bytes(self, **options: Any) -> bytes:
+        return self.to_bytes("PNG", **options)
+
+    def show(self) -> None:
+        self.render().show()
@@ -0,0 +1,98 @@
+"""Colors, labels and geometry of board drawings, shared by the raster and vector renderers (without Pillow)."""
+import math
+from typing import Tuple, Union
+
+from catanpg.base.hex_tile import (
+    BrickHarborTile,
+    DesertTile,
+    FieldsTile,
+    ForestTile,
+    GrainHarborTile,
+    HarborTile,
+    HexTile,
+    HillsTile,
+    LumberHarborTile,
+    MountainsTile,
+    OreHarborTile,
+    PastureTile,
+    SeaTile,
+    ThreeOneHarborTile,
+    WoolHarborTile,
+)
+
+Color = Union[str, Tuple[int, int, int, int]]
+
+NUMBER_CIRCLE_COLOR = (255, 255, 204, 0)
+PORT_COLOR = (255, 223, 128, 0)
+
+HEX_EDGE_LENGTH = 40
+LINE_SEGMENT_THICKNESS = 6
+NUMBER_CIRCLE_RADIUS = 20
+NUMBER_FONT_SIZE = 30
+PORT_CIRCLE_RADIUS = 12
+PORT_FONT_SIZE = 17
+
+# Fonts are tried in order
+FONT_NAMES = ("arial", "DejaVuSans")
+
+
+def image_size(radius: int) -> int:
+    return 100*(2*radius+1)
+
+
+def pixel_at_distance(x: int, y: int, distance: float, angle_degrees: float) -> Tuple[int, int]:
+    angle_rad = math.pi/180 * angle_degrees
+    return int(x + distance*math.cos(angle_rad)), int(y - distance*math.sin(angle_rad))
+
+
+def axial_to_pixel(x: int, y: int, radius: int) -> Tuple[int, int]:
+    return 50 + 100*radius + 36*y + 72*x, 100*(2*radius+1) - 50 - 100*radius + 62*y
+
+
+def hexagon_points(center_x: float, center_y: float) -> Tuple[Tuple[float, float], ...]:
+    x = center_x
+    y = center_y-HEX_EDGE_LENGTH
+    hexagon = []
+    for angle in range(0, 360, 60):
+        x += math.cos(math.radians(angle+30)) * HEX_EDGE_LENGTH
+        y += math.sin(math.radians(angle+30)) * HEX_EDGE_LENGTH
+        hexagon.append((x, y))
+    return tuple(hexagon)
+
+
+def hex_tile_color(tile: HexTile) -> Color:
+    match tile:
+        case DesertTile():
+            return (255, 223, 128, 0)
+        case SeaTile():
+            return (0, 46, 184, 0)
+        case ForestTile():
+            return (0, 128, 0, 0)
+        case HillsTile():
+            return (204, 102, 0, 0)
+        case PastureTile():
+            return (36, 255, 36, 0)
+        case MountainsTile():
+            return (0, 214, 214, 0)
+        case FieldsTile():
+            return (240, 240, 0, 0)
+        case _:
+            raise ValueError(f"Unknown tile type {tile.__class__.__name__}")
+
+
+def port_label(tile: HarborTile) -> str:
+    match tile:
+        case ThreeOneHarborTile():
+            return "3"
+        case WoolHarborTile():
+            return "W"
+        case LumberHarborTile():
+            return "L"
+        case OreHarborTile():
+            return "O"
+        case GrainHarborTile():
+            return "G"
+        case BrickHarborTile():
+            return "B"
+        case _:
+            raise ValueError(f"Unknown harbor type {tile.__class__.__name__}")
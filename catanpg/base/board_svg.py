@@ -0,0 +1,144 @@
+"""Vector (SVG) images of boards, drawn like `BaseBoardImage` draws them but without Pillow.
+
+Every shape repeated across tiles (hexagon, number token, port) is declared once in `<defs>` and placed with `<use>`,
+so an image is mostly one short element per tile. Images are streamed element by element to a text file object.
+"""
+import io
+import math
+import os
+from typing import IO, Iterator, Mapping, Union
+
+from catanpg.base.board import BaseBoard
+from catanpg.base.board_style import (
+    HEX_EDGE_LENGTH,
+    LINE_SEGMENT_THICKNESS,
+    NUMBER_CIRCLE_COLOR,
+    NUMBER_CIRCLE_RADIUS,
+    NUMBER_FONT_SIZE,
+    PORT_CIRCLE_RADIUS,
+    PORT_COLOR,
+    PORT_FONT_SIZE,
+    Color,
+    axial_to_pixel,
+    hex_tile_color,
+    hexagon_points,
+    image_size,
+    port_label,
+)
+from catanpg.base.hex_tile import HarborTile, HexTile, NumberedHexTile, NumberOrNumbers
+from catanpg.hex_grid import Direction, direction_to_angle, spiral_index_table
+
+SVG_MEDIA_TYPE = "image/svg+xml"
+
+_FONT_FAMILY = 'Arial,"DejaVu Sans",sans-serif'
+
+
+def svg_color(color: Color) -> str:
+    return color if isinstance(color, str) else "#{:02x}{:02x}{:02x}".format(*color[:3])
+
+
+def _number(value: float) -> str:
+    # Shortest exact enough representation, as coordinates are mostly integers
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+class BaseBoardSvg:
+    """SVG image of a board, `scale` times the size of the board image.
+
+    The elements of a tile are generated by the `_*_elements` methods, which take the tile center.
+    """
+
+    # Font sizes of the text classes of the style sheet
+    _text_font_sizes: Mapping[str, int] = {"number": NUMBER_FONT_SIZE, "port": PORT_FONT_SIZE}
+
+    def __init__(self, board: BaseBoard, scale: float = 1) -> None:
+        self._board = board
+        self._scale = scale
+
+    def _get_hex_tile_color(self, tile: HexTile) -> Color:
+        return hex_tile_color(tile)
+
+    def _text_element(self, center_x: float, center_y: float, text: str, text_class: str) -> str:
+        return f'<text x="{_number(center_x)}" y="{_number(center_y)}" class="{text_class}">{text}</text>'
+
+    def _use_element(self, shape_id: str, center_x: float, center_y: float, fill: Color = "") -> str:
+        fill_attribute = f' fill="{svg_color(fill)}"' if fill else ""
+        return f'<use href="#{shape_id}" x="{_number(center_x)}" y="{_number(center_y)}"{fill_attribute}/>'
+
+    def _defs_elements(self) -> Iterator[str]:
+        text_style = f"text{{font-family:{_FONT_FAMILY};text-anchor:middle;dominant-baseline:central}}"
+        class_styles = "".join(f".{name}{{font-size:{size}px}}" for name, size in self._text_font_sizes.items())
+        yield f"<defs><style>{text_style}{class_styles}</style>"
+        yield from self._shape_elements()
+        yield "</defs>"
+
+    def _shape_elements(self) -> Iterator[str]:
+        points = " ".join(f"{_number(x)},{_number(y)}" for x, y in hexagon_points(0, 0))
+        yield f'<polygon id="hex" points="{points}" stroke="black"/>'
+        yield f'<circle id="token" r="{NUMBER_CIRCLE_RADIUS}" fill="{svg_color(NUMBER_CIRCLE_COLOR)}" stroke="black"/>'
+        # Port facing east, rotated to the orientation of each harbor: segments to the corners on both sides of its
+        # facing side, under the port circle
+        yield f'<g id="port"><g stroke="{svg_color(PORT_COLOR)}" stroke-width="{LINE_SEGMENT_THICKNESS}">'
+        for angle in (math.radians(30), math.radians(-30)):
+            corner_x, corner_y = HEX_EDGE_LENGTH*math.cos(angle), -HEX_EDGE_LENGTH*math.sin(angle)
+            yield f'<line x1="0" y1="0" x2="{_number(corner_x)}" y2="{_number(corner_y)}"/>'
+        yield f'</g><circle r="{PORT_CIRCLE_RADIUS}" fill="{svg_color(PORT_COLOR)}" stroke="black"/></g>'
+
+    def _number_token_elements(self, center_x: float, center_y: float, number: NumberOrNumbers) -> Iterator[str]:
+        if not isinstance(number, int):
+            raise ValueError(f"Base board should only contain a single number per tile (got {number})")
+        yield self._use_element("token", center_x, center_y)
+        yield self._text_element(center_x, center_y, str(number), "number")
+
+    def _port_elements(self, center_x: float, center_y: float, tile: HarborTile) -> Iterator[str]:
+        # SVG angles are clockwise, since the y axis points down
+        yield (
+            f'<use href="#port" transform="translate({_number(center_x)},{_number(center_y)}) '
+            f'rotate({_number(-direction_to_angle(tile.orientation))})"/>'
+        )
+        yield self._text_element(center_x, center_y, port_label(tile), "port")
+
+    def _hex_tile_elements(self, center_x: float, center_y: float, tile: HexTile) -> Iterator[str]:
+        yield self._use_element("hex", center_x, center_y, self._get_hex_tile_color(tile))
+        if isinstance(tile, NumberedHexTile):
+            yield from self._number_token_elements(center_x, center_y, tile.number)
+        if isinstance(tile, HarborTile):
+            yield from self._port_elements(center_x, center_y, tile)
+
+    def elements(self) -> Iterator[str]:
+        """Generate the SVG document, element by element."""
+        radius = self._board.grid.radius
+        size = image_size(radius)
+        scaled_size = _number(size*self._scale)
+        yield (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{scaled_size}" height="{scaled_size}" '
+            f'viewBox="0 0 {size} {size}">'
+        )
+        yield from self._defs_elements()
+        yield f'<rect width="{size}" height="{size}" fill="white"/>'
+        for x, y in spiral_index_table(Direction.EAST, radius):
+            center_x, center_y = axial_to_pixel(x, y, radius)
+            yield from self._hex_tile_elements(center_x, center_y, self._board.grid.get(x, y))
+        yield "</svg>\n"
+
+    def write(self, stream: IO[str]) -> None:
+        """Stream the SVG document to a text file object."""
+        for element in self.elements():
+            stream.write(element)
+
+    def save(self, fp: Union[str, "os.PathLike[str]", IO[str]]) -> None:
+        """Write the SVG document to a path or text file object."""
+        if isinstance(fp, (str, os.PathLike)):
+            with open(fp, "w", encoding="utf-8") as stream:
+                self.write(stream)
+        else:
+            self.write(fp)
+
+    def to_string(self) -> str:
+        stream = io.StringIO()
+        self.write(stream)
+        return stream.getvalue()
+
+    def to_bytes(self) -> bytes:
+        return self.to_string().encode()
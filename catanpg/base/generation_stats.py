@@ -0,0 +1,98 @@
+"""Statistics on the generation of boards."""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class GenerationStats:
+    """Statistics on the generation of a single board.
+
+    Every generation attempt (the first one and each restart) has its own violation trajectory: the grid violation
+    after shuffling the tiles, followed by the violation after each repair iteration. Attempts that cannot complete a
+    board (e.g. when backtracking finds no valid numbers) have an empty trajectory.
+    """
+
+    def __init__(self) -> None:
+        self.violation_trajectories: List[List[int]] = []
+        self.border_shuffle_s = 0.0
+        self.tile_shuffle_s = 0.0
+        self.repair_s = 0.0
+
+    @property
+    def attempts(self) -> int:
+        return len(self.violation_trajectories)
+
+    @property
+    def restarts(self) -> int:
+        return max(0, self.attempts - 1)
+
+    @property
+    def repair_iterations(self) -> int:
+        return sum(max(0, len(trajectory) - 1) for trajectory in self.violation_trajectories)
+
+    @property
+    def total_s(self) -> float:
+        return self.border_shuffle_s + self.tile_shuffle_s + self.repair_s
+
+    def start_attempt(self, initial_violation: Optional[int]) -> List[int]:
+        trajectory = [initial_violation] if initial_violation is not None else []
+        self.violation_trajectories.append(trajectory)
+        return trajectory
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            attr = f"{phase}_s"
+            setattr(self, attr, getattr(self, attr) + time.perf_counter() - start)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "restarts": self.restarts,
+            "repair_iterations": self.repair_iterations,
+            "violation_trajectories": self.violation_trajectories,
+            "border_shuffle_s": self.border_shuffle_s,
+            "tile_shuffle_s": self.tile_shuffle_s,
+            "repair_s": self.repair_s,
+        }
+
+
+class GenerationStatsAggregator:
+    """Running totals of the generation statistics of many boards, in constant memory."""
+
+    def __init__(self) -> None:
+        self.boards = 0
+        self.restarts = 0
+        self.max_restarts = 0
+        self.repair_iterations = 0
+        self.max_repair_iterations = 0
+        self.border_shuffle_s = 0.0
+        self.tile_shuffle_s = 0.0
+        self.repair_s = 0.0
+
+    def add(self, stats: GenerationStats) -> None:
+        self.boards += 1
+        self.restarts += stats.restarts
+        self.max_restarts = max(self.max_restarts, stats.restarts)
+        self.repair_iterations += stats.repair_iterations
+        self.max_repair_iterations = max(self.max_repair_iterations, stats.repair_iterations)
+        self.border_shuffle_s += stats.border_shuffle_s
+        self.tile_shuffle_s += stats.tile_shuffle_s
+        self.repair_s += stats.repair_s
+
+    def as_dict(self) -> Dict[str, Any]:
+        boards = max(1, self.boards)
+        return {
+            "boards": self.boards,
+            "restarts": self.restarts,
+            "mean_restarts": self.restarts / boards,
+            "max_restarts": self.max_restarts,
+            "repair_iterations": self.repair_iterations,
+            "mean_repair_iterations": self.repair_iterations / boards,
+            "max_repair_iterations": self.max_repair_iterations,
+            "border_shuffle_s": self.border_shuffle_s,
+            "tile_shuffle_s": self.tile_shuffle_s,
+            "repair_s": self.repair_s,
+        }
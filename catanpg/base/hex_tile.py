@@ -1,6 +1,14 @@
-"""Hexagonal tiles for the base Catan board."""
+"""Hexagonal tiles for the base Catan board.
+
+Tiles are immutable values. Constructing a tile returns the instance shared by all tiles of the same type and arguments
+(e.g. every `SeaTile()` is the same object), so boards hold references to a few flyweights instead of allocating tiles.
+Changing the number or orientation of a tile means constructing another one (see `HexTileWithOrientation.rotate`).
+"""
+import inspect
 from abc import ABC
-from typing import Any, Tuple, Union
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Dict, Tuple, Type, TypeVar, Union, cast
 
 from catanpg.hex_grid import Direction, rotate_direction
 
@@ -8,87 +16,167 @@ from catanpg.hex_grid import Direction, rotate_direction
 
 NumberOrNumbers = Union[int, Tuple[int, ...]]
 
+_Tile = TypeVar("_Tile", bound="HexTile")
 
-class HexTile(ABC):
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+class TileKind(IntEnum):
+    """Coarse tile categories, for hot paths to dispatch on without `isinstance` checks.
+
+    Numbered kinds come last, so `tile.kind >= TileKind.TERRAIN` tells whether a tile has a number.
+    """
+
+    SEA = 0
+    DESERT = 1
+    HARBOR = 2
+    TERRAIN = 3
+    FISH = 4
+    LAKE = 5
+
+
+_FLYWEIGHTS: Dict[Tuple[type, Tuple[Any, ...]], "HexTile"] = {}
+
+
+@lru_cache(maxsize=None)
+def _fields_signature(cls: type) -> inspect.Signature:
+    return inspect.signature(cls._set_fields)  # type: ignore[attr-defined]
+
+
+def _positional_args(cls: type, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+    # Bound as `_set_fields` (the fields of the tile) would be, raising a TypeError for unknown arguments
+    bound = _fields_signature(cls).bind(None, *args, **kwargs)
+    return tuple(bound.arguments.values())[1:]
+
+
+class HexTile(ABC):
+    __slots__ = ("_args",)
+
+    kind = TileKind.SEA
+    # The arguments the tile was constructed with
+    _args: Tuple[Any, ...]
+
+    def __new__(cls: Type[_Tile], *args: Any, **kwargs: Any) -> _Tile:
+        if kwargs:
+            # Keyword arguments (e.g. `ForestTile(number=5)`) are normalized into the positional flyweight key
+            args = _positional_args(cls, args, kwargs)
+        try:
+            return cast(_Tile, _FLYWEIGHTS[cls, args])
+        except KeyError:
+            pass
+        tile = object.__new__(cls)
+        object.__setattr__(tile, "_args", args)
+        tile._set_fields(*args)
+        _FLYWEIGHTS[cls, args] = tile
+        return tile
+
+    def _set_fields(self) -> None:
         pass
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} tiles are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} tiles are immutable")
+
+    def __reduce__(self) -> Tuple[type, Tuple[Any, ...]]:
+        # Unpickling constructs the tile again, which returns the flyweight of the unpickling process
+        return type(self), self._args
+
+    def __copy__(self: _Tile) -> _Tile:
+        return self
+
+    def __deepcopy__(self: _Tile, memo: Dict[int, Any]) -> _Tile:
+        return self
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(map(repr, self._args))})"
+
 
 class DesertTile(HexTile):
-    pass
+    __slots__ = ()
+
+    kind = TileKind.DESERT
 
 
 class SeaTile(HexTile):
-    pass
+    __slots__ = ()
 
 
 class NumberedHexTile(HexTile, ABC):
+    __slots__ = ("number",)
+
+    kind = TileKind.TERRAIN
+    number: NumberOrNumbers
 
-    def __init__(self, number: NumberOrNumbers, *args: Any, **kwargs: Any):
-        super().__init__(*args, **kwargs)
-        self.number = number
+    def _set_fields(self, number: NumberOrNumbers) -> None:  # type: ignore[override]
+        object.__setattr__(self, "number", number)
 
 
 class ForestTile(NumberedHexTile):
-    pass
+    __slots__ = ()
 
 
 class HillsTile(NumberedHexTile):
-    pass
+    __slots__ = ()
 
 
 class PastureTile(NumberedHexTile):
-    pass
+    __slots__ = ()
 
 
 class MountainsTile(NumberedHexTile):
-    pass
+    __slots__ = ()
 
 
 class FieldsTile(NumberedHexTile):
-    pass
+    __slots__ = ()
 
 
 class HexTileWithOrientation(HexTile, ABC):
+    __slots__ = ("orientation",)
+
+    orientation: Direction
 
-    def __init__(self, direction: Direction, *args: Any, **kwargs: Any):
-        super().__init__(*args, **kwargs)
-        self.orientation = direction
+    def _set_fields(self, direction: Direction) -> None:  # type: ignore[override]
+        object.__setattr__(self, "orientation", Direction(direction))
 
-    def rotate(self, nsteps: int) -> None:
-        self.orientation = rotate_direction(self.orientation, nsteps)
+    def rotate(self: "_OrientedTile", nsteps: int) -> "_OrientedTile":
+        return type(self)(rotate_direction(self.orientation, nsteps))
 
-    def rotate_clockwise(self) -> None:
-        self.rotate(1)
+    def rotate_clockwise(self: "_OrientedTile") -> "_OrientedTile":
+        return self.rotate(1)
 
-    def rotate_counter_clockwise(self) -> None:
-        self.rotate(-1)
+    def rotate_counter_clockwise(self: "_OrientedTile") -> "_OrientedTile":
+        return self.rotate(-1)
+
+
+_OrientedTile = TypeVar("_OrientedTile", bound=HexTileWithOrientation)
 
 
 class HarborTile(HexTileWithOrientation, SeaTile, ABC):
-    pass
+    __slots__ = ()
+
+    kind = TileKind.HARBOR
 
 
 class ThreeOneHarborTile(HarborTile):
-    pass
+    __slots__ = ()
 
 
 class WoolHarborTile(HarborTile):
-    pass
+    __slots__ = ()
 
 
 class LumberHarborTile(HarborTile):
-    pass
+    __slots__ = ()
 
 
 class OreHarborTile(HarborTile):
-    pass
+    __slots__ = ()
 
 
 class GrainHarborTile(HarborTile):
-    pass
+    __slots__ = ()
 
 
 class BrickHarborTile(HarborTile):
-    pass
+    __slots__ = ()
@@ -0,0 +1,99 @@
+"""Placement of numbers on board cells with backtracking and forward checking."""
+import random
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from catanpg.base.hex_tile import NumberOrNumbers
+
+
+def assign_numbers(
+    neighbor_positions: Sequence[Sequence[int]],
+    fixed_neighbor_numbers: Sequence[Sequence[NumberOrNumbers]],
+    numbers: Sequence[NumberOrNumbers],
+    forbidden_adjacencies: Sequence[Set[NumberOrNumbers]],
+    rng: Optional[random.Random] = None
+) -> Optional[List[NumberOrNumbers]]:
+    """Assign one of `numbers` to each cell so that no forbidden adjacency is created, or return None if impossible.
+
+    Cells are given by position and assigned in order. `neighbor_positions` holds, for each cell, the positions of its
+    neighbors among the cells to assign, and `fixed_neighbor_numbers` the numbers of its already placed neighbors.
+
+    Every cell takes the first value that leaves each of its unassigned neighbors at least one allowed value (forward
+    checking), backtracking on dead ends. With `rng`, the values allowed in a cell are tried in random order, each
+    value first with probability proportional to how many of its tokens remain. Without it, values are tried in the
+    order of their next remaining occurrence in `numbers`, so an ordered placement is kept wherever it is valid.
+    """
+    num_cells = len(neighbor_positions)
+    if len(numbers) < num_cells:
+        raise ValueError(f"Cannot assign {len(numbers)} numbers to {num_cells} cells")
+    counts = Counter(numbers)
+    value_constraints = {
+        value: tuple(c for c, constraint in enumerate(forbidden_adjacencies) if value in constraint) for value in counts
+    }
+    # Number of neighbors that forbid each constraint's values in each cell
+    blocked = [
+        [sum(1 for number in fixed_numbers if number in constraint) for constraint in forbidden_adjacencies]
+        for fixed_numbers in fixed_neighbor_numbers
+    ]
+    occurrences: Dict[NumberOrNumbers, List[int]] = defaultdict(list)
+    for pos, number in enumerate(numbers):
+        occurrences[number].append(pos)
+    used: Dict[NumberOrNumbers, int] = Counter()
+
+    def allowed(cell: int, value: NumberOrNumbers) -> bool:
+        return counts[value] > 0 and all(blocked[cell][c] == 0 for c in value_constraints[value])
+
+    def candidates(cell: int) -> Iterator[NumberOrNumbers]:
+        if rng is None:
+            return iter(sorted((v for v in counts if allowed(cell, v)), key=lambda v: occurrences[v][used[v]]))
+        tokens = [value for value, count in counts.items() if allowed(cell, value) for _ in range(count)]
+        rng.shuffle(tokens)
+        return iter(dict.fromkeys(tokens))
+
+    def update(cell: int, value: NumberOrNumbers, delta: int) -> None:
+        for c in value_constraints[value]:
+            for neighbor in neighbor_positions[cell]:
+                blocked[neighbor][c] += delta
+        counts[value] -= delta
+        used[value] += delta
+
+    def forward_check(cell: int) -> bool:
+        return all(
+            any(allowed(neighbor, value) for value in counts)
+            for neighbor in neighbor_positions[cell]
+            if neighbor > cell
+        )
+
+    # Values in the same constraints are interchangeable as far as the remaining cells are concerned, so once a value
+    # fails in a cell, the other values in the same constraints are skipped there (this does not change the result)
+    assignment: List[Optional[NumberOrNumbers]] = [None] * num_cells
+    candidate_stack = [candidates(0)] if num_cells > 0 else []
+    failed_stack: List[Set[Tuple[int, ...]]] = [set()] if num_cells > 0 else []
+    cell = 0
+    while 0 <= cell < num_cells:
+        previous_value = assignment[cell]
+        if previous_value is not None:
+            update(cell, previous_value, -1)
+            assignment[cell] = None
+            failed_stack[cell].add(value_constraints[previous_value])
+        for value in candidate_stack[cell]:
+            if value_constraints[value] in failed_stack[cell]:
+                continue
+            update(cell, value, 1)
+            if forward_check(cell):
+                assignment[cell] = value
+                break
+            update(cell, value, -1)
+            failed_stack[cell].add(value_constraints[value])
+        if assignment[cell] is None:
+            candidate_stack.pop()
+            failed_stack.pop()
+            cell -= 1
+        else:
+            cell += 1
+            if cell < num_cells:
+                candidate_stack.append(candidates(cell))
+                failed_stack.append(set())
+    if cell < 0:
+        return None
+    return [value for value in assignment if value is not None]
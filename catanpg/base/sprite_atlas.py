@@ -0,0 +1,43 @@
+"""Cache of pre-rendered board elements (sprites) to compose board images from."""
+from typing import Callable, Dict, Hashable, Tuple
+
+from PIL import Image, ImageDraw
+
+# Every element of a board fits within the square cell of a single hex tile
+SPRITE_SIZE = 100
+
+SpriteRenderer = Callable[[ImageDraw.ImageDraw, int, int], None]
+
+
+class SpriteAtlas:
+    """Renders every distinct board element once per scale, as an RGBA image whose alpha channel is its mask.
+
+    Sprites are identified by a hashable key, which must be unique to what the element looks like (e.g. the tile color
+    or the token number).
+    """
+
+    def __init__(self) -> None:
+        self._sprites: Dict[Tuple[Hashable, float], Image.Image] = {}
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def sprite(self, key: Hashable, scale: float, render: SpriteRenderer) -> Image.Image:
+        sprite = self._sprites.get((key, scale))
+        if sprite is None:
+            # `render` draws the element centered on the given pixel, at scale 1
+            sprite = Image.new("RGBA", (SPRITE_SIZE, SPRITE_SIZE), (0, 0, 0, 0))
+            render(ImageDraw.Draw(sprite), SPRITE_SIZE//2, SPRITE_SIZE//2)
+            if scale != 1:
+                scaled_size = round(SPRITE_SIZE*scale)
+                sprite = sprite.resize((scaled_size, scaled_size), Image.Resampling.LANCZOS)
+            # Concurrent renders of the same sprite are identical, so the last one can safely win
+            self._sprites[key, scale] = sprite
+        return sprite
+
+    def clear(self) -> None:
+        self._sprites.clear()
+
+
+def paste_sprite(image: Image.Image, center_x: int, center_y: int, sprite: Image.Image) -> None:
+    image.paste(sprite, (center_x - sprite.width//2, center_y - sprite.height//2), sprite)
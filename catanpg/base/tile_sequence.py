@@ -18,9 +18,10 @@ class TileSequence(ABC):
         return iter(self.tiles)
 
     def rotate(self, nsteps: int) -> None:
-        for tile in self.tiles:
-            if isinstance(tile, HexTileWithOrientation):
-                tile.rotate(nsteps)
+        # Tiles are immutable, so rotated tiles replace the original ones
+        self.tiles = [
+            tile.rotate(nsteps) if isinstance(tile, HexTileWithOrientation) else tile for tile in self.tiles
+        ]
 
     def rotate_clockwise(self) -> None:
         self.rotate(1)
@@ -0,0 +1,164 @@
+"""Vectorized generation and evaluation of large batches of boards with NumPy.
+
+A batch of N boards is a pair of (N, cells) integer arrays holding, for every cell of the radius 3 grid (in `HexGrid`
+cell id order), the tile code from `catanpg.encoding` and the number code of the tile. Harbors are not sampled, since
+they have no influence on the number adjacency constraints.
+"""
+import itertools as it
+import random
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from catanpg.base.board import _ORDERED_NUMBERS, BaseBoard
+from catanpg.base.hex_tile import (
+    DesertTile,
+    NumberedHexTile,
+    NumberOrNumbers,
+    SeaTile,
+    TileKind,
+)
+from catanpg.encoding import tile_code
+from catanpg.generation import Board, board_class, board_variant
+from catanpg.hex_grid import Direction, HexGrid, corner_at_distance, spiral_index_table
+from catanpg.tab.hex_tile import LAKE_NUMBERS, FishTile, LakeTile
+
+_RADIUS = 3
+_LAND_RADIUS = 2
+_CHUNK_SIZE = 1 << 16
+
+NO_NUMBER = 0
+_MULTI_NUMBER_CODES: Dict[Tuple[int, ...], int] = {LAKE_NUMBERS: 13}
+# Same candidates, in the same order, as `FishermenOfCatanBoard._place_fixed_tiles` (where `Direction.EAST`, being
+# falsy, also places the lake at the center)
+_LAKE_INDEXES = tuple(
+    corner_at_distance(direction, 1) if direction else (0, 0) for direction in it.chain(Direction, [None])
+)
+
+
+def number_code(number: Optional[NumberOrNumbers]) -> int:
+    if number is None:
+        return NO_NUMBER
+    if isinstance(number, int):
+        return number
+    try:
+        return _MULTI_NUMBER_CODES[number]
+    except KeyError:
+        raise ValueError(f"Numbers {number} have no number code") from None
+
+
+class _VariantTables:
+
+    def __init__(self, variant: Board):
+        # The constraints and the border layout are taken from the board class itself
+        template = board_class(variant).from_grid(HexGrid(_RADIUS), rng=random.Random(0))
+        template._shuffle_borders()
+        grid = template.grid
+        self.num_cells = grid.num_cells
+        self.land_cell_ids = np.array([grid.cell_id(x, y) for x, y in spiral_index_table(Direction.EAST, _LAND_RADIUS)])
+        self.adjacency = np.zeros((self.num_cells, self.num_cells), dtype=np.float32)
+        for cell_id in self.land_cell_ids:
+            self.adjacency[cell_id, list(grid.neighbor_cell_ids(cell_id))] = 1
+        self.constraints = [
+            np.array(sorted(map(number_code, constraint)), dtype=np.int8)
+            for constraint in template._forbidden_number_adjacencies
+        ]
+        land_tile_clss = [
+            tile_cls for tile_cls, amount in template._tile_cls_to_amount.items() for _ in range(amount)
+        ]
+        self.land_tile_codes = np.array(list(map(tile_code, land_tile_clss)), dtype=np.int8)
+        self.numbered_tile_codes = np.array(
+            [tile_code(tile_cls) for tile_cls in set(land_tile_clss) if issubclass(tile_cls, NumberedHexTile)],
+            dtype=np.int8
+        )
+        self.has_lake = len(self.land_tile_codes) < len(self.land_cell_ids)
+        if self.has_lake:
+            assert DesertTile not in land_tile_clss
+            land_positions = {idx: pos for pos, idx in enumerate(spiral_index_table(Direction.EAST, _LAND_RADIUS))}
+            self.lake_positions = np.array([land_positions[idx] for idx in _LAKE_INDEXES])
+        fish_cell_ids = [
+            cell_id for cell_id in range(self.num_cells) if isinstance(grid.get_cell(cell_id), FishTile)
+        ]
+        self.fish_cell_ids = np.array(fish_cell_ids, dtype=np.intp)
+        self.fish_tile_codes = np.array([tile_code(type(grid.get_cell(i))) for i in fish_cell_ids], dtype=np.int8)
+        self.fish_number_codes = np.array([number_code(grid.get_cell(i).number) for i in fish_cell_ids], dtype=np.int8)
+
+
+@lru_cache(maxsize=None)
+def _variant_tables(variant: Board) -> _VariantTables:
+    return _VariantTables(variant)
+
+
+class BoardBatch:
+
+    def __init__(self, variant: Board, terrains: np.ndarray, numbers: np.ndarray):
+        num_cells = _variant_tables(variant).num_cells
+        if terrains.shape != numbers.shape or terrains.ndim != 2 or terrains.shape[1] != num_cells:
+            raise ValueError(f"Terrains and numbers must both have shape (N, {num_cells})")
+        self.variant = variant
+        self.terrains = terrains
+        self.numbers = numbers
+
+    def __len__(self) -> int:
+        return len(self.terrains)
+
+    @classmethod
+    def from_boards(cls, boards: Sequence[BaseBoard]) -> "BoardBatch":
+        variants = {board_variant(type(board)) for board in boards}
+        if len(variants) != 1:
+            raise ValueError("A batch must hold boards of a single variant")
+        variant = variants.pop()
+        num_cells = _variant_tables(variant).num_cells
+        terrains = np.empty((len(boards), num_cells), dtype=np.int8)
+        numbers = np.empty((len(boards), num_cells), dtype=np.int8)
+        for k, board in enumerate(boards):
+            for cell_id in range(num_cells):
+                tile = board.grid.get_cell(cell_id)
+                terrains[k, cell_id] = tile_code(type(tile))
+                numbers[k, cell_id] = number_code(tile.number if tile.kind >= TileKind.TERRAIN else None)
+        return cls(variant, terrains, numbers)
+
+    def violations(self) -> np.ndarray:
+        """Compute, for every board, the same violation count as `BaseBoard._grid_violation`."""
+        tables = _variant_tables(self.variant)
+        violations = np.zeros(len(self), dtype=np.int32)
+        for start in range(0, len(self), _CHUNK_SIZE):
+            numbers = self.numbers[start:start+_CHUNK_SIZE]
+            for constraint in tables.constraints:
+                # Float matrices use BLAS for the product and hold small integer counts exactly
+                constrained = np.isin(numbers, constraint).astype(np.float32)
+                constrained_neighbors = constrained @ tables.adjacency.T
+                chunk_violations = (constrained_neighbors * constrained).sum(axis=1)
+                violations[start:start+_CHUNK_SIZE] += chunk_violations.astype(np.int32)
+        return violations
+
+
+def sample_boards(variant: Board, n: int, seed: Optional[int] = None, ordered_numbers: bool = False) -> BoardBatch:
+    """Shuffle the terrains and numbers of `n` boards at once, with the same distribution as `BaseBoard`."""
+    tables = _variant_tables(variant)
+    rng = np.random.default_rng(seed)
+    num_land_cells = len(tables.land_cell_ids)
+    land_terrains = rng.permuted(np.tile(tables.land_tile_codes, (n, 1)), axis=1)
+    land_numbers = np.full((n, num_land_cells), NO_NUMBER, dtype=np.int8)
+    if tables.has_lake:
+        is_lake = np.zeros((n, num_land_cells), dtype=bool)
+        is_lake[np.arange(n), tables.lake_positions[rng.integers(len(tables.lake_positions), size=n)]] = True
+        shuffled_terrains = land_terrains
+        land_terrains = np.full((n, num_land_cells), tile_code(LakeTile), dtype=np.int8)
+        land_terrains[~is_lake] = shuffled_terrains.ravel()
+        land_numbers[is_lake] = number_code(LAKE_NUMBERS)
+    is_numbered = np.isin(land_terrains, tables.numbered_tile_codes)
+    board_numbers = np.tile(np.array(_ORDERED_NUMBERS, dtype=np.int8), (n, 1))
+    if not ordered_numbers:
+        board_numbers = rng.permuted(board_numbers, axis=1)
+    land_numbers[is_numbered] = board_numbers.ravel()
+    terrains = np.full((n, tables.num_cells), tile_code(SeaTile), dtype=np.int8)
+    numbers = np.full((n, tables.num_cells), NO_NUMBER, dtype=np.int8)
+    terrains[:, tables.land_cell_ids] = land_terrains
+    numbers[:, tables.land_cell_ids] = land_numbers
+    if len(tables.fish_cell_ids) > 0:
+        fish_order = rng.permuted(np.tile(np.arange(len(tables.fish_cell_ids)), (n, 1)), axis=1)
+        terrains[:, tables.fish_cell_ids] = tables.fish_tile_codes[fish_order]
+        numbers[:, tables.fish_cell_ids] = tables.fish_number_codes[fish_order]
+    return BoardBatch(variant, terrains, numbers)
@@ -0,0 +1,382 @@
+"""Benchmarks of board generation, violation repair, hex grid primitives and rendering.
+
+Run with `python -m catanpg.bench` (or `catanpg-bench`). Results can be saved as JSON and compared with a previous run.
+"""
+import argparse
+import fnmatch
+import io
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from copy import deepcopy
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Type
+
+from catanpg.base.board import BaseBoard
+from catanpg.extended.board import ExtendedBoard
+from catanpg.generation import Board, board_class, board_svg_class, generate_boards
+from catanpg.hex_grid import Direction, HexGrid, spiral_index_table
+from catanpg.metrics import evaluate_board
+from catanpg.racing import BoardRacer
+
+BenchmarkOp = Callable[[Any], Any]
+RestartCounter = Callable[[Any], int]
+
+_DEFAULT_NUM_SEEDS = 200
+_SCALING_RADII = (3, 5, 8, 12, 16, 20)
+_MEMORY_ITERATIONS = 10
+_RACING_CHAINS = 4
+_CONTACT_SHEET_BOARDS = 64
+# Runs per sample of the hex grid primitives, which are too fast to time one by one
+_MICRO_REPEAT = 100
+
+
+class Benchmark:
+    """Operation timed once per seed, on the (untimed) result of `setup(seed)`.
+
+    Operations too fast for the timer are run `repeat` times back to back per seed, and their latency is the time of
+    the sample divided by `repeat`. Generation restarts are counted by `restarts`, if given, in a separate untimed pass
+    over the seeds, so that collecting them does not slow the timed operation down. They are summed over all seeds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        op: BenchmarkOp,
+        setup: Callable[[int], Any] = lambda seed: seed,
+        repeat: int = 1,
+        restarts: Optional[RestartCounter] = None
+    ):
+        if repeat < 1:
+            raise ValueError(f"Benchmark operations must run at least once per sample (got {repeat})")
+        self.name = name
+        self.op = op
+        self.setup = setup
+        self.repeat = repeat
+        self.restarts = restarts
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    # Nearest-rank percentile
+    return sorted_values[max(0, math.ceil(q/100 * len(sorted_values)) - 1)]
+
+
+def run_benchmark(benchmark: Benchmark, seeds: Sequence[int], measure_memory: bool = True) -> Dict[str, Any]:
+    # Latencies per operation
+    latencies = []
+    repeats = range(benchmark.repeat)
+    for seed in seeds:
+        arg = benchmark.setup(seed)
+        start = time.perf_counter()
+        for _ in repeats:
+            benchmark.op(arg)
+        latencies.append((time.perf_counter() - start) / benchmark.repeat)
+    # On new setup results, as operations may modify theirs
+    count_restarts = benchmark.restarts
+    restarts = sum(count_restarts(benchmark.setup(seed)) for seed in seeds) if count_restarts is not None else 0
+    result: Dict[str, Any] = {
+        "iterations": len(latencies),
+        "repeat": benchmark.repeat,
+        "total_s": sum(latencies) * benchmark.repeat,
+        "throughput_per_s": len(latencies) / sum(latencies) if sum(latencies) > 0 else math.inf,
+        "restarts": restarts,
+    }
+    latencies.sort()
+    for q in (50, 95, 99):
+        result[f"p{q}_ms"] = _percentile(latencies, q) * 1000
+    if measure_memory:
+        # Tracing slows allocations down, so memory is measured in a separate pass
+        args = [benchmark.setup(seed) for seed in seeds[:_MEMORY_ITERATIONS]]
+        tracemalloc.start()
+        try:
+            for arg in args:
+                benchmark.op(arg)
+            result["peak_memory_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _construct_board(
+    board_cls: Type[BaseBoard],
+    ordered_numbers: bool,
+    collect_stats: bool = False
+) -> Callable[[int], BaseBoard]:
+
+    def _construct(seed: int) -> BaseBoard:
+        return board_cls(ordered_numbers=ordered_numbers, rng=random.Random(seed), collect_stats=collect_stats)
+
+    return _construct
+
+
+def _construct_extended_board(radius: int, collect_stats: bool = False) -> Callable[[int], BaseBoard]:
+
+    def _construct(seed: int) -> BaseBoard:
+        return ExtendedBoard(radius, rng=random.Random(seed), collect_stats=collect_stats)
+
+    return _construct
+
+
+def _race_board(variant: Board, racer: BoardRacer) -> Callable[[int], BaseBoard]:
+
+    def _race(seed: int) -> BaseBoard:
+        # Racing always collects the statistics of its chains, to compare their costs
+        return racer.race(variant, seed).board
+
+    return _race
+
+
+def _generation_restarts(generate: Callable[[int], BaseBoard]) -> RestartCounter:
+
+    def _count(seed: int) -> int:
+        stats = generate(seed).stats
+        assert stats is not None
+        return stats.restarts
+
+    return _count
+
+
+def _shuffled_board(board_cls: Type[BaseBoard]) -> Callable[[int], BaseBoard]:
+
+    def _shuffle(seed: int) -> BaseBoard:
+        board = board_cls.from_grid(HexGrid(3), rng=random.Random(seed))
+        board._shuffle_borders()
+        board._shuffle_tiles(ordered_numbers=False)
+        return board
+
+    return _shuffle
+
+
+def _fix_violations(board: BaseBoard) -> None:
+    board._fix_violations()
+
+
+def _repair_restarts(board: BaseBoard) -> int:
+    return 0 if board._fix_violations() else 1
+
+
+def _generated_board(variant: Board) -> Callable[[int], BaseBoard]:
+
+    def _generate(seed: int) -> BaseBoard:
+        return board_class(variant)(rng=random.Random(seed))
+
+    return _generate
+
+
+def _evaluate(board: BaseBoard) -> None:
+    evaluate_board(board)
+
+
+def _filled_grid(seed: int) -> HexGrid:
+    grid = HexGrid(3)
+    for cell_id in range(grid.num_cells):
+        grid.set_cell(cell_id, seed + cell_id)
+    return grid
+
+
+def _grid_get_set(grid: HexGrid) -> None:
+    for x, y in spiral_index_table(Direction.EAST, grid.radius):
+        grid.set(x, y, grid.get(x, y))
+
+
+def _grid_neighbors(grid: HexGrid) -> None:
+    for x, y in spiral_index_table(Direction.EAST, grid.radius):
+        for _ in grid.neighbors(x, y):
+            pass
+
+
+def _grid_spiral(grid: HexGrid) -> None:
+    for _ in grid.spiral_ordered_hexes(Direction.EAST):
+        pass
+
+
+def _grid_deepcopy(grid: HexGrid) -> None:
+    deepcopy(grid)
+
+
+def _rendering_benchmarks() -> Iterator[Benchmark]:
+    try:
+        from catanpg.base.board_image import BaseBoardImage
+        from catanpg.contact_sheet import ContactSheetRenderer
+    except ImportError:
+        return
+
+    def _generate(seed: int) -> BaseBoard:
+        return BaseBoard(rng=random.Random(seed))
+
+    def _render(board: BaseBoard) -> None:
+        BaseBoardImage(board).render()
+
+    def _render_png(board: BaseBoard) -> None:
+        BaseBoardImage(board).to_png_bytes()
+
+    def _generate_page(seed: int) -> List[BaseBoard]:
+        return generate_boards(Board.BASE, _CONTACT_SHEET_BOARDS, seed)
+
+    def _render_page(boards: List[BaseBoard]) -> None:
+        ContactSheetRenderer(workers=1).render_page(boards)
+
+    yield Benchmark("render/base", _render, _generate)
+    yield Benchmark("render/base-png", _render_png, _generate)
+    # Per page, so per board it compares with render/base divided by the number of boards
+    yield Benchmark(f"render/contact-sheet-{_CONTACT_SHEET_BOARDS}", _render_page, _generate_page)
+
+
+def _render_svg(variant: Board) -> BenchmarkOp:
+
+    def _render(board: BaseBoard) -> None:
+        board_svg_class(variant)(board).write(io.StringIO())
+
+    return _render
+
+
+def benchmarks(resources: ExitStack) -> List[Benchmark]:
+    """Return the benchmark suite, whose shared resources (e.g. thread pools) are closed along with `resources`."""
+    suite = []
+    # Threads only interleave the chains, so this measures the racing overhead unless the interpreter runs them at once
+    racer = resources.enter_context(BoardRacer(_RACING_CHAINS))
+    for variant in Board:
+        board_cls = board_class(variant)
+        name = variant.name.lower()
+        for suffix, ordered_numbers in (("", False), ("-ordered", True)):
+            suite.append(
+                Benchmark(
+                    f"generate/{name}{suffix}",
+                    _construct_board(board_cls, ordered_numbers),
+                    restarts=_generation_restarts(_construct_board(board_cls, ordered_numbers, collect_stats=True))
+                )
+            )
+        race = _race_board(variant, racer)
+        suite.append(
+            Benchmark(f"generate/{name}-race{_RACING_CHAINS}", race, restarts=_generation_restarts(race))
+        )
+        suite.append(
+            Benchmark(
+                f"fix-violations/{name}", _fix_violations, _shuffled_board(board_cls), restarts=_repair_restarts
+            )
+        )
+        suite.append(Benchmark(f"metrics/{name}", _evaluate, _generated_board(variant)))
+        suite.append(Benchmark(f"render/{name}-svg", _render_svg(variant), _generated_board(variant)))
+    # Generation time per cell should stay roughly flat as the radius grows
+    for radius in _SCALING_RADII:
+        suite.append(
+            Benchmark(
+                f"generate/extended-r{radius}",
+                _construct_extended_board(radius),
+                restarts=_generation_restarts(_construct_extended_board(radius, collect_stats=True))
+            )
+        )
+    suite.append(Benchmark("hex-grid/get-set", _grid_get_set, _filled_grid, _MICRO_REPEAT))
+    suite.append(Benchmark("hex-grid/neighbors", _grid_neighbors, _filled_grid, _MICRO_REPEAT))
+    suite.append(Benchmark("hex-grid/spiral", _grid_spiral, _filled_grid, _MICRO_REPEAT))
+    suite.append(Benchmark("hex-grid/deepcopy", _grid_deepcopy, _filled_grid, _MICRO_REPEAT))
+    suite.extend(_rendering_benchmarks())
+    return suite
+
+
+def run_benchmarks(
+    seeds: Sequence[int],
+    patterns: Sequence[str] = ("*",),
+    measure_memory: bool = True
+) -> Dict[str, Any]:
+    results = {}
+    with ExitStack() as resources:
+        for benchmark in benchmarks(resources):
+            if any(fnmatch.fnmatch(benchmark.name, pattern) for pattern in patterns):
+                results[benchmark.name] = run_benchmark(benchmark, seeds, measure_memory)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seeds": [seeds[0], seeds[-1]] if seeds else [],
+        },
+        "results": results,
+    }
+
+
+def format_results(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    header = f"{'benchmark':<28}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'restarts':>10}{'peak KiB':>10}"
+    if baseline is not None:
+        header += f"{'speedup':>10}"
+    lines = [header]
+    for name, result in report["results"].items():
+        line = (
+            f"{name:<28}{result['throughput_per_s']:>12.1f}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+            f"{result['p99_ms']:>10.3f}{result['restarts']:>10}{result.get('peak_memory_kib', math.nan):>10.1f}"
+        )
+        if baseline is not None:
+            baseline_result = baseline["results"].get(name)
+            speedup = (
+                result["throughput_per_s"] / baseline_result["throughput_per_s"] if baseline_result else math.nan
+            )
+            line += f"{speedup:>9.2f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_arguments(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="catanpg-bench", description=__doc__)
+    parser.add_argument(
+        'patterns',
+        nargs='*',
+        default=["*"],
+        help="Only run the benchmarks whose name matches one of these glob patterns (default is all)."
+    )
+    parser.add_argument(
+        '--seeds',
+        type=int,
+        dest='num_seeds',
+        default=_DEFAULT_NUM_SEEDS,
+        help=f"Set the number of seeds each benchmark runs on (default is {_DEFAULT_NUM_SEEDS})."
+    )
+    parser.add_argument(
+        '--first-seed',
+        type=int,
+        dest='first_seed',
+        default=0,
+        help="Set the first seed of the fixed seed set (default is 0)."
+    )
+    parser.add_argument(
+        '--output',
+        dest='output',
+        default=None,
+        help="Save the results as JSON to this file."
+    )
+    parser.add_argument(
+        '--compare',
+        dest='baseline',
+        default=None,
+        help="Compare the results with those of a previous run saved with --output."
+    )
+    parser.add_argument(
+        '--no-memory',
+        action='store_false',
+        dest='measure_memory',
+        default=True,
+        help="Skip the peak memory measurement."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_arguments(argv)
+    seeds = range(args.first_seed, args.first_seed + args.num_seeds)
+    report = run_benchmarks(seeds, args.patterns, args.measure_memory)
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print(format_results(report, baseline))
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,133 @@
+"""Streaming output of many generated boards, as written by the command line bulk mode.
+
+Boards are written as soon as they are generated, each along with the seed it can be regenerated from with
+`generate_board` (or the command line `--seed` option).
+"""
+import json
+import os
+import sys
+from contextlib import nullcontext
+from enum import Enum
+from typing import (
+    IO,
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from catanpg.base.board import BaseBoard
+from catanpg.corpus import corpus_header, encode_record
+from catanpg.encoding import board_to_dict
+from catanpg.generation import Board, board_image_class, iter_boards
+
+Path = Union[str, "os.PathLike[str]"]
+
+STDOUT_PATH = "-"
+
+
+class OutputFormat(Enum):
+    JSONL = "jsonl"
+    BINARY = "binary"
+    PNG_DIR = "png-dir"
+    SHEETS = "sheets"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+def board_record(index: int, seed: int, board: BaseBoard, ordered_numbers: bool) -> Dict[str, Any]:
+    return {"index": index, "seed": seed, "ordered": ordered_numbers, **board_to_dict(board)}
+
+
+def write_jsonl(boards: Iterable[Tuple[int, BaseBoard]], stream: IO[str], ordered_numbers: bool = False) -> int:
+    """Write one JSON record per (seed, board) pair and line, returning the number of records."""
+    count = 0
+    for index, (seed, board) in enumerate(boards):
+        stream.write(json.dumps(board_record(index, seed, board, ordered_numbers)) + "\n")
+        count += 1
+    return count
+
+
+def write_binary(boards: Iterable[Tuple[int, BaseBoard]], stream: IO[bytes]) -> int:
+    """Write a board corpus (see `catanpg.corpus`) of (seed, board) pairs, returning the number of records."""
+    stream.write(corpus_header())
+    count = 0
+    for seed, board in boards:
+        stream.write(encode_record(board, seed))
+        count += 1
+    return count
+
+
+def write_png_dir(boards: Iterable[Tuple[int, BaseBoard]], directory: Path, variant: Board, num_boards: int) -> int:
+    """Save one PNG image per (seed, board) pair in `directory`, named after the board index and seed."""
+    img_cls = board_image_class(variant)
+    os.makedirs(directory, exist_ok=True)
+    width = len(str(max(0, num_boards - 1)))
+    count = 0
+    for index, (seed, board) in enumerate(boards):
+        img_cls(board).save(os.path.join(directory, f"{index:0{width}d}-{seed}.png"))
+        count += 1
+    return count
+
+
+def write_sheets(boards: Iterable[Tuple[int, BaseBoard]], directory: Path) -> int:
+    """Save the (seed, board) pairs as contact sheet pages in `directory` (see `catanpg.contact_sheet`)."""
+    # Imported here, as contact sheets need Pillow
+    from catanpg.contact_sheet import ContactSheetRenderer
+
+    count = 0
+
+    def counted_boards() -> Iterator[BaseBoard]:
+        nonlocal count
+        for _, board in boards:
+            count += 1
+            yield board
+
+    ContactSheetRenderer().save(counted_boards(), directory)
+    return count
+
+
+def open_output(path: Optional[Path], mode: str) -> ContextManager[IO[Any]]:
+    """Open `path` for writing, or standard output if `path` is None or "-" (left open on exit)."""
+    if path is None or path == STDOUT_PATH:
+        return nullcontext(sys.stdout.buffer if "b" in mode else sys.stdout)
+    return open(path, mode)
+
+
+def write_boards(
+    variant: Board,
+    count: int,
+    seed: int,
+    output_format: OutputFormat,
+    path: Optional[Path] = None,
+    ordered_numbers: bool = False,
+    workers: Optional[int] = 1
+) -> int:
+    """Generate `count` boards from `seed` (as `generate_boards` does) and write them to `path` as they are produced.
+
+    The JSONL and binary formats are written to standard output if `path` is None or "-". The PNG and contact sheet
+    formats write a directory, so they need a path.
+    """
+    boards = iter_boards(variant, count, seed, ordered_numbers=ordered_numbers, workers=workers)
+    match output_format:
+        case OutputFormat.JSONL:
+            with open_output(path, "w") as stream:
+                return write_jsonl(boards, stream, ordered_numbers)
+        case OutputFormat.BINARY:
+            with open_output(path, "wb") as stream:
+                return write_binary(boards, stream)
+        case OutputFormat.PNG_DIR:
+            if path is None or path == STDOUT_PATH:
+                raise ValueError("The png-dir format needs an output directory")
+            return write_png_dir(boards, path, variant, count)
+        case OutputFormat.SHEETS:
+            if path is None or path == STDOUT_PATH:
+                raise ValueError("The sheets format needs an output directory")
+            return write_sheets(boards, path)
+        case _:
+            raise ValueError(f"Unknown output format {output_format}")
@@ -0,0 +1,269 @@
+"""Two-tier (memory and disk) LRU cache of generated boards and their rendered PNG images.
+
+Entries are keyed by every generation parameter (variant, ordered numbers, seed and engine) and by the generator
+version, so boards cached by another version of the generator are never served. Those of older versions are removed
+from the disk store when it is opened, along with the temporary files of interrupted writes. Both tiers evict their
+least recently used entries once they exceed their size in bytes.
+"""
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from catanpg.base.board import BaseBoard, GenerationEngine
+from catanpg.encoding import decode_board, encode_board
+from catanpg.generation import (
+    GENERATOR_VERSION,
+    Board,
+    board_image_class,
+    generate_board,
+)
+
+Path = Union[str, "os.PathLike[str]"]
+
+DEFAULT_MEMORY_BYTES = 32 << 20
+DEFAULT_DISK_BYTES = 256 << 20
+
+_ENTRY_NAME_PATTERN = re.compile(r"v(\d+)-.+\.(board|png)")
+_TMP_PREFIX = ".tmp-"
+# Age after which a temporary file is left over from an interrupted write, rather than being written by another process
+_STALE_TMP_S = 3600
+
+
+def default_cache_directory() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "catanpg")
+
+
+class _MemoryStore:
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str) -> Optional[bytes]:
+        data = self._entries.get(name)
+        if data is not None:
+            self._entries.move_to_end(name)
+        return data
+
+    def put(self, name: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(name, None)
+        self.size += len(data) - (len(previous) if previous is not None else 0)
+        self._entries[name] = data
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class _DiskStore:
+    """One file per entry, whose modification time tracks its last use."""
+
+    def __init__(self, directory: Path, max_bytes: int, version: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # File sizes in least recently used order
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        entries = []
+        stale_tmp_mtime = time.time() - _STALE_TMP_S
+        with os.scandir(directory) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.name.startswith(_TMP_PREFIX):
+                    if dir_entry.stat().st_mtime < stale_tmp_mtime:
+                        self._remove(dir_entry.name)
+                    continue
+                match = _ENTRY_NAME_PATTERN.fullmatch(dir_entry.name)
+                if match is None:
+                    continue
+                # Entries of newer versions belong to other processes sharing the store, and are left alone
+                if int(match.group(1)) < version:
+                    self._remove(dir_entry.name)
+                if int(match.group(1)) != version:
+                    continue
+                stat = dir_entry.stat()
+                entries.append((stat.st_mtime, dir_entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._sizes[name] = size
+        self.size = sum(self._sizes.values())
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _remove(self, name: str) -> None:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            # Another process sharing the store got there first
+            pass
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes and self._sizes:
+            name, size = self._sizes.popitem(last=False)
+            self.size -= size
+            self._remove(name)
+
+    def get(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), "rb") as entry_file:
+                data = entry_file.read()
+            os.utime(self._path(name))
+        except FileNotFoundError:
+            return None
+        if name in self._sizes:
+            self._sizes.move_to_end(name)
+        else:
+            # Added by another process sharing the store
+            self._sizes[name] = len(data)
+            self.size += len(data)
+        return data
+
+    def put(self, name: str, data: bytes) -> None:
+        # Written under a temporary name first, so that no process ever reads a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=_TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as entry_file:
+                entry_file.write(data)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.size += len(data) - self._sizes.pop(name, 0)
+        self._sizes[name] = len(data)
+        self._evict()
+
+    def clear(self) -> None:
+        for name in self._sizes:
+            self._remove(name)
+        self._sizes.clear()
+        self.size = 0
+
+
+class BoardCache:
+    """Boards and PNG images looked up in memory, then on disk (if a directory is given), then generated."""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        disk_bytes: int = DEFAULT_DISK_BYTES,
+        version: int = GENERATOR_VERSION
+    ):
+        self.version = version
+        self._memory = _MemoryStore(memory_bytes)
+        self._disk = _DiskStore(directory, disk_bytes, version) if directory is not None else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _entry_name(
+        self,
+        variant: Board,
+        seed: int,
+        ordered_numbers: bool,
+        engine: GenerationEngine,
+        extension: str
+    ) -> str:
+        numbers = "ordered" if ordered_numbers else "random"
+        return f"v{self.version}-{variant.name}-{engine.name}-{numbers}-{seed}.{extension}"
+
+    def _get(self, name: str, count: bool = True) -> Optional[bytes]:
+        # Lookups made on behalf of another one (e.g. the board of a PNG image) are not counted
+        data = self._memory.get(name)
+        if data is not None:
+            self.memory_hits += count
+            return data
+        if self._disk is not None:
+            data = self._disk.get(name)
+            if data is not None:
+                self.disk_hits += count
+                self._memory.put(name, data)
+                return data
+        self.misses += count
+        return None
+
+    def _put(self, name: str, data: bytes) -> None:
+        self._memory.put(name, data)
+        if self._disk is not None:
+            try:
+                self._disk.put(name, data)
+            except OSError as e:
+                logging.warning(f":cache-write-failed {name} :error {e}")
+
+    def board(
+        self,
+        variant: Board,
+        seed: int,
+        ordered_numbers: bool = False,
+        engine: GenerationEngine = GenerationEngine.REPAIR
+    ) -> BaseBoard:
+        """Return the board `generate_board` generates for these parameters.
+
+        Boards are cached in their binary encoding, so every call returns a new board object.
+        """
+        return self._board(variant, seed, ordered_numbers, engine)
+
+    def _board(
+        self,
+        variant: Board,
+        seed: int,
+        ordered_numbers: bool,
+        engine: GenerationEngine,
+        count: bool = True
+    ) -> BaseBoard:
+        name = self._entry_name(variant, seed, ordered_numbers, engine, "board")
+        data = self._get(name, count)
+        if data is not None:
+            return decode_board(data)
+        board = generate_board(variant, seed, ordered_numbers=ordered_numbers, engine=engine)
+        self._put(name, encode_board(board))
+        return board
+
+    def png(
+        self,
+        variant: Board,
+        seed: int,
+        ordered_numbers: bool = False,
+        engine: GenerationEngine = GenerationEngine.REPAIR
+    ) -> bytes:
+        """Return the PNG image of the board `generate_board` generates for these parameters."""
+        name = self._entry_name(variant, seed, ordered_numbers, engine, "png")
+        data = self._get(name)
+        if data is None:
+            board = self._board(variant, seed, ordered_numbers, engine, count=False)
+            data = board_image_class(variant)(board).to_png_bytes()
+            self._put(name, data)
+        return data
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory.size,
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+            "disk_bytes": self._disk.size if self._disk is not None else 0,
+        }
@@ -0,0 +1,104 @@
+"""Contact sheets: many board images laid out in a grid on a few large pages, to review generated boards side by side.
+
+Every board is drawn over the background of its variant (see `BaseBoardImage.background`), pasted as a whole, so only
+the tiles that differ between boards are drawn. Boards are drawn by a thread pool, each into its own region of the page.
+Needs Pillow.
+"""
+import itertools as it
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+from PIL import Image
+
+from catanpg.base.board import BaseBoard
+from catanpg.base.board_image import DEFAULT_ENCODER_OPTIONS, BaseBoardImage
+from catanpg.generation import board_image_class, board_variant
+
+_DEFAULT_COLUMNS = 8
+_DEFAULT_ROWS = 8
+_DEFAULT_SCALE = 0.5
+_DEFAULT_PADDING = 10
+
+
+def _draw_board(page: Image.Image, board_image: BaseBoardImage, origin_x: int, origin_y: int) -> None:
+    page.paste(board_image.background(), (origin_x, origin_y))
+    board_image.draw_on(page, origin_x, origin_y, over_background=True)
+
+
+class ContactSheetRenderer:
+    """Lays out boards in pages of `columns` x `rows` board images, `scale` times their size, `padding` pixels apart.
+
+    The last page only has as many rows as it needs. `workers` is the number of threads drawing boards (`None` uses
+    one per CPU).
+    """
+
+    def __init__(
+        self,
+        columns: int = _DEFAULT_COLUMNS,
+        rows: int = _DEFAULT_ROWS,
+        scale: float = _DEFAULT_SCALE,
+        padding: int = _DEFAULT_PADDING,
+        workers: Optional[int] = None
+    ) -> None:
+        if columns < 1 or rows < 1:
+            raise ValueError(f"Pages need at least one column and one row (got {columns} x {rows})")
+        if padding < 0:
+            raise ValueError(f"The padding cannot be negative (got {padding})")
+        self.columns = columns
+        self.rows = rows
+        self.scale = scale
+        self.padding = padding
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+
+    @property
+    def boards_per_page(self) -> int:
+        return self.columns * self.rows
+
+    def render_page(self, boards: Sequence[BaseBoard], executor: Optional[ThreadPoolExecutor] = None) -> Image.Image:
+        """Render a page of at most `boards_per_page` boards, of any variants of the same radius."""
+        if not 0 < len(boards) <= self.boards_per_page:
+            raise ValueError(f"A page holds 1 to {self.boards_per_page} boards (got {len(boards)})")
+        board_images = [board_image_class(board_variant(type(board)))(board, scale=self.scale) for board in boards]
+        cell_size = board_images[0].size
+        if any(board_image.size != cell_size for board_image in board_images):
+            raise ValueError("All the boards of a page must have the same radius")
+        stride = cell_size + self.padding
+        rows = -(-len(boards) // self.columns)
+        page = Image.new('RGB', (self.columns*stride + self.padding, rows*stride + self.padding), 'white')
+        origins_x = [self.padding + (k % self.columns)*stride for k in range(len(boards))]
+        origins_y = [self.padding + (k // self.columns)*stride for k in range(len(boards))]
+        if executor is None or len(boards) == 1:
+            for args in zip(board_images, origins_x, origins_y):
+                _draw_board(page, *args)
+        else:
+            # Drains the results, so that worker exceptions are raised
+            list(executor.map(_draw_board, it.repeat(page), board_images, origins_x, origins_y))
+        return page
+
+    def render(self, boards: Iterable[BaseBoard]) -> Iterator[Image.Image]:
+        """Render the pages of `boards`, lazily: only the boards of the page being rendered are held."""
+        board_iter = iter(boards)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                page_boards = list(it.islice(board_iter, self.boards_per_page))
+                if not page_boards:
+                    return
+                yield self.render_page(page_boards, executor if self.workers > 1 else None)
+
+    def save(
+        self,
+        boards: Iterable[BaseBoard],
+        directory: Union[str, "os.PathLike[str]"],
+        format: str = "PNG"
+    ) -> List[Path]:
+        """Render the pages of `boards` to `directory` (created if missing) as page-0001.png and so on."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for page_number, page in enumerate(self.render(boards), 1):
+            path = directory / f"page-{page_number:04d}.{format.lower()}"
+            page.save(path, format=format, **DEFAULT_ENCODER_OPTIONS.get(format.upper(), {}))
+            paths.append(path)
+        return paths
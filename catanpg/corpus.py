@@ -0,0 +1,133 @@
+"""Board corpus files: a header followed by fixed-size records of binary encoded boards.
+
+Records are appended in bulk and read back through `mmap`, so any board can be decoded without loading the whole file.
+"""
+import itertools as it
+import mmap
+import os
+import struct
+from types import TracebackType
+from typing import BinaryIO, Iterable, Iterator, Optional, Sequence, Type, Union
+
+from catanpg.base.board import BaseBoard
+from catanpg.encoding import BOARD_ENCODING_SIZE, decode_board, encode_board
+
+_MAGIC = b"CATANPG\0"
+_VERSION = 1
+_HEADER_FORMAT = struct.Struct(">8sHH4x")
+# A record starts with a flag telling whether the board seed is known, followed by that seed
+_RECORD_PREFIX_FORMAT = struct.Struct(">BQ")
+_SEED_FLAG = 1
+# Seeds are stored unsigned in 64 bits
+_MAX_SEED = 2**64 - 1
+
+RECORD_SIZE = _RECORD_PREFIX_FORMAT.size + BOARD_ENCODING_SIZE
+
+Path = Union[str, "os.PathLike[str]"]
+
+
+def corpus_header() -> bytes:
+    return _HEADER_FORMAT.pack(_MAGIC, _VERSION, RECORD_SIZE)
+
+
+def _check_header(header: bytes) -> None:
+    if len(header) < _HEADER_FORMAT.size:
+        raise ValueError("Board corpus is missing its header")
+    magic, version, record_size = _HEADER_FORMAT.unpack_from(header)
+    if magic != _MAGIC:
+        raise ValueError("Not a board corpus file")
+    if version != _VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f"Unsupported board corpus version {version} (record size {record_size})")
+
+
+def _check_seed(seed: Optional[int]) -> None:
+    if seed is not None and not 0 <= seed <= _MAX_SEED:
+        raise ValueError(f"Board corpus seeds must be from 0 to 2**64 - 1 (got {seed})")
+
+
+def encode_record(board: BaseBoard, seed: Optional[int] = None) -> bytes:
+    _check_seed(seed)
+    prefix = _RECORD_PREFIX_FORMAT.pack(_SEED_FLAG if seed is not None else 0, seed if seed is not None else 0)
+    return prefix + encode_board(board)
+
+
+def write_records(
+    stream: BinaryIO,
+    boards: Iterable[BaseBoard],
+    seeds: Optional[Iterable[Optional[int]]] = None
+) -> int:
+    """Write one record per board to a stream positioned after a corpus header, returning the number of records."""
+    records = [
+        encode_record(board, seed)
+        for board, seed in zip(boards, seeds if seeds is not None else it.repeat(None))
+    ]
+    stream.write(b"".join(records))
+    return len(records)
+
+
+def append_to_corpus(
+    path: Path,
+    boards: Sequence[BaseBoard],
+    seeds: Optional[Sequence[Optional[int]]] = None
+) -> None:
+    """Append boards (and their seeds, if known) to a corpus file, creating it if needed."""
+    if seeds is not None and len(seeds) != len(boards):
+        raise ValueError(f"Got {len(seeds)} seeds for {len(boards)} boards")
+    # Checked before the file is opened, so that a bad seed does not leave a new corpus file behind
+    for seed in seeds or ():
+        _check_seed(seed)
+    with open(path, "ab") as stream:
+        if stream.tell() == 0:
+            stream.write(corpus_header())
+        else:
+            with open(path, "rb") as header_stream:
+                _check_header(header_stream.read(_HEADER_FORMAT.size))
+        write_records(stream, boards, seeds)
+
+
+class BoardCorpus:
+    """Read-only, memory-mapped view of a board corpus file."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as stream:
+            if os.fstat(stream.fileno()).st_size == 0:
+                raise ValueError("Board corpus is missing its header")
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self._mmap[:_HEADER_FORMAT.size])
+        self._len = (len(self._mmap) - _HEADER_FORMAT.size) // RECORD_SIZE
+
+    def __enter__(self) -> "BoardCorpus":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType]
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _record_offset(self, k: int) -> int:
+        if k < 0:
+            k += self._len
+        if not 0 <= k < self._len:
+            raise IndexError(f"Board index {k} out of range for a corpus of {self._len} boards")
+        return _HEADER_FORMAT.size + k*RECORD_SIZE
+
+    def seed(self, k: int) -> Optional[int]:
+        flags, seed = _RECORD_PREFIX_FORMAT.unpack_from(self._mmap, self._record_offset(k))
+        return seed if flags & _SEED_FLAG else None
+
+    def __getitem__(self, k: int) -> BaseBoard:
+        offset = self._record_offset(k) + _RECORD_PREFIX_FORMAT.size
+        return decode_board(self._mmap[offset:offset+BOARD_ENCODING_SIZE])
+
+    def __iter__(self) -> Iterator[BaseBoard]:
+        for k in range(self._len):
+            yield self[k]
@@ -0,0 +1,144 @@
+"""Fixed-width binary encoding of generated boards."""
+import struct
+from typing import Any, Dict, Tuple, Type
+
+from catanpg.base.board import BaseBoard
+from catanpg.base.hex_tile import (
+    BrickHarborTile,
+    DesertTile,
+    FieldsTile,
+    ForestTile,
+    GrainHarborTile,
+    HarborTile,
+    HexTile,
+    HillsTile,
+    LumberHarborTile,
+    MountainsTile,
+    NumberedHexTile,
+    OreHarborTile,
+    PastureTile,
+    SeaTile,
+    ThreeOneHarborTile,
+    TileKind,
+    WoolHarborTile,
+)
+from catanpg.generation import Board, board_class, board_variant
+from catanpg.hex_grid import Direction, HexGrid, spiral_index_table
+from catanpg.tab.hex_tile import (
+    LakeTile,
+    Sea4FishTile,
+    Sea5FishTile,
+    Sea6FishTile,
+    Sea8FishTile,
+    Sea9FishTile,
+    Sea10FishTile,
+)
+
+# The position of a tile class in this sequence is its code in the encoding, so new classes must only be appended
+_TILE_CLSS: Tuple[Type[HexTile], ...] = (
+    SeaTile,
+    DesertTile,
+    ForestTile,
+    HillsTile,
+    PastureTile,
+    MountainsTile,
+    FieldsTile,
+    ThreeOneHarborTile,
+    WoolHarborTile,
+    LumberHarborTile,
+    OreHarborTile,
+    GrainHarborTile,
+    BrickHarborTile,
+    Sea4FishTile,
+    Sea5FishTile,
+    Sea6FishTile,
+    Sea8FishTile,
+    Sea9FishTile,
+    Sea10FishTile,
+    LakeTile,
+)
+_TILE_CLS_TO_CODE: Dict[Type[HexTile], int] = {tile_cls: code for code, tile_cls in enumerate(_TILE_CLSS)}
+
+_BOARD_RADIUS = 3
+# Cells are encoded in this order, each as a tile code byte followed by a payload byte (number or orientation)
+_CELL_INDEXES = spiral_index_table(Direction.EAST, _BOARD_RADIUS)
+_HEADER_FORMAT = struct.Struct(">BB")
+
+BOARD_ENCODING_SIZE = _HEADER_FORMAT.size + 2*len(_CELL_INDEXES)
+
+
+def tile_code(tile_cls: Type[HexTile]) -> int:
+    try:
+        return _TILE_CLS_TO_CODE[tile_cls]
+    except KeyError:
+        raise ValueError(f"Tile type {tile_cls.__name__} cannot be encoded") from None
+
+
+def _encode_tile(tile: HexTile) -> Tuple[int, int]:
+    code = tile_code(type(tile))
+    match tile.kind:
+        case TileKind.HARBOR:
+            assert isinstance(tile, HarborTile)
+            return code, tile.orientation
+        case TileKind.TERRAIN:
+            assert isinstance(tile, NumberedHexTile) and isinstance(tile.number, int)
+            return code, tile.number
+        case _:
+            return code, 0
+
+
+def _decode_tile(code: int, payload: int) -> HexTile:
+    try:
+        tile_cls = _TILE_CLSS[code]
+    except IndexError:
+        raise ValueError(f"Unknown tile code {code}") from None
+    match tile_cls.kind:
+        case TileKind.HARBOR:
+            return tile_cls(Direction(payload))
+        case TileKind.TERRAIN:
+            return tile_cls(payload)
+        case _:
+            return tile_cls()
+
+
+def encode_board(board: BaseBoard) -> bytes:
+    if board.grid.radius != _BOARD_RADIUS:
+        raise ValueError(f"Only boards of radius {_BOARD_RADIUS} can be encoded (got {board.grid.radius})")
+    data = bytearray(_HEADER_FORMAT.pack(board_variant(type(board)).value, _BOARD_RADIUS))
+    for x, y in _CELL_INDEXES:
+        data.extend(_encode_tile(board.grid.get(x, y)))
+    return bytes(data)
+
+
+def decode_board(data: bytes) -> BaseBoard:
+    if len(data) != BOARD_ENCODING_SIZE:
+        raise ValueError(f"Encoded boards must have {BOARD_ENCODING_SIZE} bytes (got {len(data)})")
+    variant_value, radius = _HEADER_FORMAT.unpack_from(data)
+    if radius != _BOARD_RADIUS:
+        raise ValueError(f"Only boards of radius {_BOARD_RADIUS} can be decoded (got {radius})")
+    grid = HexGrid(radius)
+    offset = _HEADER_FORMAT.size
+    for x, y in _CELL_INDEXES:
+        grid.set(x, y, _decode_tile(data[offset], data[offset+1]))
+        offset += 2
+    return board_class(Board(variant_value)).from_grid(grid)
+
+
+def _tile_to_dict(x: int, y: int, tile: HexTile) -> Dict[str, Any]:
+    tile_dict: Dict[str, Any] = {"x": x, "y": y, "type": type(tile).__name__}
+    if isinstance(tile, HarborTile):
+        tile_dict["orientation"] = tile.orientation.name
+    if isinstance(tile, NumberedHexTile):
+        tile_dict["number"] = tile.number if isinstance(tile.number, int) else list(tile.number)
+    return tile_dict
+
+
+def board_to_dict(board: BaseBoard) -> Dict[str, Any]:
+    """JSON-serializable description of a board, listing its tiles in spiral order."""
+    return {
+        "variant": board_variant(type(board)).name,
+        "radius": board.grid.radius,
+        "tiles": [
+            _tile_to_dict(x, y, board.grid.get(x, y)) for x, y in spiral_index_table(Direction.EAST, board.grid.radius)
+        ],
+    }
@@ -0,0 +1,296 @@
+"""Enumeration, counting and exactly uniform sampling of the valid layouts of a board.
+
+A layout is the terrain and number of every land tile, plus the fish tile of every sea cell holding one. Whether a
+layout is valid only depends on where the tokens in the forbidden adjacencies go, so layouts are grouped by skeleton:
+the cell of the tile without terrain number (desert or lake) and the cells holding forbidden tokens (the red numbers
+and, for Fishermen of Catan, the 6 and 8 fish). Every valid skeleton expands to the same number of layouts, by
+permuting the remaining terrains, numbers and fish tiles.
+
+Valid skeletons are enumerated once per variant, up to the rotations and reflections of the grid that preserve the
+board structure, and stored as orbit representatives with their orbit sizes. Drawing an integer below the number of
+valid skeletons then selects one exactly uniformly. Harbors have no influence on validity and are shuffled as in
+`BaseBoard`.
+"""
+import bisect
+import itertools as it
+import math
+import random
+from collections import Counter
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from catanpg.base.board import _LAND_RADIUS, _ORDERED_NUMBERS, BaseBoard
+from catanpg.base.hex_tile import HexTile, NumberedHexTile, NumberOrNumbers
+from catanpg.generation import Board, board_class
+from catanpg.hex_grid import (
+    Direction,
+    HexGrid,
+    index_radius,
+    reflect_index,
+    rotate_index,
+    spiral_index_table,
+)
+from catanpg.tab.hex_tile import FishTile, LakeTile
+
+_RADIUS = 3
+
+K = TypeVar("K", bound=Any)
+
+# Cell id permutation of the grid
+Symmetry = Tuple[int, ...]
+# Terrain (or fish) tile class and number of every cell of `LayoutIndex.cell_ids`
+Layout = Tuple[Tuple[Type[HexTile], Optional[NumberOrNumbers]], ...]
+
+
+class Skeleton(NamedTuple):
+    """Cells (as `HexGrid` cell ids) of the tile without terrain number and of the forbidden land and fish tokens."""
+
+    special_cell: int
+    red_cells: Tuple[int, ...]
+    red_fish_cells: Tuple[int, ...]
+
+    def transform(self, symmetry: Symmetry) -> "Skeleton":
+        return Skeleton(
+            symmetry[self.special_cell],
+            tuple(sorted(symmetry[cell_id] for cell_id in self.red_cells)),
+            tuple(sorted(symmetry[cell_id] for cell_id in self.red_fish_cells))
+        )
+
+
+def _symmetries(grid: HexGrid) -> List[Symmetry]:
+    indexes = [grid.cell_index(cell_id) for cell_id in range(grid.num_cells)]
+    symmetries = []
+    for nsteps, reflect in it.product(range(6), (False, True)):
+        transformed = (rotate_index(x, y, nsteps) for x, y in indexes)
+        if reflect:
+            transformed = (reflect_index(x, y) for x, y in transformed)
+        symmetries.append(tuple(grid.cell_id(x, y) for x, y in transformed))
+    return symmetries
+
+
+def _num_arrangements(items: Sequence[Any]) -> int:
+    # Number of distinct orderings of a multiset
+    return math.factorial(len(items)) // math.prod(map(math.factorial, Counter(items).values()))
+
+
+def _independent_sets(
+    candidates: Sequence[int],
+    size: int,
+    neighbor_ids: Sequence[Set[int]]
+) -> Iterator[Tuple[int, ...]]:
+    if size == 0:
+        yield ()
+        return
+    for k in range(len(candidates) - size + 1):
+        cell_id = candidates[k]
+        remaining = [c for c in candidates[k+1:] if c not in neighbor_ids[cell_id]]
+        for rest in _independent_sets(remaining, size - 1, neighbor_ids):
+            yield (cell_id,) + rest
+
+
+def _orbits(
+    keys: Iterable[K],
+    symmetries: Sequence[Symmetry],
+    transform: Callable[[K, Symmetry], K]
+) -> Iterator[Tuple[K, List[K]]]:
+    # Yields every orbit once, sorted, along with its smallest key as representative
+    seen: Set[K] = set()
+    for key in keys:
+        if key not in seen:
+            orbit = sorted({transform(key, symmetry) for symmetry in symmetries})
+            seen.update(orbit)
+            yield orbit[0], orbit
+
+
+def _distinct_permutations(counts: Dict[Any, int], length: int) -> Iterator[Tuple[Any, ...]]:
+    if length == 0:
+        yield ()
+        return
+    for value in list(counts):
+        if counts[value] > 0:
+            counts[value] -= 1
+            for rest in _distinct_permutations(counts, length - 1):
+                yield (value,) + rest
+            counts[value] += 1
+
+
+def _lazy_product(*multisets: Sequence[Any]) -> Iterator[Tuple[Tuple[Any, ...], ...]]:
+    # Same as `itertools.product` over the distinct permutations of each multiset, which it cannot hold in memory
+    if not multisets:
+        yield ()
+        return
+    for permutation in _distinct_permutations(Counter(multisets[0]), len(multisets[0])):
+        for rest in _lazy_product(*multisets[1:]):
+            yield (permutation,) + rest
+
+
+class LayoutIndex:
+    """Valid skeletons of a board variant, reduced by symmetry, and the tables to expand them into layouts."""
+
+    def __init__(self, variant: Board):
+        # The constraints and the border layout are taken from the board class itself
+        template = board_class(variant).from_grid(HexGrid(_RADIUS), rng=random.Random(0))
+        template._shuffle_borders()
+        grid = template.grid
+        constraints = template._forbidden_number_adjacencies
+        if len(constraints) != 1:
+            raise ValueError(f"Enumeration only supports a single forbidden adjacency (got {len(constraints)})")
+        constraint = constraints[0]
+        self.variant = variant
+        self._neighbor_ids = [set(grid.neighbor_cell_ids(cell_id)) for cell_id in range(grid.num_cells)]
+        self.land_cell_ids = tuple(grid.cell_id(x, y) for x, y in spiral_index_table(Direction.EAST, _LAND_RADIUS))
+        self.fish_cell_ids = tuple(
+            cell_id for cell_id in range(grid.num_cells) if isinstance(grid.get_cell(cell_id), FishTile)
+        )
+        self.cell_ids = self.land_cell_ids + self.fish_cell_ids
+
+        land_tile_clss = [tile_cls for tile_cls, amount in template._tile_cls_to_amount.items() for _ in range(amount)]
+        self.terrain_clss = [tile_cls for tile_cls in land_tile_clss if issubclass(tile_cls, NumberedHexTile)]
+        special_tile_clss = [tile_cls for tile_cls in land_tile_clss if not issubclass(tile_cls, NumberedHexTile)]
+        if special_tile_clss:
+            assert len(special_tile_clss) == 1
+            self.special_tile_cls: Type[HexTile] = special_tile_clss[0]
+            special_candidates = self.land_cell_ids
+        else:
+            # Same candidates as `FishermenOfCatanBoard._place_fixed_tiles`: the lake cannot be next to the sea borders
+            self.special_tile_cls = LakeTile
+            special_candidates = tuple(c for c in self.land_cell_ids if index_radius(*grid.cell_index(c)) <= 1)
+        assert len(self.terrain_clss) == len(_ORDERED_NUMBERS) == len(self.land_cell_ids) - 1
+        special_tile = self.special_tile_cls()
+        self.special_number = special_tile.number if isinstance(special_tile, NumberedHexTile) else None
+        special_is_red = self.special_number is not None and self.special_number in constraint
+        self.red_numbers = [number for number in _ORDERED_NUMBERS if number in constraint]
+        self.other_numbers = [number for number in _ORDERED_NUMBERS if number not in constraint]
+        fish_tiles = [grid.get_cell(cell_id) for cell_id in self.fish_cell_ids]
+        self._fish_numbers = {type(tile): tile.number for tile in fish_tiles}
+        self.red_fish_clss = [type(tile) for tile in fish_tiles if tile.number in constraint]
+        self.other_fish_clss = [type(tile) for tile in fish_tiles if tile.number not in constraint]
+        self.layouts_per_skeleton = (
+            _num_arrangements(self.terrain_clss) *
+            _num_arrangements(self.red_numbers) *
+            _num_arrangements(self.other_numbers) *
+            _num_arrangements(self.red_fish_clss) *
+            _num_arrangements(self.other_fish_clss)
+        )
+
+        # Only the symmetries that keep the fish where the borders put them preserve the board structure
+        fish_cells = set(self.fish_cell_ids)
+        self.symmetries = [s for s in _symmetries(grid) if {s[c] for c in fish_cells} == fish_cells]
+        self.representatives: List[Skeleton] = []
+        self.orbit_sizes: List[int] = []
+        for special_cell, special_orbit in _orbits(special_candidates, self.symmetries, lambda c, s: s[c]):
+            stabilizer = [s for s in self.symmetries if s[special_cell] == special_cell]
+            forbidden = self._neighbor_ids[special_cell] if special_is_red else set()
+            skeletons = [
+                Skeleton(special_cell, red_cells, red_fish_cells)
+                for red_fish_cells in it.combinations(self.fish_cell_ids, len(self.red_fish_clss))
+                for red_cells in _independent_sets(
+                    [
+                        c for c in sorted(self.land_cell_ids)
+                        if c != special_cell and c not in forbidden and
+                        not any(c in self._neighbor_ids[fish_cell] for fish_cell in red_fish_cells)
+                    ],
+                    len(self.red_numbers),
+                    self._neighbor_ids
+                )
+            ]
+            for skeleton, skeleton_orbit in _orbits(skeletons, stabilizer, Skeleton.transform):
+                self.representatives.append(skeleton)
+                self.orbit_sizes.append(len(special_orbit) * len(skeleton_orbit))
+        self._cumulative_orbit_sizes = list(it.accumulate(self.orbit_sizes))
+
+    @property
+    def num_skeletons(self) -> int:
+        return self._cumulative_orbit_sizes[-1] if self._cumulative_orbit_sizes else 0
+
+    @property
+    def num_layouts(self) -> int:
+        return self.num_skeletons * self.layouts_per_skeleton
+
+    def orbits(self) -> Iterator[Tuple[Skeleton, int]]:
+        """Iterate over one skeleton per symmetry class, with the number of skeletons in its class."""
+        return zip(self.representatives, self.orbit_sizes)
+
+    def orbit(self, representative: Skeleton) -> List[Skeleton]:
+        return sorted({representative.transform(symmetry) for symmetry in self.symmetries})
+
+    def skeleton(self, k: int) -> Skeleton:
+        """Return the `k`-th valid skeleton, in a fixed order over all `num_skeletons` of them."""
+        if not 0 <= k < self.num_skeletons:
+            raise ValueError(f"Skeleton index {k} out of range [0, {self.num_skeletons})")
+        orbit_idx = bisect.bisect_right(self._cumulative_orbit_sizes, k)
+        offset = k - (self._cumulative_orbit_sizes[orbit_idx - 1] if orbit_idx > 0 else 0)
+        return self.orbit(self.representatives[orbit_idx])[offset]
+
+    def skeletons(self) -> Iterator[Skeleton]:
+        for representative in self.representatives:
+            yield from self.orbit(representative)
+
+    def _layout_cells(self, skeleton: Skeleton) -> Tuple[List[int], List[int], List[int]]:
+        red_cells = set(skeleton.red_cells)
+        terrain_cells = [c for c in self.land_cell_ids if c != skeleton.special_cell]
+        other_cells = [c for c in terrain_cells if c not in red_cells]
+        other_fish_cells = [c for c in self.fish_cell_ids if c not in skeleton.red_fish_cells]
+        return terrain_cells, other_cells, other_fish_cells
+
+    def layouts(self, skeleton: Skeleton) -> Iterator[Layout]:
+        """Iterate over the distinct layouts of a skeleton (`layouts_per_skeleton` of them)."""
+        terrain_cells, other_cells, other_fish_cells = self._layout_cells(skeleton)
+        for terrains, red_numbers, other_numbers, red_fish, other_fish in _lazy_product(
+            self.terrain_clss, self.red_numbers, self.other_numbers, self.red_fish_clss, self.other_fish_clss
+        ):
+            cells: Dict[int, Tuple[Type[HexTile], Optional[NumberOrNumbers]]] = {
+                skeleton.special_cell: (self.special_tile_cls, self.special_number)
+            }
+            numbers = dict(zip(skeleton.red_cells + tuple(other_cells), red_numbers + other_numbers))
+            for cell_id, terrain_cls in zip(terrain_cells, terrains):
+                cells[cell_id] = (terrain_cls, numbers[cell_id])
+            for cell_id, fish_cls in zip(skeleton.red_fish_cells + tuple(other_fish_cells), red_fish + other_fish):
+                cells[cell_id] = (fish_cls, self._fish_numbers[fish_cls])
+            yield tuple(cells[cell_id] for cell_id in self.cell_ids)
+
+    def fill(self, grid: HexGrid, skeleton: Skeleton, rng: random.Random) -> None:
+        """Place a uniformly random layout of `skeleton` on `grid`, replacing its land and fish tiles."""
+        terrain_cells, other_cells, other_fish_cells = self._layout_cells(skeleton)
+        terrains = list(self.terrain_clss)
+        red_numbers = list(self.red_numbers)
+        other_numbers = list(self.other_numbers)
+        red_fish = list(self.red_fish_clss)
+        other_fish = list(self.other_fish_clss)
+        for items in (terrains, red_numbers, other_numbers, red_fish, other_fish):
+            rng.shuffle(items)
+        grid.set_cell(skeleton.special_cell, self.special_tile_cls())
+        numbers = dict(zip(skeleton.red_cells + tuple(other_cells), red_numbers + other_numbers))
+        for cell_id, terrain_cls in zip(terrain_cells, terrains):
+            grid.set_cell(cell_id, terrain_cls(numbers[cell_id]))
+        for cell_id, fish_cls in zip(skeleton.red_fish_cells + tuple(other_fish_cells), red_fish + other_fish):
+            grid.set_cell(cell_id, fish_cls())
+
+
+@lru_cache(maxsize=None)
+def layout_index(variant: Board) -> LayoutIndex:
+    return LayoutIndex(variant)
+
+
+def sample_board(variant: Board, seed: Optional[int] = None) -> BaseBoard:
+    """Draw a board exactly uniformly among the valid layouts of `variant`, from a random stream seeded with `seed`."""
+    index = layout_index(variant)
+    rng = random.Random(seed)
+    board = board_class(variant).from_grid(HexGrid(_RADIUS), rng=rng)
+    board._shuffle_borders()
+    index.fill(board.grid, index.skeleton(rng.randrange(index.num_skeletons)), rng)
+    return board
@@ -0,0 +1 @@
+"""Board generation for extended and custom maps of any radius."""
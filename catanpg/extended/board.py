@@ -0,0 +1,265 @@
+import logging
+import random
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Type, TypeVar, cast
+
+from catanpg.base.board import (
+    _ORDERED_NUMBERS,
+    _RESTART_THRESHOLD,
+    _TILE_CLS_TO_AMOUNT,
+    BaseBoard,
+    GenerationEngine,
+)
+from catanpg.base.hex_tile import (
+    BrickHarborTile,
+    GrainHarborTile,
+    HarborTile,
+    HexTile,
+    LumberHarborTile,
+    NumberedHexTile,
+    NumberOrNumbers,
+    OreHarborTile,
+    SeaTile,
+    ThreeOneHarborTile,
+    TileKind,
+    WoolHarborTile,
+)
+from catanpg.hex_grid import (
+    Direction,
+    HexGrid,
+    index_radius,
+    ring_index_table,
+    step_from_hex,
+)
+
+_T = TypeVar("_T")
+
+_TERRAIN_KIND = TileKind.TERRAIN
+
+_BASE_HARBOR_CLS_TO_AMOUNT: Dict[Type[HarborTile], int] = {
+    ThreeOneHarborTile: 4,
+    WoolHarborTile: 1,
+    LumberHarborTile: 1,
+    OreHarborTile: 1,
+    GrainHarborTile: 1,
+    BrickHarborTile: 1,
+}
+
+# Number of random swap candidates the repair of a violating tile chooses from
+_SWAP_CANDIDATES = 16
+
+
+def num_land_cells(radius: int) -> int:
+    return 3*radius*(radius - 1) + 1
+
+
+def num_harbor_slots(radius: int) -> int:
+    # Every other cell of the outermost ring, as on the base board
+    return 3*radius
+
+
+def scale_amounts(amounts: Mapping[_T, int], total: int) -> Dict[_T, int]:
+    """Scale `amounts` to sum to `total`, keeping their proportions (with largest remainder rounding)."""
+    amounts_total = sum(amounts.values())
+    if amounts_total <= 0:
+        raise ValueError("Cannot scale amounts that do not sum to a positive number")
+    quotas = {key: amount * total / amounts_total for key, amount in amounts.items()}
+    scaled = {key: int(quota) for key, quota in quotas.items()}
+    remainder = total - sum(scaled.values())
+    for key in sorted(quotas, key=lambda key: scaled[key] - quotas[key])[:remainder]:
+        scaled[key] += 1
+    return scaled
+
+
+class _ViolatingCells:
+    """Set of cell ids supporting uniform random choice in constant time."""
+
+    def __init__(self) -> None:
+        self._cell_ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._cell_ids)
+
+    def add(self, cell_id: int) -> None:
+        if cell_id not in self._positions:
+            self._positions[cell_id] = len(self._cell_ids)
+            self._cell_ids.append(cell_id)
+
+    def discard(self, cell_id: int) -> None:
+        position = self._positions.pop(cell_id, None)
+        if position is not None:
+            last = self._cell_ids.pop()
+            if last != cell_id:
+                self._cell_ids[position] = last
+                self._positions[last] = position
+
+    def choice(self, rng: random.Random) -> int:
+        return self._cell_ids[rng.randrange(len(self._cell_ids))]
+
+
+class ExtendedBoard(BaseBoard):
+    """Board of any radius, with base game tiles in the proportions of the base game unless told otherwise.
+
+    `tile_cls_to_amount` must fill all land cells (`num_land_cells(radius)`) and `numbers` must hold one number per
+    numbered tile, in the order they are placed with ordered numbers. By default, both are the base game ones scaled to
+    the board size, numbers repeating the rulebook sequence. Harbors take every other cell of the outermost ring, at
+    most `num_harbor_slots(radius)`, facing a random land neighbor.
+
+    Violations are repaired locally: only the tiles around a swap are re-evaluated and each repair step draws a fixed
+    number of swap candidates, so generation time grows linearly with the number of cells. Only the repair engine is
+    supported, as the backtracking engine reshuffles the remaining numbers of every cell it numbers.
+    """
+
+    def __init__(
+        self,
+        radius: int,
+        tile_cls_to_amount: Optional[Mapping[Type[HexTile], int]] = None,
+        numbers: Optional[Sequence[NumberOrNumbers]] = None,
+        harbor_cls_to_amount: Optional[Mapping[Type[HarborTile], int]] = None,
+        ordered_numbers: bool = False,
+        rng: Optional[random.Random] = None,
+        collect_stats: bool = False,
+        engine: GenerationEngine = GenerationEngine.REPAIR,
+        deadline: Optional[float] = None
+    ) -> None:
+        if engine != GenerationEngine.REPAIR:
+            raise ValueError(f"Extended boards can only be generated with the {GenerationEngine.REPAIR.name} engine")
+        self._set_distributions(radius, tile_cls_to_amount, numbers, harbor_cls_to_amount)
+        super().__init__(
+            ordered_numbers=ordered_numbers, rng=rng, collect_stats=collect_stats, engine=engine, deadline=deadline
+        )
+
+    @classmethod
+    def from_grid(cls, grid: HexGrid, rng: Optional[random.Random] = None) -> "ExtendedBoard":
+        board = cast(ExtendedBoard, super().from_grid(grid, rng=rng))
+        board._set_distributions(grid.radius, None, None, None)
+        return board
+
+    def _set_distributions(
+        self,
+        radius: int,
+        tile_cls_to_amount: Optional[Mapping[Type[HexTile], int]],
+        numbers: Optional[Sequence[NumberOrNumbers]],
+        harbor_cls_to_amount: Optional[Mapping[Type[HarborTile], int]]
+    ) -> None:
+        if radius < 2:
+            raise ValueError(f"The radius of an extended board must be at least 2 (got {radius})")
+        self._radius = radius
+        land_cells = num_land_cells(radius)
+        if tile_cls_to_amount is None:
+            tile_cls_to_amount = scale_amounts(_TILE_CLS_TO_AMOUNT, land_cells)
+        if sum(tile_cls_to_amount.values()) != land_cells:
+            raise ValueError(f"Boards of radius {radius} need {land_cells} land tiles (got {tile_cls_to_amount})")
+        self._tile_amounts = dict(tile_cls_to_amount)
+        num_numbered = sum(
+            amount for tile_cls, amount in tile_cls_to_amount.items() if issubclass(tile_cls, NumberedHexTile)
+        )
+        if numbers is None:
+            numbers = [_ORDERED_NUMBERS[k % len(_ORDERED_NUMBERS)] for k in range(num_numbered)]
+        if len(numbers) != num_numbered:
+            raise ValueError(f"{num_numbered} numbered tiles need as many numbers (got {len(numbers)})")
+        self._number_list = list(numbers)
+        if harbor_cls_to_amount is None:
+            harbor_cls_to_amount = scale_amounts(_BASE_HARBOR_CLS_TO_AMOUNT, num_harbor_slots(radius))
+        if sum(harbor_cls_to_amount.values()) > num_harbor_slots(radius):
+            raise ValueError(f"Boards of radius {radius} have at most {num_harbor_slots(radius)} harbors")
+        self._harbor_amounts = dict(harbor_cls_to_amount)
+
+    @property
+    def _tile_cls_to_amount(self) -> Dict[Type[HexTile], int]:
+        return dict(self._tile_amounts)
+
+    @property
+    def _numbers(self) -> Sequence[NumberOrNumbers]:
+        return self._number_list
+
+    def _shuffle_borders(self) -> None:
+        harbor_clss = [harbor_cls for harbor_cls, amount in self._harbor_amounts.items() for _ in range(amount)]
+        self._rng.shuffle(harbor_clss)
+        for k, (x, y) in enumerate(ring_index_table(Direction.EAST, self._radius)):
+            if k % 2 == 0 and harbor_clss:
+                land_directions = [d for d in Direction if index_radius(*step_from_hex(x, y, d)) < self._radius]
+                self.grid.set(x, y, harbor_clss.pop()(self._rng.choice(land_directions)))
+            else:
+                self.grid.set(x, y, SeaTile())
+
+    def _cell_violation(self, cell_id: int, constraints: Sequence[Set[NumberOrNumbers]]) -> int:
+        # Same as `_tile_violation`, on cell ids
+        tile = self.grid.get_cell(cell_id)
+        if tile.kind < _TERRAIN_KIND:
+            return 0
+        violation = 0
+        for constraint in constraints:
+            if tile.number in constraint:
+                for neighbor_id in self.grid.neighbor_cell_ids(cell_id):
+                    near_tile = self.grid.get_cell(neighbor_id)
+                    violation += near_tile.kind >= _TERRAIN_KIND and near_tile.number in constraint
+        return violation
+
+    def _swap_cells(self, cell_id1: int, cell_id2: int) -> None:
+        tile1 = self.grid.get_cell(cell_id1)
+        self.grid.set_cell(cell_id1, self.grid.get_cell(cell_id2))
+        self.grid.set_cell(cell_id2, tile1)
+
+    def _fix_violations(self) -> bool:
+        grid = self.grid
+        constraints = self._forbidden_number_adjacencies
+        land_cell_ids = [grid.cell_id(x, y) for x, y in self._land_indexes]
+        is_land = [False] * grid.num_cells
+        cell_violations = [0] * grid.num_cells
+        violating = _ViolatingCells()
+        for cell_id in land_cell_ids:
+            is_land[cell_id] = True
+            cell_violations[cell_id] = self._cell_violation(cell_id, constraints)
+            if cell_violations[cell_id] > 0:
+                violating.add(cell_id)
+        numbered_cell_ids = [cell_id for cell_id in land_cell_ids if grid.get_cell(cell_id).kind >= _TERRAIN_KIND]
+        violation = sum(cell_violations)
+        logging.info(":initial-violation %d", violation)
+        trajectory = self.stats.start_attempt(violation) if self.stats is not None else None
+        self._track_best_grid(violation)
+        # The base board repair gets a fixed number of steps for its few violating tiles, larger boards get as many per
+        # violating tile
+        max_iters = _RESTART_THRESHOLD * max(1, len(violating))
+
+        def affected_cell_ids(cell_id1: int, cell_id2: int) -> Set[int]:
+            cell_ids = {cell_id1, cell_id2, *grid.neighbor_cell_ids(cell_id1), *grid.neighbor_cell_ids(cell_id2)}
+            return {cell_id for cell_id in cell_ids if is_land[cell_id]}
+
+        def swap_delta(cell_id1: int, cell_id2: int) -> int:
+            affected = affected_cell_ids(cell_id1, cell_id2)
+            self._swap_cells(cell_id1, cell_id2)
+            delta = sum(self._cell_violation(cell_id, constraints) - cell_violations[cell_id] for cell_id in affected)
+            self._swap_cells(cell_id1, cell_id2)
+            return delta
+
+        fix_iter = 0
+        while violation > 0 and fix_iter < max_iters:
+            if self._past_deadline():
+                break
+            fix_iter += 1
+            cell_repair = violating.choice(self._rng)
+            x_repair, y_repair = grid.cell_index(cell_repair)
+            cells_swap = [
+                cell_id
+                for cell_id in (self._rng.choice(numbered_cell_ids) for _ in range(_SWAP_CANDIDATES))
+                if cell_id != cell_repair and self._is_valid_swap(x_repair, y_repair, *grid.cell_index(cell_id))
+            ]
+            if not cells_swap:
+                continue
+            swap_deltas = [swap_delta(cell_repair, cell_id) for cell_id in cells_swap]
+            min_delta = min(swap_deltas)
+            cell_swap = self._rng.choice([c for c, delta in zip(cells_swap, swap_deltas) if delta == min_delta])
+            self._swap_cells(cell_repair, cell_swap)
+            for cell_id in affected_cell_ids(cell_repair, cell_swap):
+                cell_violations[cell_id] = self._cell_violation(cell_id, constraints)
+                if cell_violations[cell_id] > 0:
+                    violating.add(cell_id)
+                else:
+                    violating.discard(cell_id)
+            violation += min_delta
+            logging.debug(":fix-iteration %d :new-violation %d", fix_iter, violation)
+            if trajectory is not None:
+                trajectory.append(violation)
+            self._track_best_grid(violation)
+        return violation == 0
@@ -0,0 +1,188 @@
+"""Reproducible generation of single boards and batches of boards."""
+import hashlib
+import itertools as it
+import os
+import random
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from enum import Enum, auto
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from catanpg.base.board import BaseBoard, GenerationEngine
+from catanpg.tab.board import FishermenOfCatanBoard
+
+if TYPE_CHECKING:
+    from catanpg.base.board_image import BaseBoardImage
+    from catanpg.base.board_svg import BaseBoardSvg
+    from catanpg.cache import BoardCache
+
+# Version of the generated boards and their images, to be bumped whenever a seed may produce a different board or image
+GENERATOR_VERSION = 1
+
+# Number of boards generated at once by each worker of `iter_boards`
+_STREAM_CHUNK_SIZE = 32
+
+
+class Board(Enum):
+    BASE = auto()
+    FOC = auto()
+
+
+def board_class(variant: Board) -> Type[BaseBoard]:
+    match variant:
+        case Board.BASE:
+            return BaseBoard
+        case Board.FOC:
+            return FishermenOfCatanBoard
+        case _:
+            raise ValueError(f"Unknown board variant {variant}")
+
+
+def board_image_class(variant: Board) -> Type["BaseBoardImage"]:
+    # Imported here so that generating boards does not need Pillow
+    from catanpg.base.board_image import BaseBoardImage
+    from catanpg.tab.board_image import FishermenOfCatanBoardImage
+
+    match variant:
+        case Board.BASE:
+            return BaseBoardImage
+        case Board.FOC:
+            return FishermenOfCatanBoardImage
+        case _:
+            raise ValueError(f"Unknown board variant {variant}")
+
+
+def board_svg_class(variant: Board) -> Type["BaseBoardSvg"]:
+    from catanpg.base.board_svg import BaseBoardSvg
+    from catanpg.tab.board_svg import FishermenOfCatanBoardSvg
+
+    match variant:
+        case Board.BASE:
+            return BaseBoardSvg
+        case Board.FOC:
+            return FishermenOfCatanBoardSvg
+        case _:
+            raise ValueError(f"Unknown board variant {variant}")
+
+
+def board_variant(board_cls: Type[BaseBoard]) -> Board:
+    for variant in Board:
+        if board_class(variant) is board_cls:
+            return variant
+    raise ValueError(f"Unknown board class {board_cls.__name__}")
+
+
+def derive_seed(seed: int, index: int) -> int:
+    """Derive the seed of the board at position `index` of a batch generated from `seed`."""
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def generate_board(
+    variant: Board,
+    seed: int,
+    ordered_numbers: bool = False,
+    collect_stats: bool = False,
+    engine: GenerationEngine = GenerationEngine.REPAIR,
+    cache: Optional["BoardCache"] = None,
+    deadline: Optional[float] = None
+) -> BaseBoard:
+    """Generate the board obtained from a dedicated random stream seeded with `seed`.
+
+    With a `cache`, the board is looked up there first and added to it if missing (cached boards carry no stats).
+    With a `deadline` (see `BaseBoard`), the board depends on timing, so it is neither looked up nor cached.
+    """
+    if cache is not None and not collect_stats and deadline is None:
+        return cache.board(variant, seed, ordered_numbers=ordered_numbers, engine=engine)
+    return board_class(variant)(
+        ordered_numbers=ordered_numbers,
+        rng=random.Random(seed),
+        collect_stats=collect_stats,
+        engine=engine,
+        deadline=deadline
+    )
+
+
+def generate_boards(
+    variant: Board,
+    n: int,
+    seed: int,
+    ordered_numbers: bool = False,
+    workers: Optional[int] = 1,
+    collect_stats: bool = False,
+    engine: GenerationEngine = GenerationEngine.REPAIR
+) -> List[BaseBoard]:
+    """Generate `n` boards, the k-th one from the seed `derive_seed(seed, k)`.
+
+    The boards and their order do not depend on `workers`, the number of processes used to generate them
+    (`None` uses one per CPU).
+    """
+    if n < 0:
+        raise ValueError(f"The number of boards cannot be negative (got {n})")
+    seeds = [derive_seed(seed, i) for i in range(n)]
+    generate = partial(
+        generate_board,
+        variant,
+        ordered_numbers=ordered_numbers,
+        collect_stats=collect_stats,
+        engine=engine
+    )
+    workers = workers if workers is not None else os.cpu_count() or 1
+    if workers == 1 or n <= 1:
+        return list(map(generate, seeds))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(generate, seeds, chunksize=max(1, n // (workers*4))))
+
+
+def _generate_chunk(generate: Callable[[int], BaseBoard], seeds: Sequence[int]) -> List[BaseBoard]:
+    return list(map(generate, seeds))
+
+
+def iter_boards(
+    variant: Board,
+    n: int,
+    seed: int,
+    ordered_numbers: bool = False,
+    workers: Optional[int] = 1,
+    engine: GenerationEngine = GenerationEngine.REPAIR,
+    max_pending: Optional[int] = None
+) -> Iterator[Tuple[int, BaseBoard]]:
+    """Generate the same boards as `generate_boards`, yielding each one along with its seed as soon as it is ready.
+
+    Boards are yielded in order. Workers generate them in chunks of `_STREAM_CHUNK_SIZE`, and at most `max_pending`
+    chunks (by default, 2 per worker) are generated ahead of the consumer, so memory does not grow with `n`.
+    """
+    if n < 0:
+        raise ValueError(f"The number of boards cannot be negative (got {n})")
+    generate = partial(generate_board, variant, ordered_numbers=ordered_numbers, engine=engine)
+    seeds = (derive_seed(seed, i) for i in range(n))
+    workers = workers if workers is not None else os.cpu_count() or 1
+    if workers == 1:
+        for board_seed in seeds:
+            yield board_seed, generate(board_seed)
+        return
+    max_pending = max_pending if max_pending is not None else 2*workers
+    if max_pending < 1:
+        raise ValueError(f"At least one chunk of boards must be allowed to be pending (got {max_pending})")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Tuple[List[int], Future[List[BaseBoard]]]] = deque()
+        while True:
+            chunk_seeds = list(it.islice(seeds, _STREAM_CHUNK_SIZE))
+            if chunk_seeds:
+                pending.append((chunk_seeds, executor.submit(_generate_chunk, generate, chunk_seeds)))
+            if pending and (len(pending) >= max_pending or not chunk_seeds):
+                done_seeds, future = pending.popleft()
+                yield from zip(done_seeds, future.result())
+            elif not chunk_seeds:
+                return
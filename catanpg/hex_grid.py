@@ -2,7 +2,8 @@
 import itertools as it
 import operator
 from enum import IntEnum
-from typing import Any, Iterator, Optional, Tuple, cast
+from functools import cached_property, lru_cache
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple, cast
 
 # TODO: docstrings
 
@@ -69,20 +70,45 @@ def symmetric_index(x: int, y: int) -> Tuple[int, int]:
     return -x, -y
 
 
-def ordered_ring_indexes(start_corner: Direction, radius: int) -> Iterator[Tuple[int, int]]:
+def rotate_index(x: int, y: int, nsteps: int) -> Tuple[int, int]:
+    # Rotates around the center as `rotate_direction` does, so that corners keep matching their directions
+    for _ in range(nsteps % 6):
+        x, y = -y, x + y
+    return x, y
+
+
+def reflect_index(x: int, y: int) -> Tuple[int, int]:
+    # Mirror image across the axis through the EAST and WEST corners
+    return x + y, -y
+
+
+_INDEX_TABLE_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=_INDEX_TABLE_CACHE_SIZE)
+def ring_index_table(start_corner: Direction, radius: int) -> Tuple[Tuple[int, int], ...]:
     if radius == 0:
-        yield 0, 0
-    else:
-        x, y = corner_at_distance(start_corner, radius)
-        for i in range(6):
-            for _ in range(radius):
-                yield x, y
-                x, y = step_from_hex(x, y, Direction((i+2+start_corner) % 6))
+        return ((0, 0),)
+    ring = []
+    x, y = corner_at_distance(start_corner, radius)
+    for i in range(6):
+        for _ in range(radius):
+            ring.append((x, y))
+            x, y = step_from_hex(x, y, Direction((i+2+start_corner) % 6))
+    return tuple(ring)
+
+
+@lru_cache(maxsize=_INDEX_TABLE_CACHE_SIZE)
+def spiral_index_table(start_corner: Direction, radius: int) -> Tuple[Tuple[int, int], ...]:
+    return tuple(it.chain.from_iterable(ring_index_table(start_corner, i) for i in reversed(range(radius+1))))
+
+
+def ordered_ring_indexes(start_corner: Direction, radius: int) -> Iterator[Tuple[int, int]]:
+    return iter(ring_index_table(start_corner, radius))
 
 
 def spiral_ordered_indexes(start_corner: Direction, radius: int) -> Iterator[Tuple[int, int]]:
-    for i in reversed(range(radius+1)):
-        yield from ordered_ring_indexes(start_corner, i)
+    return iter(spiral_index_table(start_corner, radius))
 
 
 def neighbors(x: int, y: int) -> Iterator[Tuple[int, int]]:
@@ -90,57 +116,212 @@ def neighbors(x: int, y: int) -> Iterator[Tuple[int, int]]:
         yield step_from_hex(x, y, direction)
 
 
+class _TopologyTables:
+    """Vertices (hex corners) and edges (hex sides) of every cell of a grid.
+
+    Corner k of a cell lies between its Direction(k) and Direction(k+1) neighbors, and side k faces its Direction(k)
+    neighbor, joining corners k-1 and k. Ids are assigned in cell id order, then corner (or side) order.
+    """
+
+    def __init__(self, cell_indexes: Tuple[Tuple[int, int], ...], cell_ids: Dict[Tuple[int, int], int]):
+        # A vertex is identified by the three (possibly off-grid) hexes around it
+        vertex_ids: Dict[FrozenSet[Tuple[int, int]], int] = {}
+        vertex_cell_ids: List[Tuple[int, ...]] = []
+        cell_vertex_ids = []
+        for x, y in cell_indexes:
+            corners = []
+            for direction in Direction:
+                (dx1, dy1), (dx2, dy2) = _DIRECTION_TO_VECTOR[direction], _DIRECTION_TO_VECTOR[(direction + 1) % 6]
+                hexes = frozenset(((x, y), (x + dx1, y + dy1), (x + dx2, y + dy2)))
+                vertex_id = vertex_ids.setdefault(hexes, len(vertex_ids))
+                if vertex_id == len(vertex_cell_ids):
+                    vertex_cell_ids.append(tuple(sorted(cell_ids[idx] for idx in hexes if idx in cell_ids)))
+                corners.append(vertex_id)
+            cell_vertex_ids.append(tuple(corners))
+        self.cell_vertex_ids = tuple(cell_vertex_ids)
+        self.vertex_cell_ids = tuple(vertex_cell_ids)
+
+        edge_ids: Dict[Tuple[int, int], int] = {}
+        cell_edge_ids = []
+        for cell_corners in self.cell_vertex_ids:
+            sides = []
+            for side in Direction:
+                vertex_id1, vertex_id2 = sorted((cell_corners[side-1], cell_corners[side]))
+                sides.append(edge_ids.setdefault((vertex_id1, vertex_id2), len(edge_ids)))
+            cell_edge_ids.append(tuple(sides))
+        self.cell_edge_ids = tuple(cell_edge_ids)
+        self.edge_vertex_ids = tuple(edge_ids)
+
+        edge_cell_ids: List[List[int]] = [[] for _ in self.edge_vertex_ids]
+        for cell_id, cell_sides in enumerate(self.cell_edge_ids):
+            for edge_id in cell_sides:
+                edge_cell_ids[edge_id].append(cell_id)
+        self.edge_cell_ids = tuple(map(tuple, edge_cell_ids))
+        vertex_edge_ids: List[List[int]] = [[] for _ in self.vertex_cell_ids]
+        vertex_neighbor_ids: List[List[int]] = [[] for _ in self.vertex_cell_ids]
+        for edge_id, (vertex_id1, vertex_id2) in enumerate(self.edge_vertex_ids):
+            vertex_edge_ids[vertex_id1].append(edge_id)
+            vertex_edge_ids[vertex_id2].append(edge_id)
+            vertex_neighbor_ids[vertex_id1].append(vertex_id2)
+            vertex_neighbor_ids[vertex_id2].append(vertex_id1)
+        self.vertex_edge_ids = tuple(map(tuple, vertex_edge_ids))
+        self.vertex_neighbor_ids = tuple(map(tuple, vertex_neighbor_ids))
+
+
+class _GridTables:
+
+    def __init__(self, radius: int):
+        self.cell_indexes = tuple(
+            (x, y)
+            for x in range(-radius, radius+1)
+            for y in range(-radius, radius+1)
+            if index_radius(x, y) <= radius
+        )
+        self.cell_ids: Dict[Tuple[int, int], int] = {idx: cell_id for cell_id, idx in enumerate(self.cell_indexes)}
+        self.neighbor_ids = tuple(
+            tuple(self.cell_ids[idx_n] for idx_n in neighbors(*idx) if idx_n in self.cell_ids)
+            for idx in self.cell_indexes
+        )
+
+    @cached_property
+    def topology(self) -> _TopologyTables:
+        # Built on first use only, as most grids never look past their cells
+        return _TopologyTables(self.cell_indexes, self.cell_ids)
+
+
+@lru_cache(maxsize=None)
+def _grid_tables(radius: int) -> _GridTables:
+    return _GridTables(radius)
+
+
 # TODO: parameterizable typing instead of Any
 # TODO: rectangular hex grids instead of just circular
 class HexGrid:
+    """Hexagonal grid stored as a flat list indexed by dense cell ids.
+
+    Cell id and neighbor tables are shared by all grids of the same radius. The `*_cell*` accessors take cell ids and
+    skip bounds checking.
+
+    Grids also index the vertices (cell corners, where settlements are built) and edges (cell sides, where roads are
+    built) of all their cells, with the topology tables shared by all grids of the same radius too. See
+    `cell_vertex_ids` and `cell_edge_ids` for how corners and sides are ordered.
+    """
 
     def __init__(self, radius: int):
         self._radius = radius
-        self._grid = []
-        for _ in range(radius*2+1):
-            self._grid.append(list(it.repeat(None, radius*2 + 1)))
+        self._tables = _grid_tables(radius)
+        self._cells: List[Any] = [None] * len(self._tables.cell_indexes)
+
+    def __getstate__(self) -> Tuple[int, List[Any]]:
+        return self._radius, self._cells
+
+    def __setstate__(self, state: Tuple[int, List[Any]]) -> None:
+        self._radius, self._cells = state
+        self._tables = _grid_tables(self._radius)
+
+    def copy(self) -> "HexGrid":
+        """Copy of the grid, holding the same cell elements."""
+        grid = HexGrid.__new__(HexGrid)
+        grid._radius, grid._tables, grid._cells = self._radius, self._tables, list(self._cells)
+        return grid
 
     @property
     def radius(self) -> int:
         return self._radius
 
+    @property
+    def num_cells(self) -> int:
+        return len(self._cells)
+
     def _within_grid(self, x: int, y: int) -> bool:
-        return abs(x) <= self.radius and abs(y) <= self.radius and abs(-x-y) <= self.radius
+        return (x, y) in self._tables.cell_ids
+
+    def cell_id(self, x: int, y: int) -> int:
+        try:
+            return self._tables.cell_ids[x, y]
+        except KeyError:
+            raise ValueError(f"({x}, {y}) is outside hex grid of radius {self.radius}") from None
+
+    def cell_index(self, cell_id: int) -> Tuple[int, int]:
+        return self._tables.cell_indexes[cell_id]
+
+    def get_cell(self, cell_id: int) -> Any:
+        return self._cells[cell_id]
+
+    def set_cell(self, cell_id: int, el: Any) -> None:
+        self._cells[cell_id] = el
+
+    def neighbor_cell_ids(self, cell_id: int) -> Tuple[int, ...]:
+        return self._tables.neighbor_ids[cell_id]
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self._tables.topology.vertex_cell_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._tables.topology.edge_vertex_ids)
+
+    def cell_vertex_ids(self, cell_id: int) -> Tuple[int, ...]:
+        """Ids of the 6 corners of a cell, where corner k lies between its Direction(k) and Direction(k+1) sides."""
+        return self._tables.topology.cell_vertex_ids[cell_id]
+
+    def cell_edge_ids(self, cell_id: int) -> Tuple[int, ...]:
+        """Ids of the 6 sides of a cell, where side k faces its Direction(k) neighbor."""
+        return self._tables.topology.cell_edge_ids[cell_id]
+
+    def vertex_cell_ids(self, vertex_id: int) -> Tuple[int, ...]:
+        return self._tables.topology.vertex_cell_ids[vertex_id]
+
+    def vertex_neighbor_ids(self, vertex_id: int) -> Tuple[int, ...]:
+        return self._tables.topology.vertex_neighbor_ids[vertex_id]
+
+    def vertex_edge_ids(self, vertex_id: int) -> Tuple[int, ...]:
+        return self._tables.topology.vertex_edge_ids[vertex_id]
+
+    def edge_vertex_ids(self, edge_id: int) -> Tuple[int, int]:
+        return self._tables.topology.edge_vertex_ids[edge_id]
 
-    def _ensure_within_grid(self, x: int, y: int) -> None:
-        if not self._within_grid(x, y):
-            raise ValueError(f"({x}, {y}) is outside hex grid of radius {self.radius}")
+    def edge_cell_ids(self, edge_id: int) -> Tuple[int, ...]:
+        return self._tables.topology.edge_cell_ids[edge_id]
 
     def set(self, x: int, y: int, el: Any) -> None:
-        self._ensure_within_grid(x, y)
-        self._grid[x + self.radius][y + self.radius] = el
+        self._cells[self.cell_id(x, y)] = el
 
     def get(self, x: int, y: int) -> Any:
-        self._ensure_within_grid(x, y)
-        return self._grid[x + self.radius][y + self.radius]
+        return self._cells[self.cell_id(x, y)]
 
     def is_free(self, x: int, y: int) -> bool:
-        self._ensure_within_grid(x, y)
-        return self._grid[x + self.radius][y + self.radius] is None
+        return self._cells[self.cell_id(x, y)] is None
 
     def furthest_corner(self, direction: Direction) -> Tuple[int, int]:
         return corner_at_distance(direction, self.radius)
 
     def ordered_ring_hexes(self, start_corner: Direction, radius: int) -> Iterator[Any]:
-        for x, y in ordered_ring_indexes(start_corner, radius):
+        for x, y in ring_index_table(start_corner, radius):
             yield self.get(x, y)
 
     def spiral_ordered_hexes(self, start_corner: Direction, radius: Optional[int] = None) -> Iterator[Any]:
         if radius is not None and radius > self.radius:
             raise ValueError(f"Radius cannot be larger than {self.radius} (got {radius} instead)")
-        for x, y in spiral_ordered_indexes(start_corner, radius if radius is not None else self.radius):
+        for x, y in spiral_index_table(start_corner, radius if radius is not None else self.radius):
             yield self.get(x, y)
 
     def neighbor_indexes(self, x: int, y: int) -> Iterator[Tuple[int, int]]:
-        for x_n, y_n in neighbors(x, y):
-            if self._within_grid(x_n, y_n):
-                yield x_n, y_n
+        cell_id = self._tables.cell_ids.get((x, y))
+        if cell_id is None:
+            for x_n, y_n in neighbors(x, y):
+                if self._within_grid(x_n, y_n):
+                    yield x_n, y_n
+        else:
+            for cell_id_n in self._tables.neighbor_ids[cell_id]:
+                yield self._tables.cell_indexes[cell_id_n]
 
     def neighbors(self, x: int, y: int) -> Iterator[Any]:
-        for x_n, y_n in self.neighbor_indexes(x, y):
-            yield self.get(x_n, y_n)
+        cell_id = self._tables.cell_ids.get((x, y))
+        if cell_id is None:
+            for x_n, y_n in self.neighbor_indexes(x, y):
+                yield self.get(x_n, y_n)
+        else:
+            for cell_id_n in self._tables.neighbor_ids[cell_id]:
+                yield self._cells[cell_id_n]
@@ -1,14 +1,20 @@
 import argparse
+import io
+import json
 import logging
 import random
 import sys
-from enum import Enum, IntEnum, auto
+from enum import Enum, IntEnum
 from typing import Any, Optional, Type
 
-from catanpg.base.board import BaseBoard
-from catanpg.base.board_image import BaseBoardImage
-from catanpg.tab.board import FishermenOfCatanBoard
-from catanpg.tab.board_image import FishermenOfCatanBoardImage
+from catanpg.bulk import STDOUT_PATH, OutputFormat, open_output, write_boards
+from catanpg.cache import BoardCache, default_cache_directory
+from catanpg.encoding import board_to_dict
+from catanpg.generation import Board, board_image_class, board_svg_class, generate_board
+
+IMAGE_OUTPUT = "image"
+JSON_OUTPUT = "json"
+SVG_OUTPUT = "svg"
 
 
 class LogLevel(IntEnum):
@@ -20,11 +26,6 @@ class LogLevel(IntEnum):
     NOTSET = logging.NOTSET
 
 
-class Board(Enum):
-    BASE = auto()
-    FOC = auto()
-
-
 class EnumAction(argparse.Action):
     """`argparse` action for handling Enums."""
 
@@ -79,20 +80,115 @@ def parse_arguments() -> argparse.Namespace:
         default=None,
         help="Set the seed for the random generator (default is no fixed seed)."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '--count',
+        type=int,
+        dest='count',
+        default=None,
+        help="Generate this many boards and write them out instead of showing a single board."
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        dest='workers',
+        default=1,
+        help="Set the number of processes generating boards with --count (default is 1)."
+    )
+    parser.add_argument(
+        '--format',
+        type=OutputFormat,
+        choices=list(OutputFormat),
+        dest='format',
+        default=OutputFormat.JSONL,
+        help=f"Set the output format of the boards generated with --count (default is {OutputFormat.JSONL})."
+    )
+    parser.add_argument(
+        '--output',
+        dest='output',
+        choices=(IMAGE_OUTPUT, JSON_OUTPUT, SVG_OUTPUT),
+        default=IMAGE_OUTPUT,
+        help=(
+            f"Show the board as an image, or write it as JSON without rendering it or as an SVG image (default is "
+            f"{IMAGE_OUTPUT})."
+        )
+    )
+    parser.add_argument(
+        '--no-render',
+        action='store_const',
+        const=JSON_OUTPUT,
+        dest='output',
+        help=f"Same as --output {JSON_OUTPUT}."
+    )
+    parser.add_argument(
+        '--output-path',
+        dest='output_path',
+        default=STDOUT_PATH,
+        help=(
+            "Write the boards generated with --count (or the board with --output json or svg) to this file, or "
+            "directory for png-dir and sheets (default is stdout)."
+        )
+    )
+    parser.add_argument(
+        '--cache-dir',
+        dest='cache_dir',
+        default=default_cache_directory(),
+        help=f"Set the directory of the cache of generated boards (default is {default_cache_directory()})."
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_false',
+        dest='use_cache',
+        default=True,
+        help=(
+            "Always generate and render the board instead of looking it up in the cache (boards are only cached when "
+            "--seed is given)."
+        )
+    )
+    args = parser.parse_args()
+    if args.count is not None and args.count < 0:
+        parser.error("--count cannot be negative")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    directory_formats = (OutputFormat.PNG_DIR, OutputFormat.SHEETS)
+    if args.count is not None and args.format in directory_formats and args.output_path == STDOUT_PATH:
+        parser.error(f"--format {args.format} requires --output-path")
+    return args
 
 
 if __name__ == "__main__":
     args = parse_arguments()
     logging.basicConfig(level=args.log_level)
     seed = random.randrange(sys.maxsize) if args.seed is None else args.seed
-    random.seed(seed)
     logging.info(f":random-seed {seed}")
-    match args.board:
-        case Board.BASE:
-            board_cls, img_cls = BaseBoard, BaseBoardImage
-        case Board.FOC:
-            board_cls, img_cls = FishermenOfCatanBoard, FishermenOfCatanBoardImage
-    board = board_cls(ordered_numbers=args.ordered)
-    image = img_cls(board)
-    image.show()
+    if args.count is not None:
+        num_boards = write_boards(
+            args.board,
+            args.count,
+            seed,
+            args.format,
+            path=args.output_path,
+            ordered_numbers=args.ordered,
+            workers=args.workers
+        )
+        logging.info(f":boards-written {num_boards}")
+        sys.exit()
+    # Boards of random seeds would never be looked up again, so only boards of given seeds are cached
+    cache = BoardCache(args.cache_dir) if args.use_cache and args.seed is not None else None
+    if args.output == JSON_OUTPUT:
+        board = generate_board(args.board, seed, ordered_numbers=args.ordered, cache=cache)
+        with open_output(args.output_path, "w") as stream:
+            stream.write(json.dumps({"seed": seed, **board_to_dict(board)}) + "\n")
+        sys.exit()
+    if args.output == SVG_OUTPUT:
+        board = generate_board(args.board, seed, ordered_numbers=args.ordered, cache=cache)
+        with open_output(args.output_path, "w") as stream:
+            board_svg_class(args.board)(board).write(stream)
+        sys.exit()
+    if cache is not None:
+        # Pillow (like the board image classes) is only imported when an image is shown, so that runs writing JSON or
+        # SVG start fast
+        from PIL import Image
+        Image.open(io.BytesIO(cache.png(args.board, seed, ordered_numbers=args.ordered))).show()
+        sys.exit()
+    board = generate_board(args.board, seed, ordered_numbers=args.ordered)
+    board_image_class(args.board)(board).show()
@@ -0,0 +1,274 @@
+"""Board quality metrics, computed from tables of the grid vertices (see `HexGrid.num_vertices`) built per board radius.
+
+Pips measure how often a number is rolled with two dice (out of 36): 1 for 2 and 12, up to 5 for 6 and 8. The pips of
+a vertex are those of the tiles around it, where a settlement built there collects.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, cast
+
+from catanpg.base.board import BaseBoard
+from catanpg.base.hex_tile import (
+    BrickHarborTile,
+    FieldsTile,
+    ForestTile,
+    GrainHarborTile,
+    HarborTile,
+    HexTile,
+    HillsTile,
+    LumberHarborTile,
+    MountainsTile,
+    NumberOrNumbers,
+    OreHarborTile,
+    PastureTile,
+    ThreeOneHarborTile,
+    TileKind,
+    WoolHarborTile,
+)
+from catanpg.hex_grid import Direction, HexGrid, index_radius
+
+RESOURCES = ("lumber", "brick", "wool", "grain", "ore")
+
+_TERRAIN_RESOURCES: Dict[Type[HexTile], str] = {
+    ForestTile: "lumber",
+    HillsTile: "brick",
+    PastureTile: "wool",
+    FieldsTile: "grain",
+    MountainsTile: "ore",
+}
+
+_HARBOR_KINDS: Dict[Type[HarborTile], str] = {
+    ThreeOneHarborTile: "generic",
+    LumberHarborTile: "lumber",
+    BrickHarborTile: "brick",
+    WoolHarborTile: "wool",
+    GrainHarborTile: "grain",
+    OreHarborTile: "ore",
+}
+
+
+def pips(number: NumberOrNumbers) -> int:
+    if isinstance(number, int):
+        return 6 - abs(7 - number)
+    return sum(map(pips, number))
+
+
+class _MetricTables:
+
+    def __init__(self, radius: int):
+        grid = HexGrid(radius)
+        land_radius = radius - 1
+        self.num_cells = grid.num_cells
+        self.land_cell_ids = tuple(
+            cell_id for cell_id in range(grid.num_cells) if index_radius(*grid.cell_index(cell_id)) <= land_radius
+        )
+        land_cells = set(self.land_cell_ids)
+        self.land_adjacencies = tuple(
+            (cell_id, neighbor_id)
+            for cell_id in self.land_cell_ids
+            for neighbor_id in grid.neighbor_cell_ids(cell_id)
+            if neighbor_id in land_cells and cell_id < neighbor_id
+        )
+        # Only the vertices touching land can be built on
+        land_vertex_ids = [
+            vertex_id
+            for vertex_id in range(grid.num_vertices)
+            if any(cell_id in land_cells for cell_id in grid.vertex_cell_ids(vertex_id))
+        ]
+        self.vertex_cell_ids = tuple(grid.vertex_cell_ids(vertex_id) for vertex_id in land_vertex_ids)
+        # The (land) vertices served by a harbor, for every cell and orientation a harbor could have, indexed as
+        # `vertex_cell_ids`
+        metric_vertex_ids = {vertex_id: k for k, vertex_id in enumerate(land_vertex_ids)}
+        self.harbor_vertex_ids: Dict[Tuple[int, Direction], Tuple[int, ...]] = {}
+        for cell_id in range(grid.num_cells):
+            if cell_id in land_cells:
+                continue
+            for direction in Direction:
+                harbor_vertices = grid.edge_vertex_ids(grid.cell_edge_ids(cell_id)[direction])
+                self.harbor_vertex_ids[cell_id, direction] = tuple(
+                    metric_vertex_ids[v] for v in harbor_vertices if v in metric_vertex_ids
+                )
+
+
+@lru_cache(maxsize=None)
+def _metric_tables(radius: int) -> _MetricTables:
+    return _MetricTables(radius)
+
+
+class BoardMetrics(NamedTuple):
+    # Pips of every resource over the whole board
+    resource_pips: Dict[str, int]
+    # Difference between the pips of the most and least productive resources
+    resource_pip_spread: int
+    # Highest resource and fish pips of a vertex
+    best_spot_pips: int
+    # Highest fish pips of a vertex (0 without fish tiles)
+    best_fish_spot_pips: int
+    # Number of adjacent land tiles producing the same resource
+    same_resource_adjacencies: int
+    # Highest pips of a vertex served by a harbor of each kind (generic 3:1 or resource 2:1)
+    harbor_spot_pips: Dict[str, int]
+
+
+def evaluate_board(board: BaseBoard) -> BoardMetrics:
+    """Compute all the metrics of a board in a single pass over its tiles and vertices."""
+    grid = board.grid
+    tables = _metric_tables(grid.radius)
+    resource_pips = dict.fromkeys(RESOURCES, 0)
+    # Resource and fish pips of every cell
+    cell_pips = [0] * tables.num_cells
+    cell_fish_pips = [0] * tables.num_cells
+    cell_resources: List[Optional[str]] = [None] * tables.num_cells
+    harbor_spot_pips = dict.fromkeys(_HARBOR_KINDS.values(), 0)
+    harbors = []
+    has_fish = False
+    for cell_id in range(tables.num_cells):
+        tile = grid.get_cell(cell_id)
+        match tile.kind:
+            case TileKind.TERRAIN:
+                resource = _TERRAIN_RESOURCES[type(tile)]
+                cell_resources[cell_id] = resource
+                cell_pips[cell_id] = pips(tile.number)
+                resource_pips[resource] += cell_pips[cell_id]
+            case TileKind.FISH | TileKind.LAKE:
+                cell_pips[cell_id] = cell_fish_pips[cell_id] = pips(tile.number)
+                has_fish = True
+            case TileKind.HARBOR:
+                harbors.append((cell_id, tile))
+
+    vertex_pips = [sum(map(cell_pips.__getitem__, cell_ids)) for cell_ids in tables.vertex_cell_ids]
+    best_spot_pips = max(vertex_pips, default=0)
+    best_fish_spot_pips = 0
+    if has_fish:
+        best_fish_spot_pips = max(sum(map(cell_fish_pips.__getitem__, cell_ids)) for cell_ids in tables.vertex_cell_ids)
+
+    for cell_id, harbor in harbors:
+        kind = _HARBOR_KINDS[type(harbor)]
+        served_pips = max((vertex_pips[v] for v in tables.harbor_vertex_ids[cell_id, harbor.orientation]), default=0)
+        harbor_spot_pips[kind] = max(harbor_spot_pips[kind], served_pips)
+
+    return BoardMetrics(
+        resource_pips=resource_pips,
+        resource_pip_spread=max(resource_pips.values()) - min(resource_pips.values()),
+        best_spot_pips=best_spot_pips,
+        best_fish_spot_pips=best_fish_spot_pips,
+        same_resource_adjacencies=sum(
+            1 for cell_id1, cell_id2 in tables.land_adjacencies
+            if cell_resources[cell_id1] is not None and cell_resources[cell_id1] == cell_resources[cell_id2]
+        ),
+        harbor_spot_pips=harbor_spot_pips,
+    )
+
+
+_HARBOR_KIND_NAMES = tuple(_HARBOR_KINDS.values())
+
+
+def _tile_features(tile: Any) -> Tuple[int, int, int, int, int]:
+    # Resource and fish pips, resource index, harbor kind index and orientation of a tile, -1 for no resource or harbor
+    match tile.kind:
+        case TileKind.TERRAIN:
+            return pips(tile.number), 0, RESOURCES.index(_TERRAIN_RESOURCES[type(tile)]), -1, 0
+        case TileKind.FISH | TileKind.LAKE:
+            tile_pips = pips(tile.number)
+            return tile_pips, tile_pips, -1, -1, 0
+        case TileKind.HARBOR:
+            return 0, 0, -1, _HARBOR_KIND_NAMES.index(_HARBOR_KINDS[type(tile)]), tile.orientation
+        case _:
+            return 0, 0, -1, -1, 0
+
+
+def _padded(rows: Iterable[Tuple[int, ...]], width: int, pad: int) -> List[List[int]]:
+    return [list(row) + [pad] * (width - len(row)) for row in rows]
+
+
+def _evaluate_batch(boards: List[BaseBoard]) -> List[BoardMetrics]:
+    # Vectorized `evaluate_board` of boards of the same radius. Cell and vertex tables are indexed with an extra padding
+    # column of zeros, so that vertices with fewer cells and harbors serving fewer vertices need no masking.
+    import numpy as np
+
+    tables = _metric_tables(boards[0].grid.radius)
+    num_cells, num_vertices = tables.num_cells, len(tables.vertex_cell_ids)
+    vertex_cell_ids = np.array(_padded(tables.vertex_cell_ids, 3, num_cells), dtype=np.intp)
+    harbor_vertex_ids = np.full((num_cells, len(Direction), 2), num_vertices, dtype=np.intp)
+    for (cell_id, direction), vertex_ids in tables.harbor_vertex_ids.items():
+        harbor_vertex_ids[cell_id, direction, :len(vertex_ids)] = vertex_ids
+    adjacencies = np.array(tables.land_adjacencies, dtype=np.intp).reshape(-1, 2)
+
+    # Tiles are flyweights, so the features of a tile are computed once for the whole batch
+    features: Dict[HexTile, Tuple[int, int, int, int, int]] = {}
+    cell_features = np.array([
+        [
+            features[tile] if tile in features else features.setdefault(tile, _tile_features(tile))
+            for tile in map(board.grid.get_cell, range(num_cells))
+        ]
+        for board in boards
+    ], dtype=np.int64).reshape(len(boards), num_cells, 5)
+    cell_pips, cell_fish_pips, cell_resources, harbor_kinds, orientations = np.moveaxis(cell_features, 2, 0)
+
+    padding = np.zeros((len(boards), 1), dtype=np.int64)
+    vertex_pips = np.hstack((cell_pips, padding))[:, vertex_cell_ids].sum(axis=2)
+    fish_vertex_pips = np.hstack((cell_fish_pips, padding))[:, vertex_cell_ids].sum(axis=2)
+    resource_pips = np.stack([np.where(cell_resources == r, cell_pips, 0).sum(axis=1) for r in range(len(RESOURCES))])
+    first_resources, second_resources = cell_resources[:, adjacencies[:, 0]], cell_resources[:, adjacencies[:, 1]]
+    same_resource_adjacencies = ((first_resources >= 0) & (first_resources == second_resources)).sum(axis=1)
+    # Pips of the best vertex served by the harbor of every cell, if any
+    served_vertex_ids = harbor_vertex_ids[np.arange(num_cells), orientations].reshape(len(boards), -1)
+    served_pips = np.take_along_axis(np.hstack((vertex_pips, padding)), served_vertex_ids, axis=1)
+    served_pips = served_pips.reshape(len(boards), num_cells, 2).max(axis=2)
+    harbor_spot_pips = np.stack([
+        np.where(harbor_kinds == k, served_pips, 0).max(axis=1) for k in range(len(_HARBOR_KIND_NAMES))
+    ])
+
+    return [
+        BoardMetrics(
+            resource_pips=dict(zip(RESOURCES, board_resource_pips)),
+            resource_pip_spread=max(board_resource_pips) - min(board_resource_pips),
+            best_spot_pips=best_spot_pips,
+            best_fish_spot_pips=best_fish_spot_pips,
+            same_resource_adjacencies=board_adjacencies,
+            harbor_spot_pips=dict(zip(_HARBOR_KIND_NAMES, board_harbor_spot_pips)),
+        )
+        for board_resource_pips, best_spot_pips, best_fish_spot_pips, board_adjacencies, board_harbor_spot_pips in zip(
+            resource_pips.T.tolist(),
+            vertex_pips.max(axis=1, initial=0).tolist(),
+            fish_vertex_pips.max(axis=1, initial=0).tolist(),
+            same_resource_adjacencies.tolist(),
+            harbor_spot_pips.T.tolist(),
+        )
+    ]
+
+
+def evaluate_boards(boards: Iterable[BaseBoard]) -> List[BoardMetrics]:
+    """Compute the metrics of many boards (e.g. a `BoardCorpus`), vectorized over the boards of each radius.
+
+    Needs NumPy (the `batch` extra), without which the boards are evaluated one by one.
+    """
+    boards = list(boards)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return list(map(evaluate_board, boards))
+    board_ids_by_radius: Dict[int, List[int]] = {}
+    for board_id, board in enumerate(boards):
+        board_ids_by_radius.setdefault(board.grid.radius, []).append(board_id)
+    metrics: List[Optional[BoardMetrics]] = [None] * len(boards)
+    for board_ids in board_ids_by_radius.values():
+        for board_id, board_metrics in zip(board_ids, _evaluate_batch([boards[board_id] for board_id in board_ids])):
+            metrics[board_id] = board_metrics
+    return cast(List[BoardMetrics], metrics)
+
+
+def metrics_columns(metrics: Iterable[BoardMetrics]) -> Dict[str, List[int]]:
+    """Flatten the metrics of many boards into one column per scalar metric, e.g. to filter or plot them."""
+    columns: Dict[str, List[int]] = {}
+    for board_metrics in metrics:
+        row = {
+            **{f"{resource}_pips": value for resource, value in board_metrics.resource_pips.items()},
+            "resource_pip_spread": board_metrics.resource_pip_spread,
+            "best_spot_pips": board_metrics.best_spot_pips,
+            "best_fish_spot_pips": board_metrics.best_fish_spot_pips,
+            "same_resource_adjacencies": board_metrics.same_resource_adjacencies,
+            **{f"{kind}_harbor_spot_pips": value for kind, value in board_metrics.harbor_spot_pips.items()},
+        }
+        for name, value in row.items():
+            columns.setdefault(name, []).append(value)
+    return columns
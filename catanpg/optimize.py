@@ -0,0 +1,248 @@
+"""Optimization of generated boards for weighted objectives with simulated annealing or tabu search.
+
+The search moves are swaps of two land tiles (allowed by `BaseBoard._is_valid_swap`, so variant rules such as the
+position of the Fishermen of Catan lake hold) and swaps of the numbers of two terrain tiles, which unlike tile swaps
+change how many pips each resource gets. Objectives are minimized, and boards without number adjacency violations are
+always preferred to boards with violations, whatever their objective.
+"""
+import math
+import random
+import time
+from collections import deque
+from enum import Enum, auto
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from catanpg.base.board import BaseBoard
+from catanpg.base.hex_tile import TileKind
+from catanpg.metrics import BoardMetrics, evaluate_board
+
+ObjectiveTerm = Callable[[BaseBoard, BoardMetrics], float]
+
+OBJECTIVE_TERMS: Dict[str, ObjectiveTerm] = {
+    "resource_pip_spread": lambda board, metrics: metrics.resource_pip_spread,
+    "harbor_pip_spread": lambda board, metrics: (
+        max(metrics.harbor_spot_pips.values()) - min(metrics.harbor_spot_pips.values())
+    ),
+    "best_spot_pips": lambda board, metrics: metrics.best_spot_pips,
+    "same_resource_adjacencies": lambda board, metrics: metrics.same_resource_adjacencies,
+}
+VIOLATIONS_TERM = "violations"
+
+_DEFAULT_INITIAL_TEMPERATURE = 5.0
+_DEFAULT_FINAL_TEMPERATURE = 0.05
+_DEFAULT_TABU_TENURE = 5
+# Number of random moves a tabu search step chooses from
+_TABU_CANDIDATES = 8
+
+# A swap of the tiles (True) or the numbers (False) of two cells
+_Move = Tuple[bool, int, int]
+
+
+class Objective:
+    """Weighted sum of objective terms, named after `OBJECTIVE_TERMS` (or the given `terms`), to be minimized.
+
+    The "violations" term is the number adjacency violation of the board (`BaseBoard._grid_violation`). Board metrics
+    are only computed if some other term has a weight.
+    """
+
+    def __init__(self, weights: Mapping[str, float], terms: Optional[Mapping[str, ObjectiveTerm]] = None):
+        self.terms = {**OBJECTIVE_TERMS, **(terms or {})}
+        unknown = set(weights) - set(self.terms) - {VIOLATIONS_TERM}
+        if unknown:
+            raise ValueError(f"Unknown objective terms {sorted(unknown)}")
+        self.weights = dict(weights)
+        self._metric_weights = [
+            (self.terms[name], weight) for name, weight in self.weights.items() if name != VIOLATIONS_TERM and weight
+        ]
+        self._violation_weight = self.weights.get(VIOLATIONS_TERM, 0.0)
+
+    def __call__(self, board: BaseBoard) -> Tuple[int, float]:
+        """Return the violation and the objective value of a board."""
+        violation = board._grid_violation(board.grid)
+        value = self._violation_weight * violation
+        if self._metric_weights:
+            metrics = evaluate_board(board)
+            value += sum(weight * term(board, metrics) for term, weight in self._metric_weights)
+        return violation, value
+
+
+DEFAULT_OBJECTIVE = Objective({VIOLATIONS_TERM: 10, "resource_pip_spread": 1, "harbor_pip_spread": 1})
+
+
+class OptimizationMethod(Enum):
+    """How boards are optimized.
+
+    ANNEALING applies a random move per iteration, accepting worse boards with a probability that decreases as the
+    temperature cools down (geometrically, over the budget).
+
+    TABU applies, at every step, the best of a few random moves, even if worse, skipping moves of the cells moved in
+    the last `tabu_tenure` steps unless they improve on the best board found.
+    """
+
+    ANNEALING = auto()
+    TABU = auto()
+
+
+class OptimizationResult(NamedTuple):
+    board: BaseBoard
+    violation: int
+    objective: float
+    iterations: int
+
+
+class _Budget:
+
+    def __init__(self, max_iterations: Optional[int], time_budget_s: Optional[float]):
+        if max_iterations is None and time_budget_s is None:
+            raise ValueError("An iteration or time budget is needed")
+        self.max_iterations = max_iterations
+        self.time_budget_s = time_budget_s
+        self.iterations = 0
+        self._start = time.perf_counter()
+
+    def progress(self) -> float:
+        """Fraction of the budget spent, from 0 to 1 (or more once exhausted)."""
+        progress = 0.0
+        if self.max_iterations is not None:
+            progress = self.iterations / self.max_iterations if self.max_iterations > 0 else 1.0
+        if self.time_budget_s is not None:
+            elapsed = time.perf_counter() - self._start
+            progress = max(progress, elapsed / self.time_budget_s if self.time_budget_s > 0 else 1.0)
+        return progress
+
+
+class _Search:
+
+    def __init__(self, board: BaseBoard, objective: Objective, budget: _Budget, rng: random.Random):
+        self.board = type(board).from_grid(board.grid.copy(), rng=rng)
+        self.objective = objective
+        self.budget = budget
+        self.rng = rng
+        grid = self.board.grid
+        self.land_cell_ids = [grid.cell_id(x, y) for x, y in self.board._land_indexes]
+        self.violation, self.value = objective(self.board)
+        self.best = (self.board.grid.copy(), self.violation, self.value)
+
+    def random_move(self) -> Optional[_Move]:
+        # Every move tried is an iteration, even if not allowed (None), so that the budget always runs out
+        self.budget.iterations += 1
+        grid = self.board.grid
+        if self.rng.random() < 0.5:
+            cell_id1, cell_id2 = self.rng.sample(self.land_cell_ids, 2)
+            if not self.board._is_valid_swap(*grid.cell_index(cell_id1), *grid.cell_index(cell_id2)):
+                return None
+            return True, cell_id1, cell_id2
+        cell_id1, cell_id2 = self.rng.sample(self.land_cell_ids, 2)
+        tile1, tile2 = grid.get_cell(cell_id1), grid.get_cell(cell_id2)
+        if tile1.kind != TileKind.TERRAIN or tile2.kind != TileKind.TERRAIN or tile1.number == tile2.number:
+            return None
+        return False, cell_id1, cell_id2
+
+    def apply(self, move: _Move) -> None:
+        # Moves are their own inverse
+        swap_tiles, cell_id1, cell_id2 = move
+        grid = self.board.grid
+        tile1, tile2 = grid.get_cell(cell_id1), grid.get_cell(cell_id2)
+        if swap_tiles:
+            grid.set_cell(cell_id1, tile2)
+            grid.set_cell(cell_id2, tile1)
+        else:
+            grid.set_cell(cell_id1, type(tile1)(tile2.number))
+            grid.set_cell(cell_id2, type(tile2)(tile1.number))
+
+    def is_better_than_best(self, violation: int, value: float) -> bool:
+        _, best_violation, best_value = self.best
+        return (violation > 0, value) < (best_violation > 0, best_value)
+
+    def update_best(self) -> None:
+        if self.is_better_than_best(self.violation, self.value):
+            self.best = (self.board.grid.copy(), self.violation, self.value)
+
+    def anneal(self, initial_temperature: float, final_temperature: float) -> None:
+        while (progress := self.budget.progress()) < 1:
+            temperature = initial_temperature * (final_temperature / initial_temperature)**progress
+            move = self.random_move()
+            if move is None:
+                continue
+            self.apply(move)
+            violation, value = self.objective(self.board)
+            delta = value - self.value
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                self.violation, self.value = violation, value
+                self.update_best()
+            else:
+                self.apply(move)
+
+    def tabu_search(self, tenure: int) -> None:
+        recent_moves: Deque[Set[int]] = deque(maxlen=tenure)
+        while self.budget.progress() < 1:
+            tabu_cells = set().union(*recent_moves)
+            candidates: List[Tuple[float, int, _Move]] = []
+            for _ in range(_TABU_CANDIDATES):
+                move = self.random_move()
+                if move is None:
+                    continue
+                self.apply(move)
+                violation, value = self.objective(self.board)
+                self.apply(move)
+                admissible = not tabu_cells.intersection(move[1:]) or self.is_better_than_best(violation, value)
+                if admissible:
+                    candidates.append((value, violation, move))
+                if self.budget.progress() >= 1:
+                    break
+            if not candidates:
+                recent_moves.append(set())
+                continue
+            value, violation, move = min(candidates, key=lambda candidate: candidate[:2])
+            self.apply(move)
+            self.violation, self.value = violation, value
+            self.update_best()
+            recent_moves.append(set(move[1:]))
+
+    def result(self) -> OptimizationResult:
+        grid, violation, value = self.best
+        return OptimizationResult(
+            type(self.board).from_grid(grid, rng=self.rng), violation, value, self.budget.iterations
+        )
+
+
+def optimize_board(
+    board: BaseBoard,
+    objective: Objective = DEFAULT_OBJECTIVE,
+    method: OptimizationMethod = OptimizationMethod.ANNEALING,
+    max_iterations: Optional[int] = None,
+    time_budget_s: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+    initial_temperature: float = _DEFAULT_INITIAL_TEMPERATURE,
+    final_temperature: float = _DEFAULT_FINAL_TEMPERATURE,
+    tabu_tenure: int = _DEFAULT_TABU_TENURE
+) -> OptimizationResult:
+    """Search for a better board than `board` (left unchanged) until either budget runs out, returning the best one.
+
+    The budgets are the number of moves tried and the wall-clock time in seconds. At least one is needed, and only an
+    iteration budget makes the result depend on `rng` alone. Without `rng`, a new unseeded generator is used, so that
+    the generator of `board` is not advanced either.
+    """
+    if not 0 < final_temperature <= initial_temperature:
+        raise ValueError("Temperatures must be positive and the final one no higher than the initial one")
+    budget = _Budget(max_iterations, time_budget_s)
+    search = _Search(board, objective, budget, rng if rng is not None else random.Random())
+    if len(search.land_cell_ids) >= 2:
+        match method:
+            case OptimizationMethod.ANNEALING:
+                search.anneal(initial_temperature, final_temperature)
+            case OptimizationMethod.TABU:
+                search.tabu_search(tabu_tenure)
+            case _:
+                raise ValueError(f"Unknown optimization method {method}")
+    return search.result()
@@ -0,0 +1,166 @@
+"""Racing generation: several independent generation chains per board, the cheapest one winning.
+
+Chain k generates the board of seed `derive_seed(seed, k)`. Its cost is the number of generation attempts plus the
+number of repair iterations it takes, which depends on its seed alone, and the winner is the chain with the lowest
+cost, ties going to the lowest chain index. Chains share the best (cost, index) found so far and give up, between
+attempts, as soon as they can no longer beat it, so the losers are cancelled early while the winner does not depend on
+which chain happened to finish first.
+"""
+import random
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import Array, Lock
+from typing import Any, List, NamedTuple, Optional, Tuple, Type
+
+from catanpg.base.board import BaseBoard, GenerationEngine
+from catanpg.base.generation_stats import GenerationStats
+from catanpg.generation import Board, board_class, derive_seed
+from catanpg.hex_grid import HexGrid
+
+_DEFAULT_CHAINS = 4
+
+# Scoreboard of the chains run by a process pool worker, shared with the racer through the pool initializer
+_worker_scoreboard: Optional["_Scoreboard"] = None
+
+
+class RaceResult(NamedTuple):
+    board: BaseBoard
+    # Index of the winning chain, whose board is the one generated from `derive_seed(seed, chain)`
+    chain: int
+    # Generation attempts plus repair iterations of the winning chain
+    cost: int
+
+
+class _Scoreboard:
+    """Lowest (cost, chain index) of the chains that completed a board, in a list or a shared memory array."""
+
+    def __init__(self, best: Any, lock: Any):
+        self._best = best
+        self._lock = lock
+
+    def reset(self) -> None:
+        with self._lock:
+            self._best[0] = self._best[1] = sys.maxsize
+
+    def best(self) -> Tuple[int, int]:
+        with self._lock:
+            return self._best[0], self._best[1]
+
+    def offer(self, cost: int, chain: int) -> None:
+        with self._lock:
+            if (cost, chain) < (self._best[0], self._best[1]):
+                self._best[0], self._best[1] = cost, chain
+
+
+def _set_worker_scoreboard(best: Any, lock: Any) -> None:
+    global _worker_scoreboard
+    _worker_scoreboard = _Scoreboard(best, lock)
+
+
+def _generation_cost(stats: GenerationStats) -> int:
+    return stats.attempts + stats.repair_iterations
+
+
+def _run_chain(
+    board_cls: Type[BaseBoard],
+    chain_seed: int,
+    chain: int,
+    ordered_numbers: bool,
+    engine: GenerationEngine,
+    scoreboard: Optional[_Scoreboard] = None
+) -> Optional[Tuple[BaseBoard, int]]:
+    # The board and its cost, or None if the chain gave up. Generates the same board as `generate_board`.
+    scoreboard = scoreboard if scoreboard is not None else _worker_scoreboard
+    assert scoreboard is not None
+    board = board_cls.from_grid(HexGrid(board_cls._radius), rng=random.Random(chain_seed))
+    stats = board.stats = GenerationStats()
+
+    def keep_going() -> bool:
+        # The next attempt costs at least 1
+        return (_generation_cost(stats) + 1, chain) < scoreboard.best()
+
+    if not board._generate(ordered_numbers, engine, keep_going):
+        return None
+    cost = _generation_cost(stats)
+    scoreboard.offer(cost, chain)
+    return board, cost
+
+
+class BoardRacer:
+    """Generates boards by racing `chains` chains at once, in threads or (with `use_processes`) processes.
+
+    The pool is kept across races, so a racer should be reused and closed (or used as a context manager). Races are
+    run one at a time. Threads only interleave the chains, processes run them in parallel.
+    """
+
+    def __init__(self, chains: int = _DEFAULT_CHAINS, use_processes: bool = False):
+        if chains < 1:
+            raise ValueError(f"At least one chain is needed (got {chains})")
+        self.chains = chains
+        self._race_lock = threading.Lock()
+        self._executor: Executor
+        if use_processes:
+            best, lock = Array("q", 2, lock=False), Lock()
+            self._scoreboard = _Scoreboard(best, lock)
+            self._chain_scoreboard = None
+            self._executor = ProcessPoolExecutor(
+                max_workers=chains, initializer=_set_worker_scoreboard, initargs=(best, lock)
+            )
+        else:
+            self._scoreboard = self._chain_scoreboard = _Scoreboard([0, 0], threading.Lock())
+            self._executor = ThreadPoolExecutor(max_workers=chains)
+
+    def race(
+        self,
+        variant: Board,
+        seed: int,
+        ordered_numbers: bool = False,
+        engine: GenerationEngine = GenerationEngine.REPAIR
+    ) -> RaceResult:
+        """Race the chains of `seed`, returning once every chain has either completed its board or given up."""
+        board_cls = board_class(variant)
+        with self._race_lock:
+            self._scoreboard.reset()
+            futures = [
+                self._executor.submit(
+                    _run_chain,
+                    board_cls,
+                    derive_seed(seed, chain),
+                    chain,
+                    ordered_numbers,
+                    engine,
+                    self._chain_scoreboard
+                )
+                for chain in range(self.chains)
+            ]
+            results: List[Tuple[int, int, BaseBoard]] = []
+            for chain, future in enumerate(futures):
+                result = future.result()
+                if result is not None:
+                    board, cost = result
+                    results.append((cost, chain, board))
+        cost, chain, board = min(results, key=lambda result: result[:2])
+        return RaceResult(board, chain, cost)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "BoardRacer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def race_board(
+    variant: Board,
+    seed: int,
+    chains: int = _DEFAULT_CHAINS,
+    use_processes: bool = False,
+    ordered_numbers: bool = False,
+    engine: GenerationEngine = GenerationEngine.REPAIR
+) -> RaceResult:
+    """Race a single board with a racer of its own (see `BoardRacer` to race many boards on the same pool)."""
+    with BoardRacer(chains, use_processes) as racer:
+        return racer.race(variant, seed, ordered_numbers=ordered_numbers, engine=engine)
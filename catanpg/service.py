@@ -0,0 +1,376 @@
+"""Local HTTP service serving freshly generated boards from warm, per-variant pools.
+
+Run with `python -m catanpg.service` (or `catanpg-service`). Endpoints:
+
+- `GET /boards/<variant>.json` (e.g. `/boards/base.json`): a board, as described by `catanpg.encoding.board_to_dict`
+- `GET /boards/<variant>.png`: the image of a board (needs Pillow)
+- `GET /boards/<variant>.svg`: the vector image of a board, drawn on request as it is much cheaper than rasterizing
+- `GET /metrics`: pool hit rates and refill latencies
+
+Every board response carries the board seed in the `X-Board-Seed` header, so the board can be regenerated with
+`generate_board`. Pools are refilled in the background by worker processes, which also render the PNG images, so
+neither generation nor rendering sits on the request path unless a pool runs dry.
+"""
+import argparse
+import asyncio
+import itertools as it
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from urllib.parse import urlsplit
+
+from catanpg.base.board import BaseBoard
+from catanpg.base.board_svg import SVG_MEDIA_TYPE
+from catanpg.encoding import board_to_dict
+from catanpg.generation import (
+    Board,
+    board_image_class,
+    board_svg_class,
+    derive_seed,
+    generate_board,
+)
+
+_DEFAULT_DEPTH = 16
+_DEFAULT_PORT = 8080
+# Number of recent refills the latency metrics are computed on
+_LATENCY_WINDOW = 1000
+# Delay before retrying a failed refill, doubling with every consecutive failure up to the maximum
+_REFILL_BACKOFF_S = 0.1
+_MAX_REFILL_BACKOFF_S = 10.0
+
+
+class PooledBoard(NamedTuple):
+    seed: int
+    board: BaseBoard
+    png: Optional[bytes]
+
+
+def _png_available() -> bool:
+    try:
+        import catanpg.base.board_image  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _generate_pooled_board(variant: Board, render: bool, seed: int) -> PooledBoard:
+    board = generate_board(variant, seed)
+    png = None
+    if render:
+        png = board_image_class(variant)(board).to_png_bytes()
+    return PooledBoard(seed, board, png)
+
+
+class PoolMetrics:
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        # Refill latencies include the time spent waiting for a free worker
+        self._refill_latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def add_refill(self, latency_s: float) -> None:
+        self.refills += 1
+        self._refill_latencies.append(latency_s)
+
+    def as_dict(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        latencies = sorted(self._refill_latencies)
+
+        def percentile_ms(q: float) -> Optional[float]:
+            # Nearest-rank percentile
+            return latencies[max(0, math.ceil(q/100 * len(latencies)) - 1)] * 1000 if latencies else None
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests > 0 else None,
+            "refills": self.refills,
+            "refill_failures": self.refill_failures,
+            "refill_latency_mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else None,
+            "refill_latency_p50_ms": percentile_ms(50),
+            "refill_latency_p95_ms": percentile_ms(95),
+            "refill_latency_max_ms": latencies[-1] * 1000 if latencies else None,
+        }
+
+
+class BoardPool:
+    """Pool of up to `depth` pre-generated boards of a variant, kept full by `refillers` background tasks.
+
+    When the pool is empty, a board is generated on demand (a pool miss).
+    """
+
+    def __init__(self, variant: Board, depth: int, executor: Executor, seeds: Iterator[int], render: bool):
+        if depth < 1:
+            raise ValueError(f"The pool depth must be at least 1 (got {depth})")
+        self.variant = variant
+        self.depth = depth
+        self.metrics = PoolMetrics()
+        self._executor = executor
+        self._seeds = seeds
+        self._generate: Callable[[int], PooledBoard] = partial(_generate_pooled_board, variant, render)
+        self._boards: asyncio.Queue[PooledBoard] = asyncio.Queue(maxsize=depth)
+        self._refill_tasks: List[asyncio.Task[None]] = []
+
+    def __len__(self) -> int:
+        return self._boards.qsize()
+
+    def start(self, refillers: int = 1) -> None:
+        self._refill_tasks.extend(asyncio.create_task(self._refill()) for _ in range(refillers))
+
+    async def close(self) -> None:
+        for task in self._refill_tasks:
+            task.cancel()
+        await asyncio.gather(*self._refill_tasks, return_exceptions=True)
+        self._refill_tasks.clear()
+
+    async def _generate_board(self) -> PooledBoard:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._generate, next(self._seeds))
+
+    async def _refill(self) -> None:
+        # Failures (e.g. a broken worker pool) are logged and retried with backoff, so that the pool keeps refilling
+        backoff_s = _REFILL_BACKOFF_S
+        while True:
+            start = time.perf_counter()
+            try:
+                pooled_board = await self._generate_board()
+            except Exception:
+                self.metrics.refill_failures += 1
+                logging.exception(f":refill-failed {self.variant.name} :retry-in-s {backoff_s}")
+                await asyncio.sleep(backoff_s)
+                backoff_s = min(2*backoff_s, _MAX_REFILL_BACKOFF_S)
+                continue
+            backoff_s = _REFILL_BACKOFF_S
+            self.metrics.add_refill(time.perf_counter() - start)
+            await self._boards.put(pooled_board)
+
+    async def get(self) -> PooledBoard:
+        try:
+            pooled_board = self._boards.get_nowait()
+        except asyncio.QueueEmpty:
+            self.metrics.misses += 1
+            return await self._generate_board()
+        self.metrics.hits += 1
+        return pooled_board
+
+
+def _response(
+    status: HTTPStatus,
+    body: bytes,
+    content_type: str,
+    keep_alive: bool,
+    headers: Optional[Mapping[str, str]] = None
+) -> bytes:
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        *(f"{name}: {value}" for name, value in (headers or {}).items()),
+    ]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _json_body(data: Any) -> bytes:
+    return json.dumps(data).encode()
+
+
+class BoardService:
+    """Board pools of every variant, served over HTTP/1.1."""
+
+    def __init__(
+        self,
+        depth: int = _DEFAULT_DEPTH,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        variants: Sequence[Board] = tuple(Board)
+    ):
+        self.depth = depth
+        self.workers = workers
+        self.seed = random.randrange(sys.maxsize) if seed is None else seed
+        self.variants = tuple(variants)
+        self.render = _png_available()
+        self.pools: Dict[Board, BoardPool] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = _DEFAULT_PORT) -> asyncio.Server:
+        workers = self.workers if self.workers is not None else os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        for variant in self.variants:
+            # Every variant draws its seeds from its own stream
+            seeds = (derive_seed(derive_seed(self.seed, variant.value), k) for k in it.count())
+            pool = BoardPool(variant, self.depth, self._executor, seeds, self.render)
+            pool.start(refillers=workers)
+            self.pools[variant] = pool
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        logging.info(f":service-started {self.addresses()} :seed {self.seed}")
+        return self._server
+
+    def addresses(self) -> List[Tuple[str, int]]:
+        return [socket.getsockname()[:2] for socket in self._server.sockets] if self._server is not None else []
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await asyncio.gather(*(pool.close() for pool in self.pools.values()))
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            variant.name.lower(): {"pool_size": len(pool), "pool_depth": pool.depth, **pool.metrics.as_dict()}
+            for variant, pool in self.pools.items()
+        }
+
+    async def _route(self, method: str, target: str) -> Tuple[HTTPStatus, bytes, str, Dict[str, str]]:
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, _json_body({"error": "Only GET is supported"}), "application/json", {}
+        path = urlsplit(target).path
+        if path == "/metrics":
+            return HTTPStatus.OK, _json_body(self.metrics()), "application/json", {}
+        prefix, _, name = path.rpartition("/")
+        variant_name, _, extension = name.partition(".")
+        variant = next((v for v in self.pools if v.name.lower() == variant_name), None)
+        if prefix != "/boards" or variant is None or extension not in ("json", "png", "svg"):
+            return HTTPStatus.NOT_FOUND, _json_body({"error": f"Unknown path {path}"}), "application/json", {}
+        if extension == "png" and not self.render:
+            body = _json_body({"error": "Rendering needs Pillow"})
+            return HTTPStatus.NOT_IMPLEMENTED, body, "application/json", {}
+        pooled_board = await self.pools[variant].get()
+        headers = {"X-Board-Seed": str(pooled_board.seed)}
+        if extension == "png":
+            assert pooled_board.png is not None
+            return HTTPStatus.OK, pooled_board.png, "image/png", headers
+        if extension == "svg":
+            svg = board_svg_class(variant)(pooled_board.board).to_bytes()
+            return HTTPStatus.OK, svg, SVG_MEDIA_TYPE, headers
+        body = _json_body({"seed": pooled_board.seed, **board_to_dict(pooled_board.board)})
+        return HTTPStatus.OK, body, "application/json", headers
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(_response(HTTPStatus.BAD_REQUEST, b"", "text/plain", keep_alive=False))
+                    break
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    status, body, content_type, response_headers = await self._route(method, target)
+                except Exception:
+                    # E.g. a board that failed to generate on a pool miss: the client still gets a response
+                    logging.exception(f":request-failed {method} {target}")
+                    status, content_type, response_headers = HTTPStatus.INTERNAL_SERVER_ERROR, "application/json", {}
+                    body = _json_body({"error": "Internal server error"})
+                logging.debug(f":request {method} {target} :status {status.value}")
+                writer.write(_response(status, body, content_type, keep_alive, response_headers))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = _DEFAULT_PORT) -> None:
+        server = await self.start(host, port)
+        try:
+            await server.serve_forever()
+        finally:
+            await self.close()
+
+
+def parse_arguments(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="catanpg-service", description=__doc__)
+    parser.add_argument(
+        '--host',
+        dest='host',
+        default="127.0.0.1",
+        help="Set the address to listen on (default is 127.0.0.1)."
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        dest='port',
+        default=_DEFAULT_PORT,
+        help=f"Set the port to listen on (default is {_DEFAULT_PORT})."
+    )
+    parser.add_argument(
+        '--depth',
+        type=int,
+        dest='depth',
+        default=_DEFAULT_DEPTH,
+        help=f"Set the number of pre-generated boards kept per variant (default is {_DEFAULT_DEPTH})."
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        dest='workers',
+        default=None,
+        help="Set the number of processes refilling the pools (default is one per CPU)."
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        dest='seed',
+        default=None,
+        help="Set the seed the board seeds are derived from (default is no fixed seed)."
+    )
+    parser.add_argument(
+        '--log',
+        dest='log_level',
+        default="WARNING",
+        choices=("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"),
+        help="Set the log level (default is WARNING)."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_arguments(argv)
+    logging.basicConfig(level=args.log_level)
+    service = BoardService(depth=args.depth, workers=args.workers, seed=args.seed)
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,9 +1,8 @@
 import itertools as it
-import random
 from typing import Dict, List, Set, Tuple, Type
 
 from catanpg.base.board import BaseBoard
-from catanpg.base.hex_tile import DesertTile, HexTile, NumberOrNumbers
+from catanpg.base.hex_tile import DesertTile, HexTile, NumberOrNumbers, TileKind
 from catanpg.base.tile_sequence import SeaBorderTile
 from catanpg.hex_grid import Direction, corner_at_distance, index_radius
 from catanpg.tab.hex_tile import LAKE_NUMBERS, SEA_FISH_TILE_CLSS, LakeTile
@@ -24,7 +23,7 @@ class FishermenOfCatanBoard(BaseBoard):
     def _mk_border_tiles(self) -> Tuple[List[SeaBorderTile], List[SeaBorderTile]]:
         single_harbor_borders, double_harbor_borders = super()._mk_border_tiles()
         sea_fish_tiles = [fish_tile_cls() for fish_tile_cls in SEA_FISH_TILE_CLSS]
-        random.shuffle(sea_fish_tiles)
+        self._rng.shuffle(sea_fish_tiles)
         for border in single_harbor_borders:
             border.tiles[2] = sea_fish_tiles.pop()
         for border in double_harbor_borders:
@@ -32,17 +31,16 @@ class FishermenOfCatanBoard(BaseBoard):
         assert len(sea_fish_tiles) == 0
         return single_harbor_borders, double_harbor_borders
 
-    def _shuffle_tiles(self, ordered_numbers: bool) -> None:
+    def _place_fixed_tiles(self) -> None:
         # Lake cannot be placed next to the sea borders
-        lake_pos = random.choice(list(it.chain(list(Direction), [None])))
+        lake_pos = self._rng.choice(list(it.chain(list(Direction), [None])))
         lake_x, lake_y = corner_at_distance(lake_pos, 1) if lake_pos else (0, 0)
         self.grid.set(lake_x, lake_y, LakeTile())
-        super()._shuffle_tiles(ordered_numbers)
 
     def _is_valid_swap(self, x_repair: int, y_repair: int, x_swap: int, y_swap: int) -> bool:
         def _not_invalid_lake_swap(x_maybe_lake: int, y_maybe_lake: int, x_other: int, y_other: int) -> bool:
             return (
-                not isinstance(self.grid.get(x_maybe_lake, y_maybe_lake), LakeTile) or
+                self.grid.get(x_maybe_lake, y_maybe_lake).kind != TileKind.LAKE or
                 index_radius(x_other, y_other) < 2
             )
         return (
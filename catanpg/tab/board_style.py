@@ -0,0 +1,19 @@
+"""Colors and geometry of Fishermen of Catan board drawings, shared by the raster and vector renderers."""
+from catanpg.base.board_style import Color
+from catanpg.base.board_style import hex_tile_color as base_hex_tile_color
+from catanpg.base.hex_tile import HexTile
+from catanpg.tab.hex_tile import FishTile
+
+FISH_TILE_COLOR = (0, 138, 184, 0)
+
+# The lake has one small number token per number, around its center
+LAKE_TOKEN_RADIUS = 12
+LAKE_FONT_SIZE = 18
+# Offsets of the lake number tokens from the tile center, in number order
+LAKE_NUMBER_OFFSETS = ((-14, -14), (14, -14), (-14, 14), (14, 14))
+
+
+def hex_tile_color(tile: HexTile) -> Color:
+    if isinstance(tile, FishTile):
+        return FISH_TILE_COLOR
+    return base_hex_tile_color(tile)
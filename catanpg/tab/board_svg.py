@@ -0,0 +1,32 @@
+from typing import Iterator, Mapping
+
+from catanpg.base.board_style import NUMBER_CIRCLE_COLOR, Color
+from catanpg.base.board_svg import BaseBoardSvg, svg_color
+from catanpg.base.hex_tile import HexTile, NumberOrNumbers
+from catanpg.tab.board_style import (
+    LAKE_FONT_SIZE,
+    LAKE_NUMBER_OFFSETS,
+    LAKE_TOKEN_RADIUS,
+    hex_tile_color,
+)
+
+
+class FishermenOfCatanBoardSvg(BaseBoardSvg):
+
+    _text_font_sizes: Mapping[str, int] = {**BaseBoardSvg._text_font_sizes, "lake": LAKE_FONT_SIZE}
+
+    def _get_hex_tile_color(self, tile: HexTile) -> Color:
+        return hex_tile_color(tile)
+
+    def _shape_elements(self) -> Iterator[str]:
+        yield from super()._shape_elements()
+        fill = svg_color(NUMBER_CIRCLE_COLOR)
+        yield f'<circle id="lake-token" r="{LAKE_TOKEN_RADIUS}" fill="{fill}" stroke="black"/>'
+
+    def _number_token_elements(self, center_x: float, center_y: float, number: NumberOrNumbers) -> Iterator[str]:
+        if not isinstance(number, int) and len(number) == 4:
+            for lake_number, (offset_x, offset_y) in zip(number, LAKE_NUMBER_OFFSETS):
+                yield self._use_element("lake-token", center_x + offset_x, center_y + offset_y)
+                yield self._text_element(center_x + offset_x, center_y + offset_y, str(lake_number), "lake")
+        else:
+            yield from super()._number_token_elements(center_x, center_y, number)
@@ -1,60 +1,72 @@
 """Hexagonal tiles for the Traders and Barbarians boards."""
 from abc import ABC
-from typing import Any
 
-from catanpg.base.hex_tile import NumberedHexTile, SeaTile
+from catanpg.base.hex_tile import NumberedHexTile, SeaTile, TileKind
 
 LAKE_NUMBERS = (11, 12, 2, 3)
 
 
 class FishTile(NumberedHexTile, ABC):
-    pass
+    __slots__ = ()
+
+    kind = TileKind.FISH
 
 
 class SeaFishTile(SeaTile, FishTile, ABC):
-    pass
+    __slots__ = ()
+
+    kind = TileKind.FISH
 
 
 class Sea4FishTile(SeaFishTile):
+    __slots__ = ()
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        super().__init__(4, *args, **kwargs)
+    def _set_fields(self) -> None:  # type: ignore[override]
+        super()._set_fields(4)
 
 
 class Sea5FishTile(SeaFishTile):
+    __slots__ = ()
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        super().__init__(5, *args, **kwargs)
+    def _set_fields(self) -> None:  # type: ignore[override]
+        super()._set_fields(5)
 
 
 class Sea6FishTile(SeaFishTile):
+    __slots__ = ()
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        super().__init__(6, *args, **kwargs)
+    def _set_fields(self) -> None:  # type: ignore[override]
+        super()._set_fields(6)
 
 
 class Sea8FishTile(SeaFishTile):
+    __slots__ = ()
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        super().__init__(8, *args, **kwargs)
+    def _set_fields(self) -> None:  # type: ignore[override]
+        super()._set_fields(8)
 
 
 class Sea9FishTile(SeaFishTile):
+    __slots__ = ()
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        super().__init__(9, *args, **kwargs)
+    def _set_fields(self) -> None:  # type: ignore[override]
+        super()._set_fields(9)
 
 
 class Sea10FishTile(SeaFishTile):
+    __slots__ = ()
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        super().__init__(10, *args, **kwargs)
+    def _set_fields(self) -> None:  # type: ignore[override]
+        super()._set_fields(10)
 
 
 SEA_FISH_TILE_CLSS = (Sea4FishTile, Sea5FishTile, Sea6FishTile, Sea8FishTile, Sea9FishTile, Sea10FishTile)
 
 
 class LakeTile(FishTile):
+    __slots__ = ()
+
+    kind = TileKind.LAKE
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        super().__init__(LAKE_NUMBERS, *args, **kwargs)
+    def _set_fields(self) -> None:  # type: ignore[override]
+        super()._set_fields(LAKE_NUMBERS)
@@ -0,0 +1,12 @@
+from typing import Any, List, Tuple
+
+from catanpg.base.board import BaseBoard
+from catanpg.hex_grid import Direction
+
+
+def board_tiles(board: BaseBoard) -> List[Tuple[Any, ...]]:
+    """Class, number and orientation of every tile of a board, in spiral order, to compare boards tile by tile."""
+    return [
+        (tile.__class__, getattr(tile, "number", None), getattr(tile, "orientation", None))
+        for tile in board.grid.spiral_ordered_hexes(Direction.EAST)
+    ]
@@ -0,0 +1,39 @@
+import itertools as it
+import random
+from collections import Counter
+
+import pytest
+
+from catanpg.base.board import _ORDERED_NUMBERS
+from catanpg.generation import Board, board_class
+from catanpg.hex_grid import HexGrid
+from catanpg.tab.hex_tile import LAKE_NUMBERS
+
+np = pytest.importorskip("numpy")
+batch = pytest.importorskip("catanpg.batch")
+
+
+def test_sample_boards() -> None:
+    for variant, ordered in it.product(Board, (False, True)):
+        boards = batch.sample_boards(variant, 50, seed=3, ordered_numbers=ordered)
+        assert boards.terrains.shape == boards.numbers.shape == (50, 37)
+        land_numbers = boards.numbers[:, batch._variant_tables(variant).land_cell_ids]
+        lake_code = batch.number_code(LAKE_NUMBERS)
+        for row in land_numbers:
+            assert Counter(n for n in row if n not in (batch.NO_NUMBER, lake_code)) == Counter(_ORDERED_NUMBERS)
+        assert (boards.violations() >= 0).all()
+
+
+def test_violations_match_board() -> None:
+    for variant in Board:
+        rng = random.Random(5)
+        boards = []
+        for _ in range(30):
+            # Unrepaired boards, so that violations are actually found
+            board = board_class(variant).from_grid(HexGrid(3), rng=rng)
+            board._shuffle_borders()
+            board._shuffle_tiles(ordered_numbers=False)
+            boards.append(board)
+        violations = batch.BoardBatch.from_boards(boards).violations()
+        assert violations.tolist() == [board._grid_violation(board.grid) for board in boards]
+        assert violations.any()
@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from catanpg.bench import Benchmark, main, run_benchmark, run_benchmarks
+from catanpg.racing import BoardRacer
+
+
+def test_run_benchmarks() -> None:
+    report = run_benchmarks(range(3), ["generate/base", "hex-grid/*"], measure_memory=True)
+    assert set(report["results"]) == {
+        "generate/base", "hex-grid/get-set", "hex-grid/neighbors", "hex-grid/spiral", "hex-grid/deepcopy"
+    }
+    for result in report["results"].values():
+        assert result["iterations"] == 3
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["peak_memory_kib"] >= 0
+
+
+def test_run_benchmarks_closes_racer(monkeypatch: pytest.MonkeyPatch) -> None:
+    closed = []
+    close = BoardRacer.close
+
+    def record_close(racer: BoardRacer) -> None:
+        closed.append(racer)
+        close(racer)
+
+    monkeypatch.setattr(BoardRacer, "close", record_close)
+    report = run_benchmarks(range(2), ["generate/base-race*"], measure_memory=False)
+    assert list(report["results"]) == ["generate/base-race4"] and len(closed) == 1
+
+
+def test_repeated_benchmark() -> None:
+    calls: List[int] = []
+    result = run_benchmark(
+        Benchmark("calls", calls.append, repeat=5, restarts=lambda seed: seed), range(3), measure_memory=False
+    )
+    assert calls == [0] * 5 + [1] * 5 + [2] * 5
+    # Restarts are counted once per seed, outside of the timed runs
+    assert result["iterations"] == 3 and result["repeat"] == 5 and result["restarts"] == 0 + 1 + 2
+    assert result["throughput_per_s"] > 0
+
+
+def test_main_saves_and_compares(tmp_path: Path) -> None:
+    output = tmp_path / "bench.json"
+    main(["hex-grid/spiral", "--seeds", "2", "--output", str(output)])
+    assert "hex-grid/spiral" in json.loads(output.read_text())["results"]
+    main(["hex-grid/spiral", "--seeds", "2", "--no-memory", "--compare", str(output)])
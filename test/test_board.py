@@ -0,0 +1,182 @@
+import itertools as it
+import random
+import time
+from collections import Counter
+from typing import Any
+
+import pytest
+
+from catanpg.base.board import BaseBoard, GenerationEngine
+from catanpg.base.generation_stats import GenerationStatsAggregator
+from catanpg.base.hex_tile import ForestTile, HarborTile, NumberedHexTile, TileKind
+from catanpg.base.number_placement import assign_numbers
+from catanpg.extended.board import ExtendedBoard, num_land_cells, scale_amounts
+from catanpg.generation import Board, derive_seed, generate_board, generate_boards
+from catanpg.hex_grid import (
+    Direction,
+    HexGrid,
+    index_radius,
+    spiral_ordered_indexes,
+    step_from_hex,
+)
+from catanpg.racing import BoardRacer
+from catanpg.tab.board import FishermenOfCatanBoard
+
+from helpers import board_tiles
+
+
+def test_boards_have_no_violations() -> None:
+    for board_cls, seed in it.product((BaseBoard, FishermenOfCatanBoard), range(10)):
+        board = board_cls(rng=random.Random(seed))
+        assert board._grid_violation(board.grid) == 0
+
+
+def test_random_seed_reproduces_boards() -> None:
+    for board_cls in (BaseBoard, FishermenOfCatanBoard):
+        random.seed(5)
+        board = board_cls()
+        random.seed(5)
+        assert board_tiles(board_cls()) == board_tiles(board)
+
+
+def test_swap_violation_delta() -> None:
+    for board_cls, seed in it.product((BaseBoard, FishermenOfCatanBoard), range(5)):
+        board = board_cls(rng=random.Random(seed))
+        board.grid = HexGrid(3)
+        board._shuffle_borders()
+        board._shuffle_tiles(ordered_numbers=False)
+        violation = board._grid_violation(board.grid)
+        land_indexes = list(spiral_ordered_indexes(Direction.EAST, 2))
+        for idx1, idx2 in it.combinations(land_indexes, 2):
+            delta = board._swap_violation_delta(*idx1, *idx2)
+            board._swap_tiles(*idx1, *idx2)
+            assert board._grid_violation(board.grid) == violation + delta
+            board._swap_tiles(*idx1, *idx2)
+
+
+def test_generate_boards_independent_of_workers() -> None:
+    for variant in Board:
+        boards = generate_boards(variant, 6, seed=42)
+        assert list(map(board_tiles, boards)) == list(map(board_tiles, generate_boards(variant, 6, seed=42, workers=3)))
+        assert board_tiles(boards[4]) == board_tiles(generate_board(variant, derive_seed(42, 4)))
+
+
+def test_race_board() -> None:
+    with BoardRacer(chains=3) as thread_racer, BoardRacer(chains=3, use_processes=True) as process_racer:
+        for variant, seed in it.product(Board, range(4)):
+            result = thread_racer.race(variant, seed)
+            chain_costs = []
+            for chain in range(3):
+                stats = generate_board(variant, derive_seed(seed, chain), collect_stats=True).stats
+                assert stats is not None
+                chain_costs.append((stats.attempts + stats.repair_iterations, chain))
+            assert (result.cost, result.chain) == min(chain_costs)
+            assert board_tiles(result.board) == board_tiles(generate_board(variant, derive_seed(seed, result.chain)))
+            process_result = process_racer.race(variant, seed)
+            assert process_result.chain == result.chain
+            assert board_tiles(process_result.board) == board_tiles(result.board)
+
+
+def test_generation_stats() -> None:
+    aggregator = GenerationStatsAggregator()
+    for seed in range(10):
+        assert generate_board(Board.FOC, seed).stats is None
+        stats = generate_board(Board.FOC, seed, collect_stats=True).stats
+        assert stats is not None
+        assert stats.attempts == stats.restarts + 1
+        assert stats.violation_trajectories[-1][-1] == 0
+        assert all(trajectory[-1] > 0 for trajectory in stats.violation_trajectories[:-1])
+        assert stats.total_s > 0
+        aggregator.add(stats)
+    summary = aggregator.as_dict()
+    assert summary["boards"] == 10
+    assert summary["max_restarts"] <= summary["restarts"]
+
+
+def test_generation_deadline() -> None:
+    for variant, seed in it.product(Board, range(5)):
+        board = generate_board(variant, seed, deadline=time.monotonic() + 60)
+        assert board.violation == 0
+        assert board_tiles(board) == board_tiles(generate_board(variant, seed))
+        # Past the deadline, the first shuffled board is kept, with whatever violation it has
+        late_board = generate_board(variant, seed, collect_stats=True, deadline=time.monotonic())
+        assert late_board.stats is not None and late_board.stats.attempts == 1
+        assert late_board.violation == late_board.stats.violation_trajectories[0][0]
+    extended_board = ExtendedBoard(8, rng=random.Random(1), collect_stats=True, deadline=time.monotonic())
+    assert extended_board.stats is not None and extended_board.stats.attempts == 1
+    assert extended_board.violation == extended_board.stats.violation_trajectories[0][0]
+    assert generate_board(Board.BASE, 1, engine=GenerationEngine.BACKTRACKING, deadline=time.monotonic()).violation == 0
+
+
+def test_generation_deadline_keeps_lowest_violation(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Clock ticking once per deadline check, so that the deadline passes at some point of a later attempt
+    clock = it.count()
+    monkeypatch.setattr(time, "monotonic", lambda: next(clock))
+    interrupted_restarts = 0
+    for deadline, seed in it.product((4, 12, 30), range(5)):
+        boards = [
+            generate_board(Board.FOC, seed, collect_stats=True, deadline=next(clock) + deadline),
+            ExtendedBoard(6, rng=random.Random(seed), collect_stats=True, deadline=next(clock) + deadline),
+        ]
+        for board in boards:
+            assert board.stats is not None
+            violations = [violation for trajectory in board.stats.violation_trajectories for violation in trajectory]
+            assert board.violation == min(violations)
+            if board.violation > 0 and board.stats.restarts > 0:
+                interrupted_restarts += 1
+    assert interrupted_restarts > 0
+
+
+def test_backtracking_boards_have_no_violations() -> None:
+    for variant, ordered_numbers, seed in it.product(Board, (False, True), range(10)):
+        board = generate_board(variant, seed, ordered_numbers=ordered_numbers, engine=GenerationEngine.BACKTRACKING)
+        assert board._grid_violation(board.grid) == 0
+
+
+def test_assign_numbers() -> None:
+    # Three mutually adjacent cells
+    neighbors = [[1, 2], [0, 2], [0, 1]]
+    assert assign_numbers(neighbors, [[], [], []], [6, 8, 5], [{6, 8}]) is None
+    assert assign_numbers(neighbors, [[], [6], []], [6, 4, 5], [{6, 8}]) == [6, 4, 5]
+    numbers = assign_numbers(neighbors, [[], [], []], [6, 4, 5], [{6, 8}], rng=random.Random(0))
+    assert numbers is not None and sorted(numbers) == [4, 5, 6]
+
+
+def test_scale_amounts() -> None:
+    assert scale_amounts({"a": 4, "b": 3, "c": 1}, 8) == {"a": 4, "b": 3, "c": 1}
+    assert scale_amounts({"a": 4, "b": 3, "c": 1}, 16) == {"a": 8, "b": 6, "c": 2}
+    assert scale_amounts({"a": 4, "b": 3, "c": 1}, 5) == {"a": 2, "b": 2, "c": 1}
+    assert sum(scale_amounts({"a": 1, "b": 1, "c": 1}, 100).values()) == 100
+
+
+def test_extended_boards() -> None:
+    for radius, seed in it.product((2, 3, 8), range(3)):
+        board = ExtendedBoard(radius, rng=random.Random(seed))
+        assert board._grid_violation(board.grid) == 0
+        land_tiles = [board.grid.get(x, y) for x, y in spiral_ordered_indexes(Direction.EAST, radius - 1)]
+        assert Counter(map(type, land_tiles)) == Counter(board._tile_cls_to_amount)
+        numbers = [tile.number for tile in land_tiles if isinstance(tile, NumberedHexTile)]
+        assert Counter(numbers) == Counter(board._numbers)
+        for x, y in spiral_ordered_indexes(Direction.EAST, radius):
+            tile = board.grid.get(x, y)
+            if isinstance(tile, HarborTile):
+                assert index_radius(*step_from_hex(x, y, tile.orientation)) < radius
+    board = ExtendedBoard(3, rng=random.Random(0))
+    assert Counter(board._numbers) == Counter(BaseBoard()._numbers)
+    assert board._tile_cls_to_amount == BaseBoard()._tile_cls_to_amount
+    assert sum(tile.kind == TileKind.HARBOR for tile in board.grid.spiral_ordered_hexes(Direction.EAST)) == 9
+
+
+def test_extended_board_distributions() -> None:
+    tile_cls_to_amount: Any = {ForestTile: num_land_cells(4)}
+    board = ExtendedBoard(4, tile_cls_to_amount, numbers=[5] * num_land_cells(4), harbor_cls_to_amount={})
+    assert {type(tile) for tile in board.grid.spiral_ordered_hexes(Direction.EAST, 3)} == {ForestTile}
+    assert not any(isinstance(tile, HarborTile) for tile in board.grid.spiral_ordered_hexes(Direction.EAST))
+    with pytest.raises(ValueError):
+        ExtendedBoard(4, {ForestTile: 3})
+    with pytest.raises(ValueError):
+        ExtendedBoard(4, tile_cls_to_amount, numbers=[5])
+    with pytest.raises(ValueError):
+        ExtendedBoard(1)
+    with pytest.raises(ValueError):
+        ExtendedBoard(4, engine=GenerationEngine.BACKTRACKING)
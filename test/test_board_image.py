@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+
+from catanpg.generation import Board, generate_board
+
+pytest.importorskip("PIL")
+
+from catanpg.base.board_image import BaseBoardImage, get_font  # noqa: E402
+from catanpg.tab.board_image import FishermenOfCatanBoardImage  # noqa: E402
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def test_to_png_bytes() -> None:
+    image = BaseBoardImage(generate_board(Board.BASE, 1))
+    data = image.to_png_bytes()
+    assert data.startswith(_PNG_SIGNATURE)
+    assert image.to_png_bytes() == data
+    assert BaseBoardImage(generate_board(Board.BASE, 1)).to_png_bytes(compress_level=9) != data
+
+
+def test_save(tmp_path: Path) -> None:
+    image = FishermenOfCatanBoardImage(generate_board(Board.FOC, 2))
+    image.save(tmp_path / "board.png")
+    assert (tmp_path / "board.png").read_bytes().startswith(_PNG_SIGNATURE)
+    image.save(tmp_path / "board.img", format="JPEG", quality=50)
+    assert (tmp_path / "board.img").read_bytes().startswith(b"\xff\xd8")
+    with pytest.raises(ValueError):
+        image.save(tmp_path / "board.unknown")
+
+
+def test_get_font_is_cached() -> None:
+    assert get_font(17) is get_font(17)
+
+
+def test_sprites_are_shared() -> None:
+    BaseBoardImage._sprite_atlas.clear()
+    for seed in range(5):
+        FishermenOfCatanBoardImage(generate_board(Board.FOC, seed)).render()
+    num_sprites = len(BaseBoardImage._sprite_atlas)
+    # Tile colors, numbers (including the lake and fish numbers) and ports with their orientation
+    assert num_sprites <= 7 + 11 + 6*6
+    FishermenOfCatanBoardImage(generate_board(Board.FOC, 0)).render()
+    assert len(BaseBoardImage._sprite_atlas) == num_sprites
+    # Images of other classes do not reuse them, even for elements drawn the same way
+    BaseBoardImage(generate_board(Board.BASE, 0)).render()
+    assert len(BaseBoardImage._sprite_atlas) > num_sprites
+
+
+def test_scale() -> None:
+    image = BaseBoardImage(generate_board(Board.BASE, 1), scale=0.5).render()
+    assert image.size == (350, 350)
@@ -0,0 +1,41 @@
+import io
+import xml.etree.ElementTree as ET
+from collections import Counter
+from pathlib import Path
+
+from catanpg.base.board_svg import BaseBoardSvg
+from catanpg.generation import Board, board_svg_class, generate_board
+from catanpg.tab.board_svg import FishermenOfCatanBoardSvg
+
+_SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _use_counts(svg: str) -> Counter:
+    root = ET.fromstring(svg)
+    return Counter(use.get("href") for use in root.iter(f"{_SVG}use"))
+
+
+def test_svg_uses_shared_shapes() -> None:
+    svg = BaseBoardSvg(generate_board(Board.BASE, 1)).to_string()
+    assert _use_counts(svg) == {"#hex": 37, "#token": 18, "#port": 9}
+    root = ET.fromstring(svg)
+    assert root.get("viewBox") == "0 0 700 700"
+    port_labels = Counter(text.text for text in root.iter(f"{_SVG}text") if text.get("class") == "port")
+    assert port_labels == {"3": 4, "W": 1, "L": 1, "O": 1, "G": 1, "B": 1}
+
+
+def test_foc_svg_draws_lake_numbers() -> None:
+    for seed in range(3):
+        svg = FishermenOfCatanBoardSvg(generate_board(Board.FOC, seed), scale=0.5).to_string()
+        counts = _use_counts(svg)
+        assert counts["#lake-token"] == 4 and counts["#token"] == 18 + 6
+        assert ET.fromstring(svg).get("width") == "350"
+
+
+def test_svg_save(tmp_path: Path) -> None:
+    svg = board_svg_class(Board.FOC)(generate_board(Board.FOC, 2))
+    svg.save(tmp_path / "board.svg")
+    stream = io.StringIO()
+    svg.save(stream)
+    assert (tmp_path / "board.svg").read_text() == stream.getvalue() == svg.to_string()
+    assert svg.to_bytes() == svg.to_string().encode()
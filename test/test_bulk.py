@@ -0,0 +1,44 @@
+import io
+import json
+from pathlib import Path
+
+from catanpg.bulk import OutputFormat, write_boards, write_jsonl
+from catanpg.corpus import BoardCorpus
+from catanpg.generation import (
+    Board,
+    derive_seed,
+    generate_board,
+    generate_boards,
+    iter_boards,
+)
+
+from helpers import board_tiles
+
+
+def test_iter_boards_matches_generate_boards() -> None:
+    boards = generate_boards(Board.FOC, 5, seed=3)
+    for workers, max_pending in ((1, None), (2, 1), (2, None)):
+        streamed = list(iter_boards(Board.FOC, 5, seed=3, workers=workers, max_pending=max_pending))
+        assert [seed for seed, _ in streamed] == [derive_seed(3, i) for i in range(5)]
+        assert [board_tiles(board) for _, board in streamed] == list(map(board_tiles, boards))
+
+
+def test_write_jsonl_records_regenerate() -> None:
+    stream = io.StringIO()
+    assert write_jsonl(iter_boards(Board.BASE, 3, seed=9, ordered_numbers=True), stream, ordered_numbers=True) == 3
+    records = list(map(json.loads, stream.getvalue().splitlines()))
+    assert [record["index"] for record in records] == [0, 1, 2]
+    for record in records:
+        board = generate_board(Board.BASE, record["seed"], ordered_numbers=record["ordered"])
+        assert [tile["type"] for tile in record["tiles"]] == [tile_cls.__name__ for tile_cls, *_ in board_tiles(board)]
+
+
+def test_write_binary(tmp_path: Path) -> None:
+    path = tmp_path / "boards.bin"
+    assert write_boards(Board.FOC, 4, 11, OutputFormat.BINARY, path=path, workers=2) == 4
+    with BoardCorpus(path) as corpus:
+        assert len(corpus) == 4
+        for k in range(4):
+            seed = corpus.seed(k)
+            assert seed is not None
+            assert board_tiles(corpus[k]) == board_tiles(generate_board(Board.FOC, seed))
@@ -0,0 +1,73 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from catanpg.cache import BoardCache
+from catanpg.encoding import BOARD_ENCODING_SIZE
+from catanpg.generation import Board, generate_board
+
+from helpers import board_tiles
+
+
+def test_board_cache_tiers(tmp_path: Path) -> None:
+    cache = BoardCache(tmp_path)
+    board = cache.board(Board.FOC, 3, ordered_numbers=True)
+    assert board_tiles(board) == board_tiles(generate_board(Board.FOC, 3, ordered_numbers=True))
+    assert board_tiles(generate_board(Board.FOC, 3, ordered_numbers=True, cache=cache)) == board_tiles(board)
+    assert cache.stats()["misses"] == 1 and cache.stats()["memory_hits"] == 1
+    # Other generation parameters are other entries
+    cache.board(Board.FOC, 3)
+    assert cache.stats()["misses"] == 2
+
+    reopened = BoardCache(tmp_path)
+    assert board_tiles(reopened.board(Board.FOC, 3, ordered_numbers=True)) == board_tiles(board)
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.board(Board.FOC, 3, ordered_numbers=True) is not reopened.board(Board.FOC, 3, ordered_numbers=True)
+
+
+def test_board_cache_eviction(tmp_path: Path) -> None:
+    cache = BoardCache(tmp_path, memory_bytes=3*BOARD_ENCODING_SIZE, disk_bytes=5*BOARD_ENCODING_SIZE)
+    for seed in range(8):
+        cache.board(Board.BASE, seed)
+    stats = cache.stats()
+    assert stats["memory_entries"] == 3 and stats["disk_entries"] == 5
+    assert len(os.listdir(tmp_path)) == 5
+    # The least recently used boards were evicted
+    cache.board(Board.BASE, 2)
+    assert cache.stats()["misses"] == 9
+    cache.board(Board.BASE, 7)
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_board_cache_version(tmp_path: Path) -> None:
+    BoardCache(tmp_path, version=1).board(Board.BASE, 0)
+    assert len(os.listdir(tmp_path)) == 1
+    cache = BoardCache(tmp_path, version=2)
+    assert len(os.listdir(tmp_path)) == 0
+    cache.board(Board.BASE, 0)
+    assert cache.stats()["misses"] == 1
+    # Entries of newer versions are kept for the processes using them
+    older_cache = BoardCache(tmp_path, version=1)
+    assert len(os.listdir(tmp_path)) == 1 and older_cache.stats()["disk_entries"] == 0
+
+
+def test_board_cache_removes_stale_temporary_files(tmp_path: Path) -> None:
+    stale_path, fresh_path = tmp_path / ".tmp-stale", tmp_path / ".tmp-fresh"
+    stale_path.write_bytes(b"partial")
+    fresh_path.write_bytes(b"partial")
+    os.utime(stale_path, (0, 0))
+    BoardCache(tmp_path)
+    assert not stale_path.exists() and fresh_path.exists()
+
+
+def test_board_cache_png(tmp_path: Path) -> None:
+    pytest.importorskip("PIL")
+    cache = BoardCache(tmp_path)
+    png = cache.png(Board.BASE, 5)
+    assert png.startswith(b"\x89PNG")
+    # The board generated for the image is not counted as a lookup of its own
+    assert cache.stats()["misses"] == 1 and cache.stats()["memory_entries"] == 2
+    cache.board(Board.BASE, 5)
+    assert cache.stats()["memory_hits"] == 1
+    assert BoardCache(tmp_path).png(Board.BASE, 5) == png
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from catanpg.bulk import OutputFormat, write_boards
+from catanpg.generation import Board, generate_board, generate_boards
+
+pytest.importorskip("PIL")
+
+from catanpg.base.board_image import BaseBoardImage  # noqa: E402
+from catanpg.contact_sheet import ContactSheetRenderer  # noqa: E402
+from catanpg.tab.board_image import FishermenOfCatanBoardImage  # noqa: E402
+
+
+def test_drawing_over_background_matches_render() -> None:
+    for image_cls, variant in ((BaseBoardImage, Board.BASE), (FishermenOfCatanBoardImage, Board.FOC)):
+        board_image = image_cls(generate_board(variant, 3))
+        page = board_image.background().copy()
+        board_image.draw_on(page, over_background=True)
+        assert page.tobytes() == board_image.render().tobytes()
+        assert image_cls(generate_board(variant, 4)).background() is board_image.background()
+
+
+def test_contact_sheet_pages() -> None:
+    boards = generate_boards(Board.FOC, 3, seed=1) + generate_boards(Board.BASE, 2, seed=1)
+    renderer = ContactSheetRenderer(columns=2, rows=2, scale=0.25, padding=4, workers=3)
+    pages = list(renderer.render(boards))
+    stride = 175 + 4
+    # The last page only has the one row it needs
+    assert [page.size for page in pages] == [(2*stride + 4, 2*stride + 4), (2*stride + 4, stride + 4)]
+    serial_pages = ContactSheetRenderer(columns=2, rows=2, scale=0.25, padding=4, workers=1).render(boards)
+    assert [page.tobytes() for page in pages] == [page.tobytes() for page in serial_pages]
+    with pytest.raises(ValueError):
+        renderer.render_page([])
+
+
+def test_write_sheets(tmp_path: Path) -> None:
+    assert write_boards(Board.BASE, 70, seed=2, output_format=OutputFormat.SHEETS, path=tmp_path) == 70
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["page-0001.png", "page-0002.png"]
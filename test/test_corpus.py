@@ -0,0 +1,50 @@
+import itertools as it
+from pathlib import Path
+
+import pytest
+
+from catanpg.corpus import RECORD_SIZE, BoardCorpus, append_to_corpus, encode_record
+from catanpg.encoding import BOARD_ENCODING_SIZE, decode_board, encode_board
+from catanpg.generation import Board, derive_seed, generate_boards
+
+from helpers import board_tiles
+
+
+def test_encode_decode_board() -> None:
+    for variant, ordered in it.product(Board, (False, True)):
+        for board in generate_boards(variant, 3, seed=7, ordered_numbers=ordered):
+            data = encode_board(board)
+            assert len(data) == BOARD_ENCODING_SIZE
+            decoded = decode_board(data)
+            assert type(decoded) is type(board)
+            assert board_tiles(decoded) == board_tiles(board)
+    with pytest.raises(ValueError):
+        decode_board(b"\0" * (BOARD_ENCODING_SIZE - 1))
+
+
+def test_board_corpus(tmp_path: Path) -> None:
+    path = tmp_path / "boards.bin"
+    base_boards = generate_boards(Board.BASE, 4, seed=1)
+    foc_boards = generate_boards(Board.FOC, 3, seed=2)
+    append_to_corpus(path, base_boards, [derive_seed(1, i) for i in range(4)])
+    append_to_corpus(path, foc_boards)
+    assert path.stat().st_size == 16 + 7*RECORD_SIZE
+    with BoardCorpus(path) as corpus:
+        assert len(corpus) == 7
+        assert corpus.seed(2) == derive_seed(1, 2)
+        assert corpus.seed(5) is None
+        assert board_tiles(corpus[-1]) == board_tiles(foc_boards[-1])
+        assert list(map(board_tiles, corpus)) == list(map(board_tiles, base_boards + foc_boards))
+        with pytest.raises(IndexError):
+            corpus[7]
+
+
+def test_corpus_seed_range(tmp_path: Path) -> None:
+    board = generate_boards(Board.BASE, 1, seed=0)[0]
+    assert len(encode_record(board, 2**64 - 1)) == RECORD_SIZE
+    for seed in (-1, 2**64):
+        with pytest.raises(ValueError, match=r"2\*\*64"):
+            encode_record(board, seed)
+        with pytest.raises(ValueError):
+            append_to_corpus(tmp_path / "corpus.bin", [board], [seed])
+    assert not (tmp_path / "corpus.bin").exists()
@@ -0,0 +1,65 @@
+import itertools as it
+import random
+from collections import Counter
+from typing import Tuple
+
+from catanpg.enumeration import layout_index, sample_board
+from catanpg.generation import Board, board_class
+from catanpg.hex_grid import HexGrid, index_radius
+
+from helpers import board_tiles
+
+
+def _brute_force_num_skeletons(variant: Board) -> int:
+    index = layout_index(variant)
+    grid = HexGrid(3)
+
+    def independent(cell_ids: Tuple[int, ...]) -> bool:
+        return not any(c2 in grid.neighbor_cell_ids(c1) for c1, c2 in it.permutations(cell_ids, 2))
+
+    count = 0
+    lake = index.special_number is not None
+    for special_cell in index.land_cell_ids:
+        if lake and index_radius(*grid.cell_index(special_cell)) > 1:
+            continue
+        land_cells = [c for c in index.land_cell_ids if c != special_cell]
+        for red_fish_cells in it.combinations(index.fish_cell_ids, len(index.red_fish_clss)):
+            for red_cells in it.combinations(land_cells, len(index.red_numbers)):
+                count += independent(red_cells + ((special_cell,) if lake else ())) and not any(
+                    c2 in grid.neighbor_cell_ids(c1) for c1 in red_cells for c2 in red_fish_cells
+                )
+    return count
+
+
+def test_symmetry_reduced_count() -> None:
+    for variant in Board:
+        index = layout_index(variant)
+        assert len(index.representatives) < index.num_skeletons
+        assert sum(size for _, size in index.orbits()) == index.num_skeletons
+        assert index.num_skeletons == _brute_force_num_skeletons(variant)
+        skeletons = list(index.skeletons())
+        assert len(set(skeletons)) == len(skeletons) == index.num_skeletons
+        assert [index.skeleton(k) for k in range(index.num_skeletons)] == skeletons
+
+
+def test_layouts_are_valid() -> None:
+    for variant in Board:
+        index = layout_index(variant)
+        board = board_class(variant).from_grid(HexGrid(3), rng=random.Random(0))
+        board._shuffle_borders()
+        layouts = list(it.islice(index.layouts(index.skeleton(0)), 50))
+        assert len(set(layouts)) == len(layouts)
+        for layout in layouts:
+            for cell_id, (tile_cls, number) in zip(index.cell_ids, layout):
+                board.grid.set_cell(cell_id, tile_cls(number) if tile_cls in index.terrain_clss else tile_cls())
+            assert board._grid_violation(board.grid) == 0
+
+
+def test_sample_board() -> None:
+    for variant in Board:
+        expected_numbers = Counter(number for _, number, _ in board_tiles(board_class(variant)()))
+        for seed in range(20):
+            board = sample_board(variant, seed)
+            assert board._grid_violation(board.grid) == 0
+            assert Counter(number for _, number, _ in board_tiles(board)) == expected_numbers
+        assert board_tiles(sample_board(variant, 7)) == board_tiles(sample_board(variant, 7))
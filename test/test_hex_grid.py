@@ -1,5 +1,12 @@
+import itertools as it
+from copy import deepcopy
+from typing import Iterator, Tuple
+
+import pytest
+
 from catanpg.hex_grid import (
     Direction,
+    HexGrid,
     corner_at_distance,
     direction_to_angle,
     distance,
@@ -9,7 +16,11 @@ from catanpg.hex_grid import (
     next_clockwise_direction,
     next_counter_clockwise_direction,
     ordered_ring_indexes,
+    reflect_index,
+    ring_index_table,
     rotate_direction,
+    rotate_index,
+    spiral_index_table,
     spiral_ordered_indexes,
     step_from_hex,
     symmetric_direction,
@@ -103,6 +114,17 @@ def test_symmetric_index() -> None:
     assert symmetric_index(0, 0) == (0, 0)
 
 
+def test_rotate_and_reflect_index() -> None:
+    for direction in Direction:
+        corner = corner_at_distance(direction, 2)
+        for nsteps in range(-6, 7):
+            assert rotate_index(*corner, nsteps) == corner_at_distance(rotate_direction(direction, nsteps), 2)
+        assert reflect_index(*corner) == corner_at_distance(Direction((-direction) % 6), 2)
+    for x, y in spiral_index_table(Direction.EAST, 3):
+        assert rotate_index(x, y, 3) == symmetric_index(x, y)
+        assert reflect_index(*reflect_index(x, y)) == (x, y)
+
+
 def test_ordered_ring_indexes() -> None:
     assert list(ordered_ring_indexes(Direction.EAST, 1)) == [(1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1)]
     ring = [(0, -2), (1, -2), (2, -2), (2, -1), (2, 0), (1, 1), (0, 2), (-1, 2), (-2, 2), (-2, 1), (-2, 0), (-1, -1)]
@@ -122,6 +144,102 @@ def test_spiral_ordered_indexes() -> None:
     assert list(spiral_ordered_indexes(Direction.NORTHEAST, 0)) == [(0, 0)]
 
 
+def _walk_ring(start_corner: Direction, radius: int) -> Iterator[Tuple[int, int]]:
+    # Ring walk computed on every call, as the tables were before being memoized
+    if radius == 0:
+        yield 0, 0
+    else:
+        x, y = corner_at_distance(start_corner, radius)
+        for i in range(6):
+            for _ in range(radius):
+                yield x, y
+                x, y = step_from_hex(x, y, Direction((i+2+start_corner) % 6))
+
+
+def test_index_tables() -> None:
+    assert ring_index_table(Direction.NORTHWEST, 1) == ((0, -1), (1, -1), (1, 0), (0, 1), (-1, 1), (-1, 0))
+    assert spiral_index_table(Direction.EAST, 1) == ((1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1), (0, 0))
+    assert spiral_index_table(Direction.EAST, 0) == ((0, 0),)
+    for start_corner, radius in it.product(Direction, range(5)):
+        assert ring_index_table(start_corner, radius) == tuple(_walk_ring(start_corner, radius))
+        assert list(spiral_ordered_indexes(start_corner, radius)) == [
+            idx for ring_radius in reversed(range(radius+1)) for idx in _walk_ring(start_corner, ring_radius)
+        ]
+    assert ring_index_table(Direction.NORTHWEST, 2) is ring_index_table(Direction.NORTHWEST, 2)
+    assert spiral_index_table(Direction.SOUTHWEST, 2) is spiral_index_table(Direction.SOUTHWEST, 2)
+    # The shared tables cannot be changed through what callers get from them
+    table = spiral_index_table(Direction.SOUTHWEST, 2)
+    with pytest.raises(TypeError):
+        table[0] = (9, 9)  # type: ignore[index]
+    indexes = list(ordered_ring_indexes(Direction.SOUTHWEST, 2))
+    indexes.reverse()
+    assert list(ordered_ring_indexes(Direction.SOUTHWEST, 2)) == list(_walk_ring(Direction.SOUTHWEST, 2))
+
+
 def test_neighbors() -> None:
     assert sorted(neighbors(0, 0)) == [(-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0)]
     assert sorted(neighbors(2, -1)) == [(1, -1), (1, 0), (2, -2), (2, 0), (3, -2), (3, -1)]
+
+
+def test_hex_grid_get_set() -> None:
+    grid = HexGrid(2)
+    assert grid.num_cells == 19
+    assert grid.is_free(1, -2)
+    grid.set(1, -2, "a")
+    assert grid.get(1, -2) == "a"
+    assert not grid.is_free(1, -2)
+    assert grid.get_cell(grid.cell_id(1, -2)) == "a"
+    assert grid.cell_index(grid.cell_id(1, -2)) == (1, -2)
+    grid.set_cell(grid.cell_id(0, 0), "b")
+    assert grid.get(0, 0) == "b"
+    with pytest.raises(ValueError):
+        grid.get(2, 1)
+    with pytest.raises(ValueError):
+        grid.set(-3, 0, "c")
+
+
+def test_hex_grid_neighbors() -> None:
+    grid = HexGrid(2)
+    for x, y in spiral_ordered_indexes(Direction.EAST, 2):
+        grid.set(x, y, (x, y))
+    assert list(grid.neighbor_indexes(0, 0)) == list(neighbors(0, 0))
+    assert sorted(grid.neighbor_indexes(2, -1)) == [(1, -1), (1, 0), (2, -2), (2, 0)]
+    assert sorted(grid.neighbors(2, -1)) == [(1, -1), (1, 0), (2, -2), (2, 0)]
+    assert sorted(grid.neighbor_indexes(3, -1)) == [(2, -1), (2, 0)]
+    cell_id = grid.cell_id(-2, 2)
+    assert sorted(map(grid.cell_index, grid.neighbor_cell_ids(cell_id))) == [(-2, 1), (-1, 1), (-1, 2)]
+
+
+def test_hex_grid_copy_shares_tables() -> None:
+    grid = HexGrid(3)
+    grid.set(0, 0, [1])
+    grid_copy = deepcopy(grid)
+    assert grid_copy.get(0, 0) == [1] and grid_copy.get(0, 0) is not grid.get(0, 0)
+    assert grid_copy._tables is grid._tables is HexGrid(3)._tables
+
+
+def test_hex_grid_topology() -> None:
+    for radius in range(5):
+        grid = HexGrid(radius)
+        assert grid.num_vertices == 6 * (radius + 1)**2
+        assert grid.num_edges == 3 * (radius + 1) * (3*radius + 2)
+        assert grid._tables.topology is HexGrid(radius)._tables.topology
+    grid = HexGrid(2)
+    center = grid.cell_id(0, 0)
+    for direction in Direction:
+        neighbor = grid.cell_id(*step_from_hex(0, 0, direction))
+        edge_id = grid.cell_edge_ids(center)[direction]
+        assert edge_id == grid.cell_edge_ids(neighbor)[symmetric_direction(direction)]
+        assert sorted(grid.edge_cell_ids(edge_id)) == sorted((center, neighbor))
+        # Side k joins corners k-1 and k
+        corners = grid.cell_vertex_ids(center)
+        assert sorted(grid.edge_vertex_ids(edge_id)) == sorted((corners[direction-1], corners[direction]))
+        next_neighbor = grid.cell_id(*step_from_hex(0, 0, next_clockwise_direction(direction)))
+        assert grid.vertex_cell_ids(corners[direction]) == tuple(sorted((center, neighbor, next_neighbor)))
+    for vertex_id in range(grid.num_vertices):
+        assert 1 <= len(grid.vertex_cell_ids(vertex_id)) <= 3
+        assert len(grid.vertex_edge_ids(vertex_id)) == len(grid.vertex_neighbor_ids(vertex_id)) in (2, 3)
+        for edge_id, neighbor_id in zip(grid.vertex_edge_ids(vertex_id), grid.vertex_neighbor_ids(vertex_id)):
+            assert sorted(grid.edge_vertex_ids(edge_id)) == sorted((vertex_id, neighbor_id))
+    outer_corner = grid.cell_vertex_ids(grid.cell_id(2, 0))[0]
+    assert grid.vertex_cell_ids(outer_corner) == (grid.cell_id(2, 0),)
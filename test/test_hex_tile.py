@@ -0,0 +1,59 @@
+import pickle
+from copy import deepcopy
+
+import pytest
+
+from catanpg.base.hex_tile import (
+    DesertTile,
+    ForestTile,
+    LumberHarborTile,
+    SeaTile,
+    TileKind,
+)
+from catanpg.base.tile_sequence import SeaBorderTile
+from catanpg.hex_grid import Direction
+from catanpg.tab.hex_tile import LAKE_NUMBERS, LakeTile, Sea4FishTile
+
+
+def test_tiles_are_flyweights() -> None:
+    assert SeaTile() is SeaTile()
+    assert ForestTile(5) is ForestTile(5) and ForestTile(5) is not ForestTile(6)
+    assert LumberHarborTile(Direction.EAST) is LumberHarborTile(Direction.EAST)
+    tiles = [SeaTile(), ForestTile(5), LumberHarborTile(Direction.WEST), Sea4FishTile(), LakeTile()]
+    assert all(a is b for a, b in zip(deepcopy(tiles), tiles))
+    assert all(a is b for a, b in zip(pickle.loads(pickle.dumps(tiles)), tiles))
+
+
+def test_keyword_construction() -> None:
+    assert ForestTile(number=5) is ForestTile(5)
+    assert LumberHarborTile(direction=Direction.WEST) is LumberHarborTile(Direction.WEST)
+    with pytest.raises(TypeError):
+        ForestTile(5, number=6)
+    with pytest.raises(TypeError):
+        ForestTile(color="green")
+
+
+def test_tiles_are_immutable() -> None:
+    tile = ForestTile(5)
+    with pytest.raises(AttributeError):
+        tile.number = 6
+    with pytest.raises(AttributeError):
+        tile.color = "green"
+    harbor = LumberHarborTile(Direction.EAST)
+    assert harbor.rotate(2) is LumberHarborTile(Direction.SOUTHWEST)
+    assert harbor.rotate_counter_clockwise().orientation == Direction.NORTHEAST
+    assert harbor.orientation == Direction.EAST
+    border = SeaBorderTile()
+    border.tiles[1] = harbor
+    border.rotate_clockwise()
+    assert border.tiles[1] is LumberHarborTile(Direction.SOUTHEAST) and harbor.orientation == Direction.EAST
+
+
+def test_tile_kinds() -> None:
+    assert [tile.kind for tile in (SeaTile(), DesertTile(), LumberHarborTile(Direction.EAST))] == [
+        TileKind.SEA, TileKind.DESERT, TileKind.HARBOR
+    ]
+    assert ForestTile(5).kind == TileKind.TERRAIN
+    assert Sea4FishTile().kind == TileKind.FISH and Sea4FishTile().number == 4
+    assert LakeTile().kind == TileKind.LAKE and LakeTile().number == LAKE_NUMBERS
+    assert repr(ForestTile(5)) == "ForestTile(5)"
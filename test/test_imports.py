@@ -0,0 +1,25 @@
+import subprocess
+import sys
+from typing import Dict
+
+# Generous, so that only a heavy dependency slipping into the import graph (e.g. Pillow or NumPy) fails it
+_IMPORT_BUDGET_S = 1.0
+
+
+def _import_times_us(module: str) -> Dict[str, int]:
+    # A fresh interpreter, so that no module is already imported
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines()[1:]:
+        _, _, cumulative, name = (field.strip() for field in line.replace(":", "|", 1).split("|"))
+        times[name] = int(cumulative)
+    return times
+
+
+def test_board_imports_without_pillow() -> None:
+    for module in ("catanpg.base.board", "catanpg.generation", "catanpg.main", "catanpg.tab.board_svg"):
+        times = _import_times_us(module)
+        assert "PIL" not in times
+        assert times[module] < _IMPORT_BUDGET_S * 1e6
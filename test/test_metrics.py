@@ -0,0 +1,51 @@
+from collections import Counter
+
+from catanpg.base.board import _ORDERED_NUMBERS
+from catanpg.base.hex_tile import HarborTile
+from catanpg.generation import Board, generate_board, generate_boards
+from catanpg.hex_grid import index_radius, step_from_hex
+from catanpg.metrics import (
+    RESOURCES,
+    _metric_tables,
+    evaluate_board,
+    evaluate_boards,
+    metrics_columns,
+    pips,
+)
+
+
+def test_pips() -> None:
+    assert [pips(number) for number in range(2, 13)] == [1, 2, 3, 4, 5, 6, 5, 4, 3, 2, 1]
+    assert pips((11, 12, 2, 3)) == 6
+
+
+def test_metric_tables() -> None:
+    tables = _metric_tables(3)
+    assert len(tables.vertex_cell_ids) == 54
+    land_cells = set(tables.land_cell_ids)
+    vertex_counts = Counter(c for cell_ids in tables.vertex_cell_ids for c in cell_ids if c in land_cells)
+    assert set(vertex_counts.values()) == {6}
+    for variant in Board:
+        board = generate_board(variant, 1)
+        for cell_id in range(board.grid.num_cells):
+            tile = board.grid.get_cell(cell_id)
+            if isinstance(tile, HarborTile):
+                assert index_radius(*step_from_hex(*board.grid.cell_index(cell_id), tile.orientation)) == 2
+                assert len(tables.harbor_vertex_ids[cell_id, tile.orientation]) == 2
+
+
+def test_evaluate_board() -> None:
+    boards = generate_boards(Board.FOC, 10, seed=4)
+    metrics = evaluate_boards(boards)
+    assert metrics == [evaluate_board(board) for board in boards]
+    for board_metrics in metrics:
+        assert sum(board_metrics.resource_pips.values()) == sum(map(pips, _ORDERED_NUMBERS))
+        assert 0 < board_metrics.best_fish_spot_pips <= board_metrics.best_spot_pips
+        assert max(board_metrics.harbor_spot_pips.values()) <= board_metrics.best_spot_pips
+    assert evaluate_board(generate_board(Board.BASE, 4)).best_fish_spot_pips == 0
+    mixed_boards = [board for pair in zip(generate_boards(Board.BASE, 10, seed=5), boards) for board in pair]
+    assert evaluate_boards(mixed_boards) == [evaluate_board(board) for board in mixed_boards]
+    assert evaluate_boards([]) == []
+    columns = metrics_columns(metrics)
+    assert all(len(column) == 10 for column in columns.values())
+    assert {f"{resource}_pips" for resource in RESOURCES} <= set(columns)
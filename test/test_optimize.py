@@ -0,0 +1,63 @@
+import itertools as it
+import random
+import time
+
+import pytest
+
+from catanpg.base.board import BaseBoard
+from catanpg.generation import Board, generate_board
+from catanpg.hex_grid import Direction, index_radius
+from catanpg.optimize import (
+    DEFAULT_OBJECTIVE,
+    Objective,
+    OptimizationMethod,
+    optimize_board,
+)
+from catanpg.tab.hex_tile import LakeTile
+
+
+def _lake_radius(board: BaseBoard) -> int:
+    return next(
+        index_radius(*board.grid.cell_index(cell_id))
+        for cell_id in range(board.grid.num_cells)
+        if isinstance(board.grid.get_cell(cell_id), LakeTile)
+    )
+
+
+def test_optimize_board() -> None:
+    for variant, method in it.product(Board, OptimizationMethod):
+        board = generate_board(variant, 3)
+        tiles = list(board.grid.spiral_ordered_hexes(Direction.EAST))
+        result = optimize_board(board, method=method, max_iterations=300, rng=random.Random(0))
+        assert list(board.grid.spiral_ordered_hexes(Direction.EAST)) == tiles
+        assert result.violation == 0 and result.iterations == 300
+        assert DEFAULT_OBJECTIVE(result.board) == (result.violation, result.objective)
+        assert result.objective <= DEFAULT_OBJECTIVE(board)[1]
+        assert type(result.board) is type(board)
+        if variant == Board.FOC:
+            assert _lake_radius(result.board) < 2
+        rerun = optimize_board(board, method=method, max_iterations=300, rng=random.Random(0))
+        assert list(rerun.board.grid.spiral_ordered_hexes(Direction.EAST)) == list(
+            result.board.grid.spiral_ordered_hexes(Direction.EAST)
+        )
+
+
+def test_optimize_board_keeps_board_rng() -> None:
+    board = generate_board(Board.BASE, 0)
+    rng_state = board._rng.getstate()
+    optimize_board(board, max_iterations=50)
+    assert board._rng.getstate() == rng_state
+
+
+def test_optimize_board_budgets() -> None:
+    board = generate_board(Board.BASE, 0)
+    start = time.perf_counter()
+    result = optimize_board(board, time_budget_s=0.05)
+    assert time.perf_counter() - start < 0.5 and result.iterations > 0
+    objective = Objective({"violations": 1, "resource_pip_spread": 1})
+    optimized = board.optimize(objective=objective, method=OptimizationMethod.TABU, max_iterations=200)
+    assert objective(optimized) <= objective(board)
+    with pytest.raises(ValueError):
+        optimize_board(board)
+    with pytest.raises(ValueError):
+        Objective({"beauty": 1})
@@ -0,0 +1,111 @@
+import asyncio
+import itertools as it
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+import pytest
+
+from catanpg import service
+from catanpg.generation import Board, generate_board
+from catanpg.hex_grid import Direction
+from catanpg.service import BoardPool, BoardService, PooledBoard
+
+
+async def _get(host: str, port: int, path: str) -> Tuple[int, Dict[str, str], bytes]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in header_lines)}
+    return int(status_line.split()[1]), headers, body
+
+
+def test_board_service() -> None:
+
+    async def run() -> None:
+        service = BoardService(depth=2, workers=1, seed=5)
+        await service.start(port=0)
+        try:
+            host, port = service.addresses()[0]
+            while any(len(pool) < pool.depth for pool in service.pools.values()):
+                await asyncio.sleep(0.01)
+            status, headers, body = await _get(host, port, "/boards/foc.json")
+            assert status == 200
+            board = json.loads(body)
+            assert board["variant"] == "FOC" and board["seed"] == int(headers["x-board-seed"])
+            regenerated = generate_board(Board.FOC, board["seed"])
+            assert [tile["type"] for tile in board["tiles"]] == [
+                type(tile).__name__ for tile in regenerated.grid.spiral_ordered_hexes(Direction.EAST)
+            ]
+            if service.render:
+                status, headers, body = await _get(host, port, "/boards/base.png")
+                assert status == 200 and headers["content-type"] == "image/png"
+                assert body.startswith(b"\x89PNG")
+            status, headers, body = await _get(host, port, "/boards/base.svg")
+            assert status == 200 and headers["content-type"] == "image/svg+xml"
+            assert body.startswith(b"<svg") and int(headers["x-board-seed"]) >= 0
+            assert (await _get(host, port, "/boards/unknown.json"))[0] == 404
+            status, _, body = await _get(host, port, "/metrics")
+            metrics = json.loads(body)
+            assert metrics["foc"]["hits"] == 1 and metrics["foc"]["misses"] == 0
+            assert metrics["foc"]["refills"] >= 2 and metrics["foc"]["refill_latency_p95_ms"] > 0
+        finally:
+            await service.close()
+
+    asyncio.run(run())
+
+
+def test_board_service_internal_error() -> None:
+
+    def generate(seed: int) -> PooledBoard:
+        raise RuntimeError("Broken worker")
+
+    async def run() -> None:
+        service = BoardService(depth=1, workers=1, seed=5, variants=[Board.BASE])
+        await service.start(port=0)
+        try:
+            host, port = service.addresses()[0]
+            # Every request misses the pool, whose generator fails
+            pool = service.pools[Board.BASE]
+            await pool.close()
+            while len(pool) > 0:
+                await pool.get()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                pool._executor, pool._generate = executor, generate
+                status, _, body = await _get(host, port, "/boards/base.json")
+            assert status == 500 and "error" in json.loads(body)
+            assert (await _get(host, port, "/metrics"))[0] == 200
+        finally:
+            await service.close()
+
+    asyncio.run(run())
+
+
+def test_pool_refills_after_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(service, "_REFILL_BACKOFF_S", 0.001)
+    failures = 3
+
+    def generate(seed: int) -> PooledBoard:
+        nonlocal failures
+        if failures > 0:
+            failures -= 1
+            raise RuntimeError("Broken worker")
+        return PooledBoard(seed, generate_board(Board.BASE, seed), None)
+
+    async def run() -> None:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pool = BoardPool(Board.BASE, 2, executor, it.count(), render=False)
+            pool._generate = generate
+            pool.start()
+            try:
+                while len(pool) < pool.depth:
+                    await asyncio.sleep(0.01)
+            finally:
+                await pool.close()
+            assert pool.metrics.refill_failures == 3 and pool.metrics.refills >= 2
+
+    asyncio.run(run())